@@ -1,21 +1,24 @@
 # app/__init__.py
-from flask import Flask, current_app
+from flask import Flask, current_app, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask import send_from_directory
-from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
 from flask_mail import Mail
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import config
+from app.services.jwt_cache import CachingJWTManager
+from app.services.db_routing import RoutingSession
+from app.services.json_provider import FastJSONProvider
 import os
 import base64
 
 # Initialize Flask extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 cors = CORS()
-jwt = JWTManager()
+jwt = CachingJWTManager()
 bcrypt = Bcrypt()
 mail = Mail()
 
@@ -25,6 +28,7 @@ def create_app(config_name=None):
     
     # Create Flask app instance
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
     # Load configuration
     if config_name is None:
@@ -32,12 +36,22 @@ def create_app(config_name=None):
     
     app.config.from_object(config[config_name])
     
+    # Client address from the hop our own proxies appended, never from a value
+    # the client could have put at the front of X-Forwarded-For
+    if app.config.get('TRUSTED_PROXIES'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+    
+    # Pool sizing has to be in the engine options before the engines are created
+    from app.services.pool_metrics import pool_metrics
+    pool_metrics.configure(app)
+    
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
+    pool_metrics.init_app(app, db)
     
     cors.init_app(app, 
-              origins=['http://localhost:5173', 'https://memora-app-wawu.vercel.app'],  # Add both localhost variants
+              origins=app.config['CORS_ORIGINS'],
               allow_headers=['Content-Type', 'Authorization', 'X-Guest-Session'],
               methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
     
@@ -46,6 +60,38 @@ def create_app(config_name=None):
     bcrypt.init_app(app)
     mail.init_app(app)
     
+    # First after_request hook registered, so it runs last and sees the final body
+    from app.services.compression import compression
+    compression.init_app(app)
+    
+    from app.services.password_hasher import password_hasher
+    password_hasher.init_app(app)
+    
+    from app.services.rate_limiter import rate_limiter
+    rate_limiter.init_app(app)
+    
+    # Registered before the unit of work so their after_request hooks run after the commit
+    from app.services.query_profiler import query_profiler
+    query_profiler.init_app(app)
+    
+    from app.services.db_routing import replica_router
+    replica_router.init_app(app)
+    
+    from app.services.unit_of_work import unit_of_work
+    unit_of_work.init_app(app, db)
+    
+    from app.services.search import obituary_search
+    obituary_search.init_app(app, db)
+    
+    from app.services.autocomplete import memorial_autocomplete
+    memorial_autocomplete.init_app(app, db)
+    
+    from app.services.purger import memorial_purger
+    memorial_purger.init_app(app, db)
+    
+    from app.services.public_snapshots import public_snapshots
+    public_snapshots.init_app(app, db)
+    
     # Create upload directory if it doesn't exist
     upload_dir = app.config.get('UPLOAD_FOLDER', 'uploads')
     if not os.path.exists(upload_dir):
@@ -77,6 +123,8 @@ def register_blueprints(app):
     from app.api.body_viewing import body_viewing_bp
     from app.api.repass_location import repass_bp
     from app.api.burial_location import burial_bp
+    from app.api.search import search_bp
+    from app.api.public import public_bp
 
     
     # Register API blueprints
@@ -90,12 +138,28 @@ def register_blueprints(app):
     app.register_blueprint(body_viewing_bp)
     app.register_blueprint(repass_bp)
     app.register_blueprint(burial_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(public_bp)
+    
+    from app.services.rate_limiter import rate_limit
     
     # Add a simple health check endpoint
     @app.route('/health')
+    @rate_limit(None)
     def health_check():
         return {'status': 'healthy', 'message': 'Memoras API is running'}, 200
     
+    @app.route('/metrics')
+    @rate_limit(None)
+    def metrics():
+        """Connection pool metrics in the Prometheus text format"""
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return {'error': 'Invalid metrics token'}, 401
+        
+        from app.services.pool_metrics import pool_metrics
+        return pool_metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
         """Serve uploaded files"""
@@ -164,3 +228,14 @@ def register_jwt_handlers(app):
     def missing_token_callback(error):
         return {'error': 'Authorization token is required'}, 401
     
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return {'error': 'Token has been revoked'}, 401
+    
+    from app.services.revocation import revocation_list
+    revocation_list.init_app(app)
+    
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return revocation_list.is_revoked(jwt_payload.get('jti'))
+    
@@ -3,7 +3,8 @@ from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
-from app.models.program import Acknowledgements
+from app.models.program import Acknowledgements, upsert_section
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 acknowledgements_bp = Blueprint('acknowledgements', __name__, url_prefix='/api/acknowledgements')
@@ -14,7 +15,7 @@ class AcknowledgementsSchema(Schema):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -46,25 +47,13 @@ def save_acknowledgements(memorial_id):
         schema = AcknowledgementsSchema()
         data = schema.load(request.get_json())
         
-        # Check if acknowledgements already exists
-        existing = Acknowledgements.find_by_memorial(memorial_id)
-        
-        if existing:
-            # Update existing acknowledgements
-            existing.acknowledgment_text = data['acknowledgment_text']
-            acknowledgements = existing
-        else:
-            # Create new acknowledgements
-            acknowledgements = Acknowledgements(
-                memorial_id=memorial_id,
-                acknowledgment_text=data['acknowledgment_text']
-            )
-            db.session.add(acknowledgements)
+        # Insert or update in one statement (safe against double submits)
+        acknowledgements = upsert_section(Acknowledgements, memorial_id, data)
         
         # Update memorial progress
         memorial.add_completed_step('acknowledgements')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Acknowledgements saved successfully',
@@ -79,6 +68,7 @@ def save_acknowledgements(memorial_id):
         return jsonify({'error': f'Failed to save acknowledgements: {str(e)}'}), 500
 
 @acknowledgements_bp.route('/<memorial_id>/acknowledgements', methods=['GET'])
+@conditional_memorial
 def get_acknowledgements(memorial_id):
     """Get acknowledgements for a memorial"""
     try:
@@ -114,11 +104,10 @@ def delete_acknowledgements(memorial_id):
             return jsonify({'error': 'Acknowledgements not found'}), 404
         
         # Remove acknowledgements from completed steps
-        if 'acknowledgements' in memorial.completed_steps:
-            memorial.completed_steps.remove('acknowledgements')
+        memorial.remove_completed_step('acknowledgements')
         
         db.session.delete(acknowledgements)
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({'message': 'Acknowledgements deleted successfully'}), 200
         
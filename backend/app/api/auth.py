@@ -2,10 +2,15 @@
 import uuid
 from datetime import datetime
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
 from marshmallow import Schema, fields, ValidationError, validate
 from app import db, bcrypt
 from app.models.user import User
+from app.models.memorial import Memorial
+from app.services.password_hasher import PasswordHasherBusy
+from app.services.revocation import revocation_list
+from app.services.db_routing import replica_router
+from app.services.rate_limiter import rate_limit
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -18,15 +23,28 @@ class UserRegistrationSchema(Schema):
     first_name = fields.Str(required=False, validate=validate.Length(max=50))
     last_name = fields.Str(required=False, validate=validate.Length(max=50))
     phone = fields.Str(required=False, validate=validate.Length(max=20))
+    guest_session = fields.Str(required=False)  # Drafts to carry over to the new account
 
 
 class UserLoginSchema(Schema):
     """Schema for user login"""
     email = fields.Email(required=True)
     password = fields.Str(required=True)
+    guest_session = fields.Str(required=False)  # Drafts to carry over to the account
+
+
+def get_guest_session(data):
+    """Guest session from the request body or the X-Guest-Session header"""
+    return data.get('guest_session') or request.headers.get('X-Guest-Session')
+
+
+def server_busy_response():
+    """Response for when the password hashing queue is saturated"""
+    return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
 
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('auth')
 def register():
     """Register a new user"""
     try:
@@ -49,7 +67,13 @@ def register():
         )
         
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
+        
+        # Move any guest drafts onto the new account in the same transaction
+        adopted = Memorial.adopt_guest_memorials(get_guest_session(data), user.id)
+        
+        # The new account reads its own data from the primary for a while
+        replica_router.mark_written(user_id=user.id)
         
         # Create access token
         access_token = create_access_token(identity=user.id)
@@ -57,17 +81,22 @@ def register():
         return jsonify({
             'message': 'User registered successfully',
             'access_token': access_token,
-            'user': user.to_dict()
+            'user': user.to_dict(),
+            'adopted_memorials': adopted
         }), 201
         
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return server_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed'}), 500
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('auth')
 def login():
     """User login"""
     try:
@@ -83,9 +112,23 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Upgrade the stored hash if the configured work factor changed; when
+        # the hasher is saturated, skip it and retry on the next login
+        if user.password_needs_rehash():
+            try:
+                user.set_password(data['password'])
+            except PasswordHasherBusy:
+                pass
+        
         # Update last login
         user.last_login = datetime.utcnow()
-        db.session.commit()
+        
+        # Move any guest drafts onto the account in the same transaction
+        adopted = Memorial.adopt_guest_memorials(get_guest_session(data), user.id)
+        if adopted:
+            replica_router.mark_written(user_id=user.id)
+        
+        db.session.flush()
         
         # Create access token
         access_token = create_access_token(identity=user.id)
@@ -93,16 +136,22 @@ def login():
         return jsonify({
             'message': 'Login successful',
             'access_token': access_token,
-            'user': user.to_dict()
+            'user': user.to_dict(),
+            'adopted_memorials': adopted
         }), 200
         
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return server_busy_response()
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Login failed'}), 500
 
 
 @auth_bp.route('/guest-session', methods=['POST'])
+@rate_limit('guest_session')
 def create_guest_session():
     """Create a guest session for anonymous users"""
     try:
@@ -135,10 +184,42 @@ def get_current_user():
         return jsonify({'error': 'Failed to get user information'}), 500
 
 
+@auth_bp.route('/adopt-guest-memorials', methods=['POST'])
+@jwt_required()
+def adopt_guest_memorials():
+    """Move a guest session's drafts onto the current user's account"""
+    try:
+        data = request.get_json(silent=True) or {}
+        guest_session = get_guest_session(data)
+        if not guest_session:
+            return jsonify({'error': 'Guest session is required'}), 400
+        
+        adopted = Memorial.adopt_guest_memorials(guest_session, get_jwt_identity())
+        db.session.flush()
+        
+        return jsonify({
+            'message': f'Adopted {adopted} memorial(s)',
+            'adopted_memorials': adopted
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to adopt guest memorials'}), 500
+
+
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """User logout (client-side token removal)"""
-    # In a more sophisticated setup, you might want to blacklist the token
-    # For now, we just return a success message since JWT tokens are stateless
-    return jsonify({'message': 'Logout successful'}), 200
\ No newline at end of file
+    """User logout (revokes the current token)"""
+    try:
+        claims = get_jwt()
+        expires_at = datetime.utcfromtimestamp(claims['exp']) if claims.get('exp') else None
+        
+        revocation_list.revoke(claims['jti'], user_id=claims.get('sub'), expires_at=expires_at)
+        db.session.flush()
+        
+        return jsonify({'message': 'Logout successful'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Logout failed'}), 500
\ No newline at end of file
@@ -3,7 +3,8 @@ from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
-from app.models.program import BodyViewing
+from app.models.program import BodyViewing, upsert_section
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 body_viewing_bp = Blueprint('body_viewing', __name__, url_prefix='/api/body-viewing')
@@ -19,7 +20,7 @@ class BodyViewingSchema(Schema):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -51,26 +52,13 @@ def save_body_viewing(memorial_id):
         schema = BodyViewingSchema()
         data = schema.load(request.get_json())
         
-        # Check if body viewing already exists
-        existing = BodyViewing.find_by_memorial(memorial_id)
-        
-        if existing:
-            # Update existing body viewing
-            for key, value in data.items():
-                setattr(existing, key, value)
-            body_viewing = existing
-        else:
-            # Create new body viewing
-            body_viewing = BodyViewing(
-                memorial_id=memorial_id,
-                **data
-            )
-            db.session.add(body_viewing)
+        # Insert or update in one statement (safe against double submits)
+        body_viewing = upsert_section(BodyViewing, memorial_id, data)
         
         # Update memorial progress
         memorial.add_completed_step('body_viewing')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Body viewing saved successfully',
@@ -85,6 +73,7 @@ def save_body_viewing(memorial_id):
         return jsonify({'error': f'Failed to save body viewing: {str(e)}'}), 500
 
 @body_viewing_bp.route('/<memorial_id>/body-viewing', methods=['GET'])
+@conditional_memorial
 def get_body_viewing(memorial_id):
     """Get body viewing arrangements for a memorial"""
     try:
@@ -120,11 +109,10 @@ def delete_body_viewing(memorial_id):
             return jsonify({'error': 'Body viewing not found'}), 404
         
         # Remove body viewing from completed steps
-        if 'body_viewing' in memorial.completed_steps:
-            memorial.completed_steps.remove('body_viewing')
+        memorial.remove_completed_step('body_viewing')
         
         db.session.delete(body_viewing)
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({'message': 'Body viewing deleted successfully'}), 200
         
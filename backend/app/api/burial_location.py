@@ -3,7 +3,8 @@ from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
-from app.models.program import BurialLocation
+from app.models.program import BurialLocation, upsert_section
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 burial_bp = Blueprint('burial', __name__, url_prefix='/api/burial')
@@ -19,7 +20,7 @@ class BurialLocationSchema(Schema):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -51,26 +52,13 @@ def save_burial_location(memorial_id):
         schema = BurialLocationSchema()
         data = schema.load(request.get_json())
         
-        # Check if burial location already exists
-        existing = BurialLocation.find_by_memorial(memorial_id)
-        
-        if existing:
-            # Update existing burial location
-            for key, value in data.items():
-                setattr(existing, key, value)
-            burial_location = existing
-        else:
-            # Create new burial location
-            burial_location = BurialLocation(
-                memorial_id=memorial_id,
-                **data
-            )
-            db.session.add(burial_location)
+        # Insert or update in one statement (safe against double submits)
+        burial_location = upsert_section(BurialLocation, memorial_id, data)
         
         # Update memorial progress
         memorial.add_completed_step('burial_location')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Burial location saved successfully',
@@ -85,6 +73,7 @@ def save_burial_location(memorial_id):
         return jsonify({'error': f'Failed to save burial location: {str(e)}'}), 500
 
 @burial_bp.route('/<memorial_id>/burial', methods=['GET'])
+@conditional_memorial
 def get_burial_location(memorial_id):
     """Get burial location for a memorial"""
     try:
@@ -120,11 +109,10 @@ def delete_burial_location(memorial_id):
             return jsonify({'error': 'Burial location not found'}), 404
         
         # Remove burial location from completed steps
-        if 'burial_location' in memorial.completed_steps:
-            memorial.completed_steps.remove('burial_location')
+        memorial.remove_completed_step('burial_location')
         
         db.session.delete(burial_location)
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({'message': 'Burial location deleted successfully'}), 200
         
@@ -1,14 +1,28 @@
 # app/api/memorials.py
+import base64
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, jwt_required
 from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial, MemorialStatus
+from app.models.program import save_program
 from app.models.user import User
+from app.api.obituaries import ObituarySchema
+from app.api.body_viewing import BodyViewingSchema
+from app.api.speeches import SpeechSchema
+from app.api.acknowledgements import AcknowledgementsSchema
+from app.api.repass_location import RepassLocationSchema
+from app.api.burial_location import BurialLocationSchema
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 memorials_bp = Blueprint('memorials', __name__, url_prefix='/api/memorials')
 
+# Page size limits for listing memorials
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 
 class MemorialCreateSchema(Schema):
     """Schema for creating a memorial"""
@@ -25,6 +39,23 @@ class MemorialUpdateSchema(Schema):
     current_step = fields.Str(required=False)
 
 
+class PhotoMetadataSchema(Schema):
+    """Schema for metadata of an already uploaded photo"""
+    id = fields.Str(required=True)
+    photo_type = fields.Str(required=True)  # profile, gallery
+
+
+class ProgramSchema(Schema):
+    """Schema for saving every program section at once (omitted sections are left as-is)"""
+    obituary = fields.Nested(ObituarySchema, required=False)
+    body_viewing = fields.Nested(BodyViewingSchema, required=False)
+    speeches = fields.List(fields.Nested(SpeechSchema), required=False)
+    acknowledgements = fields.Nested(AcknowledgementsSchema, required=False)
+    repass_location = fields.Nested(RepassLocationSchema, required=False)
+    photos = fields.List(fields.Nested(PhotoMetadataSchema), required=False)
+    burial_location = fields.Nested(BurialLocationSchema, required=False)
+
+
 @memorials_bp.route('/', methods=['POST'])
 def create_memorial():
     """Create a new memorial"""
@@ -58,7 +89,7 @@ def create_memorial():
         )
         
         db.session.add(memorial)
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Memorial created successfully',
@@ -73,10 +104,11 @@ def create_memorial():
 
 
 @memorials_bp.route('/<memorial_id>', methods=['GET'])
+@conditional_memorial
 def get_memorial(memorial_id):
     """Get memorial by ID"""
     try:
-        memorial = Memorial.query.get(memorial_id)
+        memorial = Memorial.find_active(memorial_id)
         if not memorial:
             return jsonify({'error': 'Memorial not found'}), 404
         
@@ -106,7 +138,7 @@ def get_memorial(memorial_id):
 def update_memorial(memorial_id):
     """Update memorial information"""
     try:
-        memorial = Memorial.query.get(memorial_id)
+        memorial = Memorial.find_active(memorial_id)
         if not memorial:
             return jsonify({'error': 'Memorial not found'}), 404
         
@@ -127,11 +159,18 @@ def update_memorial(memorial_id):
         schema = MemorialUpdateSchema()
         data = schema.load(request.get_json())
         
+        # The column stores the enum; the API speaks its values
+        if 'status' in data:
+            try:
+                data['status'] = MemorialStatus(data['status'])
+            except ValueError:
+                return jsonify({'errors': {'status': [f"Unknown status: {data['status']}"]}}), 400
+        
         for key, value in data.items():
             if hasattr(memorial, key):
                 setattr(memorial, key, value)
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Memorial updated successfully',
@@ -145,16 +184,50 @@ def update_memorial(memorial_id):
         return jsonify({'error': 'Failed to update memorial'}), 500
 
 
+def encode_cursor(key):
+    """Turn an (updated_at, id) pagination key into an opaque cursor"""
+    updated_at, memorial_id = key
+    raw = f'{updated_at.isoformat()}|{memorial_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Turn a cursor back into an (updated_at, id) key; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        updated_at, memorial_id = raw.split('|', 1)
+        return datetime.fromisoformat(updated_at), memorial_id
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
 @memorials_bp.route('/', methods=['GET'])
 @jwt_required()
 def list_memorials():
-    """List memorials for authenticated user"""
+    """List memorials for authenticated user, newest first.
+    
+    Returns every memorial unless the client asks for pages with `limit` or
+    `cursor` (keyset paginated, follow next_cursor).
+    """
     try:
         user_id = get_jwt_identity()
-        memorials = Memorial.find_by_user(user_id)
+        
+        limit = None
+        if 'limit' in request.args or 'cursor' in request.args:
+            limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+        
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        memorials, last_key = Memorial.list_summaries_for_user(user_id, limit=limit, after=after)
         
         return jsonify({
-            'memorials': [memorial.to_dict() for memorial in memorials]
+            'memorials': memorials,
+            'next_cursor': encode_cursor(last_key) if last_key else None
         }), 200
         
     except Exception as e:
@@ -165,7 +238,7 @@ def list_memorials():
 def delete_memorial(memorial_id):
     """Delete a memorial"""
     try:
-        memorial = Memorial.query.get(memorial_id)
+        memorial = Memorial.find_active(memorial_id)
         if not memorial:
             return jsonify({'error': 'Memorial not found'}), 404
         
@@ -182,8 +255,9 @@ def delete_memorial(memorial_id):
         if not (memorial.user_id == user_id or memorial.guest_session == guest_session):
             return jsonify({'error': 'Access denied'}), 403
         
-        db.session.delete(memorial)
-        db.session.commit()
+        # Only flag it here; the purger removes the rows and uploaded files
+        memorial.soft_delete()
+        db.session.flush()
         
         return jsonify({'message': 'Memorial deleted successfully'}), 200
         
@@ -196,7 +270,7 @@ def delete_memorial(memorial_id):
 def mark_step_completed(memorial_id, step_name):
     """Mark a step as completed"""
     try:
-        memorial = Memorial.query.get(memorial_id)
+        memorial = Memorial.find_active(memorial_id)
         if not memorial:
             return jsonify({'error': 'Memorial not found'}), 404
         
@@ -214,7 +288,10 @@ def mark_step_completed(memorial_id, step_name):
             return jsonify({'error': 'Access denied'}), 403
         
         # Add step to completed steps
-        memorial.add_completed_step(step_name)
+        try:
+            memorial.add_completed_step(step_name)
+        except ValueError:
+            return jsonify({'error': f'Unknown step: {step_name}'}), 400
         
         # Update current step to next step
         next_step = memorial.get_next_step()
@@ -223,7 +300,7 @@ def mark_step_completed(memorial_id, step_name):
         else:
             memorial.status = MemorialStatus.COMPLETED
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': f'Step {step_name} marked as completed',
@@ -232,4 +309,44 @@ def mark_step_completed(memorial_id, step_name):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': 'Failed to update step'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to update step'}), 500
+
+
+@memorials_bp.route('/<memorial_id>/program', methods=['PUT'])
+def save_memorial_program(memorial_id):
+    """Save all program sections of a memorial in one request"""
+    try:
+        memorial = Memorial.find_active(memorial_id)
+        if not memorial:
+            return jsonify({'error': 'Memorial not found'}), 404
+        
+        # Check access permissions
+        user_id = None
+        try:
+            from flask_jwt_extended import verify_jwt_in_request
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except:
+            pass
+        
+        guest_session = request.headers.get('X-Guest-Session')
+        if not (memorial.user_id == user_id or memorial.guest_session == guest_session):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        # Validate every section before writing any of them
+        schema = ProgramSchema()
+        data = schema.load(request.get_json() or {})
+        
+        save_program(memorial, data)
+        db.session.flush()
+        
+        return jsonify({
+            'message': 'Program saved successfully',
+            'memorial': memorial.to_dict(include_relations=True)
+        }), 200
+        
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to save program'}), 500
@@ -5,7 +5,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
-from app.models.program import Obituary
+from app.models.program import Obituary, upsert_section
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 obituaries_bp = Blueprint('obituaries', __name__, url_prefix='/api/obituaries')
@@ -25,7 +26,7 @@ class ObituarySchema(Schema):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -58,21 +59,8 @@ def save_obituary(memorial_id):
         schema = ObituarySchema()
         data = schema.load(request.get_json())
         
-        # Check if obituary already exists
-        existing_obituary = Obituary.find_by_memorial(memorial_id)
-        
-        if existing_obituary:
-            # Update existing obituary
-            for key, value in data.items():
-                setattr(existing_obituary, key, value)
-            obituary = existing_obituary
-        else:
-            # Create new obituary
-            obituary = Obituary(
-                memorial_id=memorial_id,
-                **data
-            )
-            db.session.add(obituary)
+        # Insert or update in one statement (safe against double submits)
+        obituary = upsert_section(Obituary, memorial_id, data)
         
         # Update memorial progress
         memorial.add_completed_step('obituary')
@@ -81,7 +69,7 @@ def save_obituary(memorial_id):
         if data.get('full_name') and not memorial.deceased_name:
             memorial.deceased_name = data['full_name']
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Obituary saved successfully',
@@ -97,6 +85,7 @@ def save_obituary(memorial_id):
 
 
 @obituaries_bp.route('/<memorial_id>/obituary', methods=['GET'])
+@conditional_memorial
 def get_obituary(memorial_id):
     """Get obituary data for a memorial"""
     try:
@@ -135,11 +124,10 @@ def delete_obituary(memorial_id):
             return jsonify({'error': 'Obituary not found'}), 404
         
         # Remove obituary from completed steps
-        if 'obituary' in memorial.completed_steps:
-            memorial.completed_steps.remove('obituary')
+        memorial.remove_completed_step('obituary')
         
         db.session.delete(obituary)
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({'message': 'Obituary deleted successfully'}), 200
         
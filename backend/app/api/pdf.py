@@ -3,25 +3,30 @@ from flask import Blueprint, request, jsonify, current_app
 from app.models.program import Obituary, Speech, Acknowledgements, BodyViewing, RepassLocation, BurialLocation, Photo
 from app.models.memorial import Memorial
 from app import db
+from app.services.rate_limiter import rate_limit
+from app.utils.conditional import conditional_memorial
+from app.utils.async_files import read_files
 import logging
 import os
 import base64
 
-def encode_image_to_base64(file_path):
-    """Convert image file to base64 string"""
+def encode_image_to_base64(file_path, data=None):
+    """Convert image file (or its bytes, when already read) to base64 string"""
     try:
-        with open(file_path, 'rb') as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-            # Detect file extension for proper mime type
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext in ['.jpg', '.jpeg']:
-                return f"data:image/jpeg;base64,{encoded_string}"
-            elif ext == '.png':
-                return f"data:image/png;base64,{encoded_string}"
-            elif ext == '.gif':
-                return f"data:image/gif;base64,{encoded_string}"
-            else:
-                return f"data:image/png;base64,{encoded_string}"  # default to png
+        if data is None:
+            with open(file_path, 'rb') as image_file:
+                data = image_file.read()
+        encoded_string = base64.b64encode(data).decode('utf-8')
+        # Detect file extension for proper mime type
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in ['.jpg', '.jpeg']:
+            return f"data:image/jpeg;base64,{encoded_string}"
+        elif ext == '.png':
+            return f"data:image/png;base64,{encoded_string}"
+        elif ext == '.gif':
+            return f"data:image/gif;base64,{encoded_string}"
+        else:
+            return f"data:image/png;base64,{encoded_string}"  # default to png
     except Exception as e:
         print(f"Error encoding image: {e}")
         return None
@@ -89,21 +94,27 @@ def collect_memorial_data(memorial):
         
     # Get photos data
     photos = Photo.find_by_memorial(memorial.id)
+    memorial_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], f"memorial_{memorial.id}")
+    file_paths = [os.path.join(memorial_dir, photo.filename) for photo in photos]
+
+    # Read every image at once instead of one after another
+    contents = read_files(file_paths)
+
     photos_data = []
-    for photo in photos:
+    for photo, file_path, data in zip(photos, file_paths, contents):
         photo_dict = photo.to_dict()
-        
+
         # Generate base64 version of the image
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"memorial_{memorial.id}", photo.filename)
-        photo_dict['base64_url'] = encode_image_to_base64(file_path)
-        
+        photo_dict['base64_url'] = encode_image_to_base64(file_path, data) if data is not None else None
+
         photos_data.append(photo_dict)
 
     memorial_data['photos'] = photos_data
-    
+
     return memorial_data
 
 @pdf_bp.route('/<memorial_id>/generate', methods=['POST'])
+@rate_limit('pdf')
 def generate_memorial_pdf(memorial_id):
     """Generate PDF for a memorial by collecting all related data"""
     try:
@@ -151,6 +162,8 @@ def generate_memorial_pdf(memorial_id):
         }), 500
 
 @pdf_bp.route('/<memorial_id>/data', methods=['GET'])
+@rate_limit('pdf')
+@conditional_memorial
 def get_memorial_data(memorial_id):
     """Get all memorial data for review (without generating PDF)"""
     try:
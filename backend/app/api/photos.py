@@ -7,6 +7,9 @@ from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
 from app.models.program import Photo
+from app.services.rate_limiter import rate_limit
+from app.utils.conditional import conditional_memorial
+from app.utils.async_files import write_files
 
 # Create blueprint
 photos_bp = Blueprint('photos', __name__, url_prefix='/api/photos')
@@ -35,7 +38,7 @@ def allowed_file(filename):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -55,6 +58,7 @@ def check_memorial_access(memorial_id):
     return memorial, None, None
 
 @photos_bp.route('/<memorial_id>/photos', methods=['POST'])
+@rate_limit('upload')
 def upload_photos(memorial_id):
     """Upload photos for a memorial"""
     try:
@@ -75,10 +79,12 @@ def upload_photos(memorial_id):
         photo_type = request.form.get('photo_type', 'gallery')
         
         uploaded_photos = []
+        pending_files = []
         upload_dir = current_app.config['UPLOAD_FOLDER']
         
-        # Create memorial-specific subdirectory
-        memorial_dir = os.path.join(upload_dir, f'memorial_{memorial_id}')
+        # Create memorial-specific subdirectory, named after the canonical id
+        # (the purger removes exactly that one)
+        memorial_dir = os.path.join(upload_dir, f'memorial_{memorial.id}')
         if not os.path.exists(memorial_dir):
             os.makedirs(memorial_dir)
         
@@ -105,17 +111,17 @@ def upload_photos(memorial_id):
                 file_extension = original_filename.rsplit('.', 1)[1].lower()
                 unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
                 
-                # Save file
+                # Saved together once every file has been validated
                 file_path = os.path.join(memorial_dir, unique_filename)
-                file.save(file_path)
-                
+                pending_files.append((file_path, file.stream))
+
                 # Create file URL with proper base URL
                 base_url = get_base_url()
-                file_url = f"{base_url}/uploads/memorial_{memorial_id}/{unique_filename}"
+                file_url = f"{base_url}/uploads/memorial_{memorial.id}/{unique_filename}"
                 
                 # Create photo record in database
                 photo = Photo(
-                    memorial_id=memorial_id,
+                    memorial_id=memorial.id,
                     filename=unique_filename,
                     original_filename=original_filename,
                     file_url=file_url,
@@ -125,11 +131,14 @@ def upload_photos(memorial_id):
                 db.session.add(photo)
                 uploaded_photos.append(photo)
         
+        # Stream every upload to disk (concurrently under the ASGI server)
+        write_files(pending_files)
+
         # Update memorial progress if this is the first photo upload
         if uploaded_photos:
             memorial.add_completed_step('photos')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': f'Successfully uploaded {len(uploaded_photos)} photo(s)',
@@ -142,6 +151,7 @@ def upload_photos(memorial_id):
         return jsonify({'error': f'Failed to upload photos: {str(e)}'}), 500
 
 @photos_bp.route('/<memorial_id>/photos', methods=['GET'])
+@conditional_memorial
 def get_photos(memorial_id):
     """Get photos for a memorial"""
     try:
@@ -185,7 +195,7 @@ def delete_photo(memorial_id, photo_id):
         
         # Delete file from filesystem
         upload_dir = current_app.config['UPLOAD_FOLDER']
-        file_path = os.path.join(upload_dir, f'memorial_{memorial_id}', photo.filename)
+        file_path = os.path.join(upload_dir, f'memorial_{memorial.id}', photo.filename)
         
         if os.path.exists(file_path):
             os.remove(file_path)
@@ -197,10 +207,9 @@ def delete_photo(memorial_id, photo_id):
         remaining_photos = Photo.find_by_memorial(memorial_id)
         if not remaining_photos:
             # Remove photos from completed steps if no photos remain
-            if 'photos' in memorial.completed_steps:
-                memorial.completed_steps.remove('photos')
+            memorial.remove_completed_step('photos')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Photo deleted successfully',
@@ -0,0 +1,38 @@
+# app/api/public.py
+from flask import Blueprint, request, jsonify, current_app
+from app.services.public_snapshots import public_snapshots, surrogate_key
+from app.services.rate_limiter import rate_limit
+
+# Create blueprint
+public_bp = Blueprint('public', __name__, url_prefix='/api/public')
+
+
+def _set_cache_headers(response, memorial_id):
+    """Let browsers and the CDN cache the response; an edit purges it by surrogate key"""
+    response.headers['Cache-Control'] = public_snapshots.cache_control()
+    response.headers['Surrogate-Key'] = surrogate_key(memorial_id)
+    return response
+
+
+@public_bp.route('/memorials/<memorial_id>', methods=['GET'])
+@rate_limit('public')
+def get_public_memorial(memorial_id):
+    """Read-only program of a published memorial (no authentication)"""
+    try:
+        snapshot = public_snapshots.get(memorial_id)
+    except Exception as e:
+        return jsonify({'error': 'Failed to get memorial'}), 500
+
+    if snapshot is None:
+        # Cached too: publishing the memorial purges its key
+        response = jsonify({'error': 'Memorial not found'})
+        response.status_code = 404
+        return _set_cache_headers(response, memorial_id)
+
+    etag, body = snapshot
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return _set_cache_headers(response, memorial_id)
@@ -3,7 +3,8 @@ from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
-from app.models.program import RepassLocation
+from app.models.program import RepassLocation, upsert_section
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 repass_bp = Blueprint('repass', __name__, url_prefix='/api/repass')
@@ -19,7 +20,7 @@ class RepassLocationSchema(Schema):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -51,26 +52,13 @@ def save_repass_location(memorial_id):
         schema = RepassLocationSchema()
         data = schema.load(request.get_json())
         
-        # Check if repass location already exists
-        existing = RepassLocation.find_by_memorial(memorial_id)
-        
-        if existing:
-            # Update existing repass location
-            for key, value in data.items():
-                setattr(existing, key, value)
-            repass_location = existing
-        else:
-            # Create new repass location
-            repass_location = RepassLocation(
-                memorial_id=memorial_id,
-                **data
-            )
-            db.session.add(repass_location)
+        # Insert or update in one statement (safe against double submits)
+        repass_location = upsert_section(RepassLocation, memorial_id, data)
         
         # Update memorial progress
         memorial.add_completed_step('repass_location')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': 'Repass location saved successfully',
@@ -85,6 +73,7 @@ def save_repass_location(memorial_id):
         return jsonify({'error': f'Failed to save repass location: {str(e)}'}), 500
 
 @repass_bp.route('/<memorial_id>/repass', methods=['GET'])
+@conditional_memorial
 def get_repass_location(memorial_id):
     """Get repass location for a memorial"""
     try:
@@ -120,11 +109,10 @@ def delete_repass_location(memorial_id):
             return jsonify({'error': 'Repass location not found'}), 404
         
         # Remove repass location from completed steps
-        if 'repass_location' in memorial.completed_steps:
-            memorial.completed_steps.remove('repass_location')
+        memorial.remove_completed_step('repass_location')
         
         db.session.delete(repass_location)
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({'message': 'Repass location deleted successfully'}), 200
         
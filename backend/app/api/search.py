@@ -0,0 +1,99 @@
+# app/api/search.py
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from app.services.autocomplete import memorial_autocomplete
+from app.services.rate_limiter import rate_limit
+from app.services.search import obituary_search
+
+# Create blueprint
+search_bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+# Result page limits
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_QUERY_LENGTH = 200
+MAX_SUGGESTIONS = 20
+
+
+def get_caller():
+    """Return (user_id, guest_session) for the current request"""
+    user_id = None
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except:
+        pass
+
+    return user_id, request.headers.get('X-Guest-Session')
+
+
+@search_bp.route('/memorials', methods=['GET'])
+def search_memorials():
+    """Full-text search over the caller's obituaries (names, birthplace, life story, survivors)"""
+    try:
+        query = (request.args.get('q') or '').strip()
+        if not query:
+            return jsonify({'error': 'Search query is required'}), 400
+        if len(query) > MAX_QUERY_LENGTH:
+            return jsonify({'error': f'Search query is limited to {MAX_QUERY_LENGTH} characters'}), 400
+
+        user_id, guest_session = get_caller()
+        if not user_id and not guest_session:
+            return jsonify({'error': 'Either authentication or guest session is required'}), 401
+
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        page = max(1, request.args.get('page', 1, type=int))
+
+        results, has_more = obituary_search.search(
+            query,
+            user_id=user_id,
+            guest_session=guest_session,
+            limit=limit,
+            offset=(page - 1) * limit
+        )
+
+        return jsonify({
+            'results': results,
+            'page': page,
+            'limit': limit,
+            'has_more': has_more
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to search memorials'}), 500
+
+
+@search_bp.route('/autocomplete', methods=['GET'])
+@rate_limit('autocomplete')
+def autocomplete_memorials():
+    """Type-ahead suggestions from the caller's memorial names and titles"""
+    try:
+        query = (request.args.get('q') or '').strip()[:MAX_QUERY_LENGTH]
+
+        user_id, guest_session = get_caller()
+        if not user_id and not guest_session:
+            return jsonify({'error': 'Either authentication or guest session is required'}), 401
+
+        limit = request.args.get('limit', 10, type=int)
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+
+        suggestions = []
+        if query:
+            suggestions = memorial_autocomplete.suggest(
+                query,
+                user_id=user_id,
+                guest_session=guest_session,
+                limit=limit
+            )
+
+        response = jsonify({'query': query, 'suggestions': suggestions})
+        # Let the browser reuse answers while the user types and backspaces
+        max_age = current_app.config.get('AUTOCOMPLETE_CACHE_SECONDS', 30)
+        response.headers['Cache-Control'] = f'private, max-age={max_age}'
+        response.vary.add('Authorization')
+        response.vary.add('X-Guest-Session')
+        return response, 200
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to load suggestions'}), 500
@@ -4,12 +4,14 @@ from marshmallow import Schema, fields, ValidationError
 from app import db
 from app.models.memorial import Memorial
 from app.models.program import Speech
+from app.utils.conditional import conditional_memorial
 
 # Create blueprint
 speeches_bp = Blueprint('speeches', __name__, url_prefix='/api/speeches')
 
 class SpeechSchema(Schema):
     """Schema for speech validation"""
+    id = fields.Str(required=False, allow_none=True)  # Existing speech to update
     speaker_name = fields.Str(required=True)
     relationship = fields.Str(required=False, allow_none=True)
     speech_type = fields.Str(required=True)  # introduction, prayer, eulogy, closing
@@ -18,7 +20,7 @@ class SpeechSchema(Schema):
 
 def check_memorial_access(memorial_id):
     """Helper function to check if user can access memorial"""
-    memorial = Memorial.query.get(memorial_id)
+    memorial = Memorial.find_active(memorial_id)
     if not memorial:
         return None, jsonify({'error': 'Memorial not found'}), 404
     
@@ -52,27 +54,18 @@ def save_speeches(memorial_id):
             # Handle single speech or convert to array
             data = [data] if data else []
         
-        # Clear existing speeches for this memorial
-        Speech.query.filter_by(memorial_id=memorial_id).delete()
-        
-        speeches = []
+        # Validate every speech before changing anything
         schema = SpeechSchema()
+        speeches_data = [schema.load(speech_data) for speech_data in data]
         
-        for i, speech_data in enumerate(data):
-            validated_data = schema.load(speech_data)
-        
-            
-            speech = Speech(
-                memorial_id=memorial_id,
-                **validated_data
-            )
-            db.session.add(speech)
-            speeches.append(speech)
+        # Update, insert and delete only what differs from the stored list
+        Speech.sync_for_memorial(memorial_id, speeches_data)
         
         # Update memorial progress
         memorial.add_completed_step('speeches')
         
-        db.session.commit()
+        db.session.flush()
+        speeches = Speech.find_by_memorial(memorial_id)
         
         return jsonify({
             'message': 'Speeches saved successfully',
@@ -87,6 +80,7 @@ def save_speeches(memorial_id):
         return jsonify({'error': f'Failed to save speeches: {str(e)}'}), 500
 
 @speeches_bp.route('/<memorial_id>/speeches', methods=['GET'])
+@conditional_memorial
 def get_speeches(memorial_id):
     """Get speech assignments for a memorial"""
     try:
@@ -116,12 +110,12 @@ def delete_speeches(memorial_id):
         
         # Delete all speeches for this memorial
         deleted_count = Speech.query.filter_by(memorial_id=memorial_id).delete()
+        Memorial.touch(memorial.id)
         
         # Remove speeches from completed steps
-        if 'speeches' in memorial.completed_steps:
-            memorial.completed_steps.remove('speeches')
+        memorial.remove_completed_step('speeches')
         
-        db.session.commit()
+        db.session.flush()
         
         return jsonify({
             'message': f'Successfully deleted {deleted_count} speeches'
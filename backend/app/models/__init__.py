@@ -8,6 +8,8 @@ from .program import Acknowledgements
 from .program import BodyViewing
 from .program import RepassLocation
 from .program import BurialLocation
+from .revoked_token import RevokedToken
+from .published_snapshot import PublishedSnapshot
 
 __all__ = [
     'User',
@@ -19,5 +21,7 @@ __all__ = [
     'Acknowledgements',
     'BodyViewing',
     'RepassLocation',
-    'BurialLocation'
+    'BurialLocation',
+    'RevokedToken',
+    'PublishedSnapshot'
 ]
\ No newline at end of file
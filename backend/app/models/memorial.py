@@ -1,8 +1,57 @@
 # app/models/memorial.py
-import uuid
 from datetime import datetime
 from enum import Enum
+from itertools import chain
+from sqlalchemy import event, inspect
+from sqlalchemy.orm.attributes import set_committed_value
 from app import db
+from app.models.types import GUID, new_id
+from app.services.db_routing import RoutingSession
+
+
+# Order in which the wizard walks through the program sections
+STEP_SEQUENCE = [
+    'obituary',
+    'body_viewing',
+    'speeches',
+    'acknowledgements',
+    'repass_location',
+    'photos',
+    'burial_location'
+]
+
+
+# Each step owns one bit of Memorial.steps_mask
+STEP_BITS = {step: 1 << index for index, step in enumerate(STEP_SEQUENCE)}
+ALL_STEPS_MASK = (1 << len(STEP_SEQUENCE)) - 1
+
+
+def steps_from_mask(steps_mask):
+    """List of completed step names (in sequence order) for a bitmask"""
+    return [step for step in STEP_SEQUENCE if steps_mask & STEP_BITS[step]]
+
+
+def progress_percentage(steps_mask):
+    """Completion percentage for a bitmask of completed steps"""
+    return int((bin(steps_mask & ALL_STEPS_MASK).count('1') / len(STEP_SEQUENCE)) * 100)
+
+
+def next_step(steps_mask):
+    """First step in the sequence that is not completed yet"""
+    remaining = ~steps_mask & ALL_STEPS_MASK
+    if not remaining:
+        return None  # All steps completed
+    # Lowest unset bit
+    return STEP_SEQUENCE[(remaining & -remaining).bit_length() - 1]
+
+
+def mark_changed(session, memorial_id):
+    """Remember that a memorial changed in the session's current transaction.
+    
+    The ids are read (and cleared) when the transaction ends; the public
+    snapshots use them to re-render and purge published memorials.
+    """
+    session.info.setdefault('changed_memorials', set()).add(memorial_id)
 
 
 class MemorialStatus(Enum):
@@ -17,18 +66,33 @@ class Memorial(db.Model):
     """Memorial model representing a funeral/memorial program"""
     
     __tablename__ = 'memorials'
+    __table_args__ = (
+        # Serves keyset pagination of a user's memorials (newest first); partial,
+        # so soft-deleted rows waiting for the purger stay out of it
+        db.Index('ix_memorials_user_updated_active', 'user_id', 'updated_at', 'id',
+                 postgresql_where=db.text('deleted_at IS NULL'),
+                 sqlite_where=db.text('deleted_at IS NULL')),
+        # Lets the retention job find stale guest drafts (no owner) by age
+        db.Index('ix_memorials_guest_updated', 'updated_at',
+                 postgresql_where=db.text('user_id IS NULL'),
+                 sqlite_where=db.text('user_id IS NULL')),
+        # Lets the purger find soft-deleted rows without scanning live ones
+        db.Index('ix_memorials_deleted_at', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL'),
+                 sqlite_where=db.text('deleted_at IS NOT NULL')),
+    )
     
     # Primary Key
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     
     # User Association (can be null for guest users)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True, index=True)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=True)
     guest_session = db.Column(db.String(255), nullable=True, index=True)  # For anonymous users
     
     # Memorial Status
     status = db.Column(db.Enum(MemorialStatus), default=MemorialStatus.DRAFT, nullable=False)
     current_step = db.Column(db.String(50), default='obituary', nullable=False)
-    completed_steps = db.Column(db.JSON, default=list, nullable=False)
+    steps_mask = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # See STEP_BITS
     
     # Basic Memorial Information
     title = db.Column(db.String(200), nullable=True)
@@ -37,6 +101,7 @@ class Memorial(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Soft delete; the purger removes the rows
     
     # Generated Files
     pdf_url = db.Column(db.String(500), nullable=True)
@@ -49,7 +114,7 @@ class Memorial(db.Model):
                                      cascade='all, delete-orphan', passive_deletes=True)
     photos = db.relationship('Photo', backref='memorial', 
                            cascade='all, delete-orphan', passive_deletes=True)
-    speeches = db.relationship('Speech', backref='memorial',
+    speeches = db.relationship('Speech', backref='memorial', order_by='[Speech.position, Speech.id]',
                              cascade='all, delete-orphan', passive_deletes=True)
     body_viewing = db.relationship('BodyViewing', backref='memorial', uselist=False,
                                  cascade='all, delete-orphan', passive_deletes=True)
@@ -61,41 +126,83 @@ class Memorial(db.Model):
     def __init__(self, **kwargs):
         """Initialize memorial"""
         super(Memorial, self).__init__(**kwargs)
-        if not self.completed_steps:
-            self.completed_steps = []
+        if self.steps_mask is None:
+            self.steps_mask = 0
+    
+    @property
+    def completed_steps(self):
+        """Completed step names, derived from the bitmask"""
+        return steps_from_mask(self.steps_mask)
+    
+    def _update_steps_mask(self, sql_update, python_update):
+        """Change steps_mask atomically in SQL for stored rows.
+        
+        Stored rows get UPDATE memorials SET steps_mask = steps_mask | :bit
+        ... RETURNING steps_mask right away, so concurrent saves of different
+        sections never overwrite each other and the new mask is known without
+        reading the row back (the ORM would expire it after the flush).
+        """
+        state = db.inspect(self)
+        if not state.persistent:
+            self.steps_mask = python_update(self.steps_mask or 0)
+            return
+        
+        if db.session.get_bind().dialect.update_returning:
+            table = Memorial.__table__
+            row = db.session.execute(
+                db.update(table)
+                .where(table.c.id == self.id)
+                .values(steps_mask=sql_update(table.c.steps_mask), updated_at=datetime.utcnow())
+                .returning(table.c.steps_mask, table.c.updated_at)
+            ).one()
+            set_committed_value(self, 'steps_mask', row.steps_mask)
+            set_committed_value(self, 'updated_at', row.updated_at)
+            mark_changed(db.session, self.id)
+            return
+        
+        # No RETURNING: the flush sends the expression; stack onto one not flushed yet
+        current = state.dict.get('steps_mask')
+        base = current if isinstance(current, db.ColumnElement) else Memorial.steps_mask
+        self.steps_mask = sql_update(base)
     
     def add_completed_step(self, step_name):
-        """Add a step to completed steps list"""
-        if step_name not in self.completed_steps:
-            self.completed_steps.append(step_name)
-            db.session.commit()
+        """Mark a step as completed (staged; committed with the request)"""
+        bit = STEP_BITS.get(step_name)
+        if bit is None:
+            raise ValueError(f'Unknown step: {step_name}')
+        
+        self._update_steps_mask(lambda mask: mask.bitwise_or(bit), lambda mask: mask | bit)
+    
+    def remove_completed_step(self, step_name):
+        """Mark a step as not completed"""
+        bit = STEP_BITS.get(step_name)
+        if bit is None:
+            raise ValueError(f'Unknown step: {step_name}')
+        
+        keep = ALL_STEPS_MASK & ~bit
+        self._update_steps_mask(lambda mask: mask.bitwise_and(keep), lambda mask: mask & keep)
     
     def is_step_completed(self, step_name):
         """Check if a step is completed"""
-        return step_name in self.completed_steps
+        return bool(self.steps_mask & STEP_BITS.get(step_name, 0))
     
     def get_progress_percentage(self):
         """Calculate completion percentage"""
-        total_steps = 7  # obituary, acknowledgements, photos, speeches, body_viewing, repass_location, burial_location
-        return int((len(self.completed_steps) / total_steps) * 100)
+        return progress_percentage(self.steps_mask)
     
     def get_next_step(self):
         """Get the next step in the memorial creation process"""
-        step_sequence = [
-            'obituary',
-            'body_viewing',
-            'speeches',
-            'acknowledgements',
-            'repass_location',
-            'photos',
-            'burial_location'
-        ]
-        
-        for step in step_sequence:
-            if step not in self.completed_steps:
-                return step
-        
-        return None  # All steps completed
+        return next_step(self.steps_mask)
+    
+    @property
+    def is_deleted(self):
+        """Whether the memorial is soft-deleted and waiting to be purged"""
+        return self.deleted_at is not None
+    
+    def soft_delete(self):
+        """Hide the memorial from every read; its rows and files are purged later"""
+        if self.deleted_at is None:
+            self.deleted_at = datetime.utcnow()
     
     def can_generate_pdf(self):
         """Check if memorial has minimum required data for PDF generation"""
@@ -103,7 +210,7 @@ class Memorial(db.Model):
         return self.obituary is not None
     
     def to_dict(self, include_relations=False):
-        """Convert memorial to dictionary"""
+        """Convert memorial to dictionary (timestamps stay datetimes; the JSON provider formats them)"""
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -113,10 +220,10 @@ class Memorial(db.Model):
             'completed_steps': self.completed_steps,
             'title': self.title,
             'deceased_name': self.deceased_name,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'pdf_url': self.pdf_url,
-            'pdf_generated_at': self.pdf_generated_at.isoformat() if self.pdf_generated_at else None,
+            'pdf_generated_at': self.pdf_generated_at,
             'progress_percentage': self.get_progress_percentage(),
             'next_step': self.get_next_step(),
             'can_generate_pdf': self.can_generate_pdf()
@@ -135,15 +242,156 @@ class Memorial(db.Model):
         
         return data
     
+    @staticmethod
+    def touch(memorial_id):
+        """Bump updated_at after a change to one of the memorial's sections.
+        
+        Keeps updated_at the version of the memorial and everything under it,
+        which the conditional GETs rely on. A memorial loaded in the session is
+        stamped in memory and goes out with its next flush; otherwise this is
+        one UPDATE by primary key. ORM changes to sections call it from a flush
+        hook; Core/bulk writes call it themselves.
+        """
+        now = datetime.utcnow()
+        mark_changed(db.session, memorial_id)
+        memorial = db.session.identity_map.get(db.session.identity_key(Memorial, memorial_id))
+        if memorial is not None:
+            memorial.updated_at = now
+            return
+        
+        table = Memorial.__table__
+        db.session.execute(db.update(table).where(table.c.id == memorial_id).values(updated_at=now))
+    
+    @staticmethod
+    def version_of(memorial_id):
+        """(user_id, guest_session, updated_at) of a live memorial without loading it, or None"""
+        return db.session.query(
+            Memorial.user_id, Memorial.guest_session, Memorial.updated_at
+        ).filter(Memorial.id == memorial_id, Memorial.deleted_at.is_(None)).first()
+    
+    @staticmethod
+    def find_active(memorial_id):
+        """Memorial by ID, or None if it does not exist or is soft-deleted"""
+        memorial = db.session.get(Memorial, memorial_id)
+        if memorial is None or memorial.deleted_at is not None:
+            return None
+        return memorial
+    
     @staticmethod
     def find_by_user(user_id):
         """Find all memorials for a user"""
-        return Memorial.query.filter_by(user_id=user_id).order_by(Memorial.updated_at.desc()).all()
+        return Memorial.query.filter_by(user_id=user_id, deleted_at=None).order_by(Memorial.updated_at.desc()).all()
+    
+    @staticmethod
+    def list_summaries_for_user(user_id, limit=50, after=None):
+        """Page through a user's memorials newest first.
+        
+        Uses keyset pagination on (updated_at, id) over ix_memorials_user_updated_active
+        and selects plain columns, so no ORM objects or relationships are loaded.
+        `after` is the (updated_at, id) of the last row of the previous page;
+        limit=None returns every row. Returns (summaries, last_key) where
+        last_key is None on the final page.
+        """
+        from app.models.program import Obituary
+        
+        has_obituary = db.exists().where(Obituary.memorial_id == Memorial.id)
+        query = db.session.query(
+            Memorial.id,
+            Memorial.user_id,
+            Memorial.guest_session,
+            Memorial.status,
+            Memorial.current_step,
+            Memorial.steps_mask,
+            Memorial.title,
+            Memorial.deceased_name,
+            Memorial.created_at,
+            Memorial.updated_at,
+            Memorial.pdf_url,
+            Memorial.pdf_generated_at,
+            has_obituary.label('has_obituary')
+        ).filter(Memorial.user_id == user_id, Memorial.deleted_at.is_(None))
+        
+        if after is not None:
+            query = query.filter(db.tuple_(Memorial.updated_at, Memorial.id) < after)
+        
+        query = query.order_by(Memorial.updated_at.desc(), Memorial.id.desc())
+        if limit is None:
+            return [Memorial.summary_to_dict(row) for row in query.all()], None
+        rows = query.limit(limit + 1).all()
+        
+        last_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_key = (rows[-1].updated_at, rows[-1].id)
+        
+        return [Memorial.summary_to_dict(row) for row in rows], last_key
+    
+    @staticmethod
+    def summary_to_dict(row):
+        """Convert a row from list_summaries_for_user to the to_dict() shape"""
+        steps_mask = row.steps_mask or 0
+        return {
+            'id': row.id,
+            'user_id': row.user_id,
+            'guest_session': row.guest_session,
+            'status': row.status.value,
+            'current_step': row.current_step,
+            'completed_steps': steps_from_mask(steps_mask),
+            'title': row.title,
+            'deceased_name': row.deceased_name,
+            'created_at': row.created_at,
+            'updated_at': row.updated_at,
+            'pdf_url': row.pdf_url,
+            'pdf_generated_at': row.pdf_generated_at,
+            'progress_percentage': progress_percentage(steps_mask),
+            'next_step': next_step(steps_mask),
+            'can_generate_pdf': bool(row.has_obituary)
+        }
     
     @staticmethod
     def find_by_guest_session(guest_session):
         """Find memorial by guest session"""
-        return Memorial.query.filter_by(guest_session=guest_session).first()
+        return Memorial.query.filter_by(guest_session=guest_session, deleted_at=None).first()
+    
+    @staticmethod
+    def adopt_guest_memorials(guest_session, user_id):
+        """Assign every unowned memorial of a guest session to a user.
+        
+        Runs as one set-based UPDATE in the caller's transaction. Only rows
+        without an owner match, so repeating it (or racing it) is harmless.
+        """
+        if not guest_session or not user_id:
+            return 0
+        
+        result = db.session.execute(
+            db.update(Memorial)
+            .where(Memorial.guest_session == guest_session, Memorial.user_id.is_(None),
+                   Memorial.deleted_at.is_(None))
+            .values(user_id=user_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
     
     def __repr__(self):
-        return f'<Memorial {self.id}: {self.deceased_name or "Unnamed"}>'
\ No newline at end of file
+        return f'<Memorial {self.id}: {self.deceased_name or "Unnamed"}>'
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _touch_changed_sections(session, flush_context, instances):
+    """Bump the parent memorial of every section added, changed or deleted through the ORM"""
+    changed = list(chain(session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj))))
+    memorial_ids = {
+        obj.memorial_id
+        for obj in changed
+        if not isinstance(obj, Memorial) and getattr(obj, 'memorial_id', None) is not None
+    }
+    for memorial_id in memorial_ids:
+        Memorial.touch(memorial_id)
+    
+    # Edits to the memorial row itself (status, title, soft delete)
+    for obj in changed:
+        if isinstance(obj, Memorial) and obj.id is not None:
+            mark_changed(session, obj.id)
+            if MemorialStatus.PUBLISHED in inspect(obj).attrs.status.load_history().deleted:
+                # Its snapshot has to go even though it is no longer published
+                session.info.setdefault('unpublished_memorials', set()).add(obj.id)
@@ -1,7 +1,10 @@
 # app/models/obituary.py
-import uuid
 from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.attributes import set_committed_value
 from app import db
+from app.models.memorial import Memorial
+from app.models.types import GUID, canonical_id, new_id
 
 
 class Obituary(db.Model):
@@ -10,10 +13,10 @@ class Obituary(db.Model):
     __tablename__ = 'obituaries'
     
     # Primary Key
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     
     # Foreign Key to Memorial
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
                            unique=True, nullable=False)
     
     # Personal Information
@@ -44,15 +47,15 @@ class Obituary(db.Model):
             'id': self.id,
             'memorial_id': self.memorial_id,
             'full_name': self.full_name,
-            'birth_date': self.birth_date.isoformat() if self.birth_date else None,
-            'death_date': self.death_date.isoformat() if self.death_date else None,
+            'birth_date': self.birth_date,
+            'death_date': self.death_date,
             'birth_place': self.birth_place,
             'life_story': self.life_story,
             'survived_by': self.survived_by,
             'preceded_by': self.preceded_by,
             'tone': self.tone,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     @staticmethod
@@ -69,8 +72,8 @@ class Acknowledgements(db.Model):
     """Acknowledgements model"""
     __tablename__ = 'acknowledgements'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
                            unique=True, nullable=False)
     acknowledgment_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -81,8 +84,8 @@ class Acknowledgements(db.Model):
             'id': self.id,
             'memorial_id': self.memorial_id,
             'acknowledgment_text': self.acknowledgment_text,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     @staticmethod
@@ -95,8 +98,8 @@ class Photo(db.Model):
     """Photo model"""
     __tablename__ = 'photos'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255))
     file_url = db.Column(db.String(500), nullable=False)
@@ -111,7 +114,7 @@ class Photo(db.Model):
             'original_filename': self.original_filename,
             'file_url': self.file_url,
             'photo_type': self.photo_type,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
     
     @staticmethod
@@ -123,37 +126,116 @@ class Photo(db.Model):
 class Speech(db.Model):
     """Speech model"""
     __tablename__ = 'speeches'
+    __table_args__ = (
+        # Serves ordered lookups of a memorial's speeches
+        db.Index('ix_speeches_memorial_position', 'memorial_id', 'position'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Order in the program
     speaker_name = db.Column(db.String(200), nullable=False)
     relationship = db.Column(db.String(100))
     speech_type = db.Column(db.String(50))  # introduction, prayer, eulogy, closing
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Fields a client can edit (everything except keys and timestamps)
+    EDITABLE_FIELDS = ('position', 'speaker_name', 'relationship', 'speech_type', 'notes')
+    
     def to_dict(self):
         return {
             'id': self.id,
             'memorial_id': self.memorial_id,
+            'position': self.position,
             'speaker_name': self.speaker_name,
             'relationship': self.relationship,
             'speech_type': self.speech_type,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
     @staticmethod
     def find_by_memorial(memorial_id):
-        """Find all speeches for a memorial"""
-        return Speech.query.filter_by(memorial_id=memorial_id).all()
+        """Find all speeches for a memorial, in program order"""
+        return Speech.query.filter_by(memorial_id=memorial_id).order_by(Speech.position, Speech.id).all()
+    
+    @staticmethod
+    def sync_for_memorial(memorial_id, speeches):
+        """Make a memorial's speeches match `speeches`, in list order.
+        
+        Items carrying the id of an existing speech (in any spelling uuid
+        accepts) update that row (only if something changed); items without a
+        known id, or with a malformed one, are inserted with a new id; existing rows missing from the list are deleted. Each kind of
+        change is one statement: an UPDATE ... FROM (VALUES ...) on Postgres
+        (an executemany UPDATE on SQLite, which runs in-process and cannot
+        alias VALUES columns), a multi-row INSERT and a DELETE ... WHERE id
+        IN (...). Returns the counts of updated, inserted and deleted rows.
+        """
+        table = Speech.__table__
+        existing = {
+            row.id: row for row in db.session.execute(
+                db.select(table.c.id, *[table.c[field] for field in Speech.EDITABLE_FIELDS])
+                .where(table.c.memorial_id == memorial_id)
+            )
+        }
+        
+        updates, inserts, seen = [], [], set()
+        for position, speech in enumerate(speeches):
+            values = {field: speech.get(field) for field in Speech.EDITABLE_FIELDS}
+            values['position'] = position
+            
+            speech_id = canonical_id(speech.get('id'))
+            current = existing.get(speech_id)
+            if current is None or speech_id in seen:
+                inserts.append(dict(values, memorial_id=memorial_id))
+                continue
+            
+            seen.add(speech_id)
+            if any(getattr(current, field) != value for field, value in values.items()):
+                updates.append(dict(values, speech_id=speech_id))
+        
+        removed = [speech_id for speech_id in existing if speech_id not in seen]
+        
+        if removed:
+            db.session.execute(
+                db.delete(table).where(table.c.memorial_id == memorial_id, table.c.id.in_(removed))
+            )
+        if updates and db.session.get_bind().dialect.name == 'postgresql':
+            # psycopg2 runs an executemany as one round trip per row
+            changes = db.values(
+                db.column('speech_id', db.String),
+                *[db.column(field, table.c[field].type) for field in Speech.EDITABLE_FIELDS],
+                name='changes'
+            ).data([
+                (update['speech_id'], *[update[field] for field in Speech.EDITABLE_FIELDS])
+                for update in updates
+            ])
+            db.session.execute(
+                db.update(table)
+                .where(table.c.id == db.cast(changes.c.speech_id, table.c.id.type))
+                .values({field: changes.c[field] for field in Speech.EDITABLE_FIELDS})
+            )
+        elif updates:
+            db.session.execute(
+                db.update(table)
+                .where(table.c.id == db.bindparam('speech_id'))
+                .values({field: db.bindparam(field) for field in Speech.EDITABLE_FIELDS}),
+                updates
+            )
+        if inserts:
+            db.session.execute(db.insert(Speech), inserts)
+        if removed or updates or inserts:
+            Memorial.touch(memorial_id)
+        
+        return len(updates), len(inserts), len(removed)
 
 
 class BodyViewing(db.Model):
     """Body viewing model"""
     __tablename__ = 'body_viewings'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
                            unique=True, nullable=False)
     has_viewing = db.Column(db.Boolean, default=False)
     viewing_date = db.Column(db.Date)
@@ -168,12 +250,12 @@ class BodyViewing(db.Model):
             'id': self.id,
             'memorial_id': self.memorial_id,
             'has_viewing': self.has_viewing,
-            'viewing_date': self.viewing_date.isoformat() if self.viewing_date else None,
+            'viewing_date': self.viewing_date,
             'viewing_start_time': self.viewing_start_time,
             'viewing_end_time': self.viewing_end_time,
             'viewing_location': self.viewing_location,
             'viewing_notes': self.viewing_notes,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
     @staticmethod
     def find_by_memorial(memorial_id):
@@ -185,8 +267,8 @@ class RepassLocation(db.Model):
     """Repass location model"""
     __tablename__ = 'repass_locations'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
                            unique=True, nullable=False)
     has_repass = db.Column(db.Boolean, default=False)
     venue_name = db.Column(db.String(200))
@@ -203,10 +285,10 @@ class RepassLocation(db.Model):
             'has_repass': self.has_repass,
             'venue_name': self.venue_name,
             'repass_address': self.repass_address,
-            'repass_date': self.repass_date.isoformat() if self.repass_date else None,
+            'repass_date': self.repass_date,
             'repass_time': self.repass_time,
             'repass_notes': self.repass_notes,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
     @staticmethod
     def find_by_memorial(memorial_id):  
@@ -218,8 +300,8 @@ class BurialLocation(db.Model):
     """Burial location model"""
     __tablename__ = 'burial_locations'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    memorial_id = db.Column(db.String(36), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), 
                            unique=True, nullable=False)
     burial_type = db.Column(db.String(50))  # burial, cremation, mausoleum
     cemetery_name = db.Column(db.String(200))
@@ -236,12 +318,99 @@ class BurialLocation(db.Model):
             'burial_type': self.burial_type,
             'cemetery_name': self.cemetery_name,
             'burial_address': self.burial_address,
-            'burial_date': self.burial_date.isoformat() if self.burial_date else None,
+            'burial_date': self.burial_date,
             'burial_time': self.burial_time,
             'burial_notes': self.burial_notes,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
     @staticmethod
     def find_by_memorial(memorial_id):
         """Find burial location by memorial ID"""
-        return BurialLocation.query.filter_by(memorial_id=memorial_id).first()
\ No newline at end of file
+        return BurialLocation.query.filter_by(memorial_id=memorial_id).first()
+
+# One-per-memorial sections: payload key -> (model, wizard step)
+SINGLE_SECTIONS = {
+    'obituary': (Obituary, 'obituary'),
+    'body_viewing': (BodyViewing, 'body_viewing'),
+    'acknowledgements': (Acknowledgements, 'acknowledgements'),
+    'repass_location': (RepassLocation, 'repass_location'),
+    'burial_location': (BurialLocation, 'burial_location'),
+}
+
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def upsert_section(model, memorial_id, values):
+    """Insert or update the one-per-memorial `model` row in a single statement.
+    
+    Emits INSERT ... ON CONFLICT (memorial_id) DO UPDATE ... RETURNING on
+    Postgres and SQLite, so a double submit cannot trip the unique
+    memorial_id constraint. Only the keys in `values` are written to an
+    existing row. Returns the (refreshed) ORM instance.
+    """
+    dialect = db.session.get_bind(mapper=model).dialect.name
+    insert = UPSERT_INSERTS.get(dialect)
+    if insert is None:
+        # No native upsert: look the row up and stage the change instead
+        section = model.query.filter_by(memorial_id=memorial_id).first()
+        if section is None:
+            section = model(memorial_id=memorial_id)
+            db.session.add(section)
+        for field, value in values.items():
+            setattr(section, field, value)
+        db.session.flush()  # The flush hook touches the memorial
+        return section
+    
+    stmt = insert(model).values(memorial_id=memorial_id, **values)
+    changes = {field: stmt.excluded[field] for field in values}
+    if 'updated_at' in model.__table__.c:
+        changes['updated_at'] = datetime.utcnow()
+    if not changes:
+        # DO UPDATE needs at least one assignment (and DO NOTHING returns no row)
+        changes['memorial_id'] = stmt.excluded.memorial_id
+    
+    stmt = stmt.on_conflict_do_update(index_elements=[model.memorial_id], set_=changes).returning(model)
+    section = db.session.scalars(stmt, execution_options={'populate_existing': True}).one()
+    Memorial.touch(memorial_id)
+    return section
+
+
+def save_program(memorial, sections):
+    """Stage every section present in `sections` for one memorial.
+    
+    Sections left out of the payload are not touched. One-per-memorial
+    sections are written with one upsert each (see upsert_section), the
+    speech list is diffed by Speech.sync_for_memorial, and photo metadata
+    goes out as a single executemany UPDATE. Nothing is committed here.
+    """
+    for key, (model, step) in SINGLE_SECTIONS.items():
+        data = sections.get(key)
+        if data is None:
+            continue
+        
+        section = upsert_section(model, memorial.id, data)
+        set_committed_value(memorial, key, section)
+        memorial.add_completed_step(step)
+    
+    obituary = sections.get('obituary')
+    if obituary and obituary.get('full_name') and not memorial.deceased_name:
+        memorial.deceased_name = obituary['full_name']
+    
+    if sections.get('speeches') is not None:
+        Speech.sync_for_memorial(memorial.id, sections['speeches'])
+        memorial.add_completed_step('speeches')
+    
+    if sections.get('photos'):
+        photos = Photo.__table__
+        db.session.execute(
+            db.update(photos)
+            .where(photos.c.memorial_id == memorial.id, photos.c.id == db.bindparam('photo_id'))
+            .values(photo_type=db.bindparam('photo_type')),
+            [{'photo_id': photo['id'], 'photo_type': photo['photo_type']} for photo in sections['photos']]
+        )
+        Memorial.touch(memorial.id)
@@ -0,0 +1,21 @@
+# app/models/published_snapshot.py
+from datetime import datetime
+from app import db
+from app.models.types import GUID
+
+
+class PublishedSnapshot(db.Model):
+    """Pre-rendered public JSON of a published memorial at one version"""
+
+    __tablename__ = 'published_snapshots'
+
+    memorial_id = db.Column(GUID(), db.ForeignKey('memorials.id', ondelete='CASCADE'), primary_key=True)
+
+    # Memorial.updated_at the body was rendered from
+    version = db.Column(db.DateTime, nullable=False)
+    etag = db.Column(db.String(32), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    rendered_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<PublishedSnapshot {self.memorial_id} @ {self.version}>'
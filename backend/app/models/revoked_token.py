@@ -0,0 +1,41 @@
+# app/models/revoked_token.py
+from datetime import datetime
+from app import db
+from app.models.types import GUID
+
+
+class RevokedToken(db.Model):
+    """JWT identifiers that were revoked before they expired (e.g. on logout)"""
+    
+    __tablename__ = 'revoked_tokens'
+    
+    # The token's jti claim
+    jti = db.Column(db.String(36), primary_key=True)
+    
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=True, index=True)
+    
+    # Indexed so workers can pull only revocations newer than their last refresh
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    
+    @staticmethod
+    def exists(jti):
+        """Check if a jti has been revoked"""
+        return db.session.query(RevokedToken.jti).filter_by(jti=jti).first() is not None
+    
+    @staticmethod
+    def revoked_since(since=None):
+        """Get (jti, revoked_at) pairs revoked at or after a point in time"""
+        query = db.session.query(RevokedToken.jti, RevokedToken.revoked_at)
+        if since is not None:
+            query = query.filter(RevokedToken.revoked_at >= since)
+        return query.all()
+    
+    @staticmethod
+    def purge_expired(now=None):
+        """Delete revocations for tokens that have expired anyway"""
+        now = now or datetime.utcnow()
+        return RevokedToken.query.filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
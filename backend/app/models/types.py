@@ -0,0 +1,72 @@
+# app/models/types.py
+import os
+import time
+import uuid
+from sqlalchemy.types import TypeDecorator, LargeBinary
+from sqlalchemy.dialects import postgresql
+
+
+def uuid7():
+    """Generate a time-ordered UUID (version 7, RFC 9562)"""
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+
+    value = (unix_ms & 0xFFFFFFFFFFFF) << 80     # 48-bit timestamp
+    value |= 0x7 << 76                           # version
+    value |= ((rand >> 62) & 0xFFF) << 64        # rand_a
+    value |= 0x2 << 62                           # variant
+    value |= rand & 0x3FFFFFFFFFFFFFFF           # rand_b
+    return uuid.UUID(int=value)
+
+
+def new_id():
+    """Default primary key value for new rows"""
+    return str(uuid7())
+
+
+def canonical_id(value):
+    """Canonical string form of a client-supplied id, or None if it is not a UUID"""
+    if value is None:
+        return None
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+class GUID(TypeDecorator):
+    """UUID column: native uuid on Postgres, 16 raw bytes elsewhere.
+
+    Values go in and come out as canonical strings, so ids in the JSON API
+    look exactly like the old String(36) keys.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            try:
+                value = uuid.UUID(str(value))
+            except ValueError:
+                # Malformed ids bind as NULL, so lookups simply find nothing
+                return None
+        if dialect.name == 'postgresql':
+            return value
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, str):
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
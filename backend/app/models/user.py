@@ -1,8 +1,8 @@
 # app/models/user.py
-import uuid
 from datetime import datetime
-from flask_bcrypt import generate_password_hash, check_password_hash
 from app import db
+from app.models.types import GUID, new_id
+from app.services.password_hasher import password_hasher
 
 
 class User(db.Model):
@@ -11,7 +11,7 @@ class User(db.Model):
     __tablename__ = 'users'
     
     # Primary Key
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     
     # User Information
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -46,13 +46,19 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set user password"""
-        self.password_hash = generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if provided password matches hash"""
         if not self.password_hash:
             return False
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash was made with a different work factor"""
+        if not self.password_hash:
+            return False
+        return password_hasher.needs_rehash(self.password_hash)
     
     @property
     def full_name(self):
@@ -76,8 +82,8 @@ class User(db.Model):
             'phone': self.phone,
             'is_active': self.is_active,
             'is_verified': self.is_verified,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': self.created_at,
+            'last_login': self.last_login
         }
     
     @staticmethod
@@ -0,0 +1,179 @@
+# app/services/asgi_adapter.py
+import asyncio
+import mimetypes
+import os
+import stat as stat_mode
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from urllib.parse import quote
+import aiofiles
+import aiofiles.os
+from asgiref.sync import SyncToAsync
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from werkzeug.security import safe_join
+from app.utils.async_files import server_loop
+
+# Bytes per read (and per http.response.body message) when streaming uploads
+CHUNK_SIZE = 64 * 1024
+
+
+class _PooledInstance(WsgiToAsgiInstance):
+    """Runs one request's WSGI call on the pool (asgiref's own runs them all on one thread)"""
+
+    def __init__(self, wsgi_application, executor):
+        super(_PooledInstance, self).__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        # SyncToAsync carries the context (server_loop) into the thread and lets
+        # sync_send reach this loop
+        await SyncToAsync(self._run, thread_sensitive=False, executor=self.executor)(body)
+
+    def _run(self, body):
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            # Too many duplicate headers
+            self.sync_send({'type': 'http.response.start', 'status': 400,
+                            'headers': [(b'content-type', b'text/plain')]})
+            self.sync_send({'type': 'http.response.body', 'body': b'Bad Request'})
+            return
+
+        output = self.wsgi_application(environ, self.start_response)
+        try:
+            bytes_sent = 0
+            for chunk in output:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                if self.response_content_length is not None:
+                    chunk = chunk[:self.response_content_length - bytes_sent]
+                self.sync_send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                bytes_sent += len(chunk)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            # WSGI servers must close the iterable (Flask's teardown and file handles)
+            if hasattr(output, 'close'):
+                output.close()
+
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that runs the WSGI app on a fixed pool of threads.
+
+    The request body is received on the event loop before a thread is
+    taken, so slow clients (mobile uploads) cost a socket and a spooled
+    temp file, not a worker thread. Requests whose body has arrived queue
+    for one of `threads` threads, which keeps the DB connection pool
+    sizing (one connection per request thread) valid. Builds on
+    WsgiToAsgiInstance's build_environ, start_response and sync_send, so
+    asgiref stays pinned in requirements.txt.
+    """
+
+    def __init__(self, wsgi_application, threads=4):
+        super(PooledWsgiToAsgi, self).__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        await _PooledInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+class UploadsHandler:
+    """Streams files under UPLOAD_FOLDER from the event loop.
+
+    Sends the same headers as Flask's send_from_directory (type,
+    validators, Cache-Control: no-cache, CORS for the configured origins)
+    and answers If-None-Match with 304. Ranges and anything it cannot
+    find are left to the Flask route.
+    """
+
+    def __init__(self, upload_folder, cors_origins=(), prefix='/uploads/'):
+        self.upload_folder = upload_folder
+        self.cors_origins = set(cors_origins)
+        self.prefix = prefix
+
+    def matches(self, scope):
+        return (scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD')
+                and scope['path'].startswith(self.prefix))
+
+    async def __call__(self, scope, receive, send, fallback):
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        path = safe_join(self.upload_folder, scope['path'][len(self.prefix):])
+        if path is None or 'range' in headers:
+            return await fallback(scope, receive, send)
+
+        try:
+            stat = await aiofiles.os.stat(path)
+        except OSError:
+            stat = None
+        if stat is None or not stat_mode.S_ISREG(stat.st_mode):
+            return await fallback(scope, receive, send)
+
+        # Same validator format as werkzeug's send_file
+        name = os.path.basename(path)
+        etag = f'"{stat.st_mtime}-{stat.st_size}-{zlib.adler32(path.encode("utf-8")) & 0xFFFFFFFF}"'
+        response_headers = [
+            (b'content-disposition', f'inline; filename={quote(name)}'.encode('latin-1')),
+            (b'content-type', (mimetypes.guess_type(name)[0] or 'application/octet-stream').encode('latin-1')),
+            (b'last-modified', formatdate(stat.st_mtime, usegmt=True).encode('latin-1')),
+            (b'cache-control', b'no-cache'),
+            (b'etag', etag.encode('latin-1')),
+        ]
+        origin = headers.get('origin')
+        if origin in self.cors_origins:
+            response_headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+            response_headers.append((b'vary', b'Origin'))
+
+        if etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': response_headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        response_headers.append((b'content-length', str(stat.st_size).encode('latin-1')))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        async with aiofiles.open(path, 'rb') as file:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                more_body = len(chunk) == CHUNK_SIZE
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+                if not more_body:
+                    break
+
+
+class MemoraASGI:
+    """ASGI entry point: uploads from the event loop, everything else through Flask"""
+
+    def __init__(self, flask_app, threads=4):
+        self.flask_app = flask_app
+        self.wsgi = PooledWsgiToAsgi(flask_app, threads=threads)
+        self.uploads = UploadsHandler(flask_app.config['UPLOAD_FOLDER'],
+                                      cors_origins=flask_app.config.get('CORS_ORIGINS', ()))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        # Lets views hand file I/O back to this loop (app/utils/async_files.py)
+        server_loop.set(asyncio.get_running_loop())
+        if self.uploads.matches(scope):
+            return await self.uploads(scope, receive, send, fallback=self.wsgi)
+        await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.wsgi.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
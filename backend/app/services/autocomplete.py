@@ -0,0 +1,268 @@
+# app/services/autocomplete.py
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from sqlalchemy import event, DDL, func, and_, or_, case
+from app.models.memorial import Memorial
+
+# Postgres: trigram GIN indexes so ILIKE '%x%' lookups use an index
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_memorials_deceased_name_trgm ON memorials "
+    "USING GIN (deceased_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_memorials_title_trgm ON memorials USING GIN (title gin_trgm_ops)",
+]
+
+# Same cut-off as pg_trgm's default similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+FIELDS = ('deceased_name', 'title')
+
+
+def normalize(value):
+    """Lowercase and collapse everything that is not a word character"""
+    return ' '.join(re.findall(r'\w+', (value or '').lower()))
+
+
+def trigrams(value):
+    """pg_trgm style trigrams: each word padded with two spaces in front and one behind"""
+    grams = set()
+    for word in normalize(value).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def substring_trigrams(needle):
+    """Trigrams every text containing the (normalized) needle must have.
+
+    The first word may end another word and the last may start one, so only
+    the word boundaries inside the needle are padded.
+    """
+    words = needle.split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = ('  ' if i > 0 else '') + word + (' ' if i < len(words) - 1 else '')
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Trigram postings over the names and titles of one owner's memorials"""
+
+    def __init__(self, rows, signature):
+        self.signature = signature
+        self.entries = {}
+        self.postings = {}
+        self.gram_counts = {}  # (id, field) -> number of distinct trigrams, for similarity
+
+        for row in rows:
+            texts = {field: getattr(row, field) for field in FIELDS}
+            normalized = {field: normalize(text) for field, text in texts.items()}
+            self.entries[row.id] = (texts, normalized)
+            for field in FIELDS:
+                grams = trigrams(normalized[field])
+                self.gram_counts[(row.id, field)] = len(grams)
+                for gram in grams:
+                    self.postings.setdefault((field, gram), set()).add(row.id)
+
+    def search(self, query, limit):
+        """Best matches for a query: word prefixes, then substrings, then similar spellings"""
+        needle = normalize(query)
+        if not needle:
+            return []
+
+        # Substring pass: plain string checks on the rows holding all of the needle's
+        # trigrams, ranked by how much of the text matched
+        word_start = ' ' + needle
+        hits = []
+        for memorial_id in self._candidates(needle):
+            texts, normalized = self.entries[memorial_id]
+            best = None
+            for field in FIELDS:
+                text = normalized[field]
+                if needle in text:
+                    score = ((' ' + text).find(word_start) >= 0, True, len(needle) / len(text))
+                    if best is None or score > best[0]:
+                        best = (score, field)
+            if best is not None:
+                hits.append((best[0], memorial_id, best[1], texts))
+
+        if len(hits) < limit and len(needle) >= 3:
+            hits.extend(self._similar(needle, exclude={hit[1] for hit in hits}))
+
+        return [
+            {
+                'id': memorial_id,
+                'deceased_name': texts['deceased_name'],
+                'title': texts['title'],
+                'matched_field': field,
+                'score': round(score[2], 4)
+            }
+            for score, memorial_id, field, texts in heapq.nlargest(limit, hits, key=lambda hit: (hit[0], hit[1]))
+        ]
+
+    def _candidates(self, needle):
+        # Intersect postings smallest first; needles too short for a trigram scan every row
+        grams = substring_trigrams(needle)
+        if not grams:
+            return self.entries.keys()
+
+        candidates = set()
+        for field in FIELDS:
+            postings = sorted((self.postings.get((field, gram), set()) for gram in grams), key=len)
+            matched = set(postings[0])
+            for posting in postings[1:]:
+                if not matched:
+                    break
+                matched &= posting
+            candidates |= matched
+        return candidates
+
+    def _similar(self, needle, exclude):
+        # Trigram similarity |shared| / |union|, counting shared grams from the postings
+        query_grams = trigrams(needle)
+        shared = {}
+        for field in FIELDS:
+            for gram in query_grams:
+                for memorial_id in self.postings.get((field, gram), ()):
+                    if memorial_id not in exclude:
+                        key = (memorial_id, field)
+                        shared[key] = shared.get(key, 0) + 1
+
+        best = {}
+        for key, count in shared.items():
+            memorial_id, field = key
+            similarity = count / (len(query_grams) + self.gram_counts[key] - count)
+            if similarity >= SIMILARITY_THRESHOLD and similarity > best.get(memorial_id, (0, None))[0]:
+                best[memorial_id] = (similarity, field)
+
+        return [
+            ((False, False, similarity), memorial_id, field, self.entries[memorial_id][0])
+            for memorial_id, (similarity, field) in best.items()
+        ]
+
+
+class MemorialAutocomplete:
+    """Type-ahead over the caller's memorial names and titles.
+
+    Postgres answers with ILIKE and the pg_trgm % operator, both served by
+    the GIN indexes, ranked by similarity(). Other databases use an
+    in-process TrigramIndex per owner, kept in a bounded LRU and rebuilt
+    when the owner's (row count, latest updated_at) changes, which one
+    index-only query checks per request.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.max_owners = 1024
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+        if app is not None and db is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        """Register the Postgres index DDL and size the in-process cache"""
+        self.db = db
+        self.max_owners = app.config.get('AUTOCOMPLETE_INDEX_OWNERS', 1024)
+        app.extensions['memorial_autocomplete'] = self
+
+        table = Memorial.__table__
+        if table.info.get('autocomplete_ddl'):
+            return  # Already registered by an earlier app instance
+        table.info['autocomplete_ddl'] = True
+
+        for statement in POSTGRES_DDL:
+            event.listen(table, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+
+    def suggest(self, query, user_id=None, guest_session=None, limit=10):
+        """Up to `limit` of the caller's memorials whose name or title matches the query"""
+        if user_id is not None:
+            owner_filter, owner_key = Memorial.user_id == user_id, ('user', user_id)
+        elif guest_session:
+            owner_filter, owner_key = Memorial.guest_session == guest_session, ('guest', guest_session)
+        else:
+            return []
+        owner_filter = and_(owner_filter, Memorial.deleted_at.is_(None))
+
+        if self.db.session.get_bind().dialect.name == 'postgresql':
+            return self._suggest_postgresql(query, owner_filter, limit)
+
+        return self._index_for(owner_key, owner_filter).search(query, limit)
+
+    def _suggest_postgresql(self, query, owner_filter, limit):
+        needle = query.strip()
+        escaped = needle.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        contains, prefix = f'%{escaped}%', f'{escaped}%'
+
+        similarity = func.greatest(
+            func.similarity(func.coalesce(Memorial.deceased_name, ''), needle),
+            func.similarity(func.coalesce(Memorial.title, ''), needle)
+        )
+        is_prefix = or_(
+            Memorial.deceased_name.ilike(prefix, escape='\\'),
+            Memorial.title.ilike(prefix, escape='\\')
+        )
+        # The % operator (unlike similarity() >= x) can use the GIN indexes; it
+        # reads its cut-off from this setting, reset when the transaction ends
+        self.db.session.execute(self.db.text(f'SET LOCAL pg_trgm.similarity_threshold = {SIMILARITY_THRESHOLD}'))
+        rows = self.db.session.query(
+            Memorial.id,
+            Memorial.deceased_name,
+            Memorial.title,
+            similarity.label('score'),
+            case((Memorial.deceased_name.ilike(contains, escape='\\'), 'deceased_name'),
+                 else_='title').label('matched_field')
+        ).filter(
+            owner_filter,
+            or_(
+                Memorial.deceased_name.ilike(contains, escape='\\'),
+                Memorial.title.ilike(contains, escape='\\'),
+                Memorial.deceased_name.op('%')(needle),
+                Memorial.title.op('%')(needle)
+            )
+        ).order_by(is_prefix.desc(), similarity.desc(), Memorial.id.desc()).limit(limit).all()
+
+        return [
+            {
+                'id': row.id,
+                'deceased_name': row.deceased_name,
+                'title': row.title,
+                'matched_field': row.matched_field,
+                'score': round(float(row.score), 4)
+            }
+            for row in rows
+        ]
+
+    def _index_for(self, owner_key, owner_filter):
+        # Cheap change check: served by the (user_id, updated_at, id) index
+        signature = tuple(self.db.session.query(
+            func.count(Memorial.id), func.max(Memorial.updated_at)
+        ).filter(owner_filter).one())
+
+        with self._lock:
+            index = self._indexes.get(owner_key)
+            if index is not None and index.signature == signature:
+                self._indexes.move_to_end(owner_key)
+                return index
+
+        rows = self.db.session.query(Memorial.id, Memorial.deceased_name, Memorial.title).filter(owner_filter).all()
+        index = TrigramIndex(rows, signature)
+
+        with self._lock:
+            self._indexes[owner_key] = index
+            self._indexes.move_to_end(owner_key)
+            while len(self._indexes) > self.max_owners:
+                self._indexes.popitem(last=False)
+
+        return index
+
+    def clear(self):
+        """Drop every cached owner index"""
+        with self._lock:
+            self._indexes.clear()
+
+
+memorial_autocomplete = MemorialAutocomplete()
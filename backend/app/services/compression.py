@@ -0,0 +1,127 @@
+# app/services/compression.py
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# Text formats worth compressing; images, PDFs and archives already are
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/css',
+    'text/csv',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+    'text/xml',
+}
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        # Sync flush so every chunk reaches the client as it is produced
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _brotli_stream(chunks, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class Compression:
+    """Brotli/gzip compression of text responses.
+
+    The encoding is negotiated from Accept-Encoding (br preferred when the
+    brotli package is installed). Bodies under COMPRESS_MIN_SIZE bytes are
+    left alone, streamed responses are compressed chunk by chunk, and file
+    responses (send_file, /uploads) and non-text types are never touched.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 500
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        self.skip_prefixes = ('/uploads/',)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the compression hook; call before other after_request hooks so it runs last"""
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.skip_prefixes = tuple(app.config.get('COMPRESS_SKIP_PREFIXES', ('/uploads/',)))
+        app.extensions['compression'] = self
+
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    @property
+    def encodings(self):
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def _should_compress(self, response):
+        if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return False
+        if request.path.startswith(self.skip_prefixes):
+            return False
+        return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+    def _after_request(self, response):
+        if not self._should_compress(response):
+            return response
+
+        # Caches must keep compressed and plain copies apart
+        response.vary.add('Accept-Encoding')
+
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            chunks = response.iter_encoded()
+            if encoding == 'br':
+                response.response = _brotli_stream(chunks, self.brotli_quality)
+            else:
+                response.response = _gzip_stream(chunks, self.gzip_level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            if encoding == 'br':
+                response.set_data(brotli.compress(data, quality=self.brotli_quality))
+            else:
+                response.set_data(gzip.compress(data, compresslevel=self.gzip_level))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # The bytes changed, so a strong validator no longer holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+
+compression = Compression()
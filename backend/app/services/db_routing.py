@@ -0,0 +1,134 @@
+# app/services/db_routing.py
+import logging
+import time
+from flask import g, request, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_sqlalchemy.session import Session
+from app.services.rate_limiter import create_storage, MemoryStorage, RespError
+
+logger = logging.getLogger(__name__)
+
+# SQLALCHEMY_BINDS key of the read replica
+REPLICA_BIND = 'replica'
+
+READ_METHODS = {'GET', 'HEAD'}
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class RoutingSession(Session):
+    """Session that sends a request's reads to the replica when the router allows it.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary, as
+    does everything outside a request or when no replica bind is configured.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False) \
+                and has_request_context() and g.get('db_route') == REPLICA_BIND:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+
+        return super(RoutingSession, self).get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Chooses the database for each request.
+
+    GET/HEAD requests read from the replica unless the caller (user id or
+    guest session) wrote something in the last REPLICA_STICKY_SECONDS; that
+    recent-write marker lives in the shared rate limit store so every
+    worker sees it, and keeps users reading their own edits from the primary.
+    With a process-local store (memory://) and more than one worker, another
+    worker would not see the marker, so routing stays off.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.sticky_seconds = 10
+        self.storage = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Enable routing when a replica bind is configured"""
+        self.enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 10)
+        self.storage = create_storage(
+            app.config.get('RATELIMIT_STORAGE_URL', 'memory://'),
+            timeout=app.config.get('RATELIMIT_STORAGE_TIMEOUT', 0.5),
+            key_prefix='memora:recent-write:'
+        )
+
+        workers = app.config.get('WEB_CONCURRENCY') or 1
+        if self.enabled and isinstance(self.storage, MemoryStorage) and workers > 1:
+            logger.warning(
+                f"Replica routing disabled: recent-write markers need a shared store "
+                f"(set REDIS_URL) with WEB_CONCURRENCY={workers}; all queries use the primary"
+            )
+            self.enabled = False
+        app.extensions['replica_router'] = self
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    @staticmethod
+    def caller_key():
+        """Identify the caller by user id, else by guest session"""
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            user_id = None
+
+        if user_id:
+            return f'user:{user_id}'
+        guest_session = request.headers.get('X-Guest-Session')
+        return f'guest:{guest_session}' if guest_session else None
+
+    def mark_written(self, user_id=None, guest_session=None):
+        """Record a write for an identity the request did not start with (e.g. a new account)"""
+        keys = g.setdefault('db_writers', set())
+        if user_id:
+            keys.add(f'user:{user_id}')
+        if guest_session:
+            keys.add(f'guest:{guest_session}')
+
+    def _before_request(self):
+        if not self.enabled or request.method not in READ_METHODS:
+            return None
+
+        caller = self.caller_key()
+        try:
+            recent_write = caller is not None and self.storage.has_flag(caller, time.time())
+        except (OSError, ConnectionError, RespError) as e:
+            # Without the marker we cannot promise read-your-writes
+            logger.warning(f"Recent-write store unavailable: {e}")
+            recent_write = True
+
+        if not recent_write:
+            g.db_route = REPLICA_BIND
+        return None
+
+    def _after_request(self, response):
+        if not self.enabled or request.method not in WRITE_METHODS or response.status_code >= 400:
+            return response
+
+        keys = set(g.get('db_writers', ()))
+        caller = self.caller_key()
+        if caller is not None:
+            keys.add(caller)
+
+        now = time.time()
+        for key in keys:
+            try:
+                self.storage.set_flag(key, self.sticky_seconds, now)
+            except (OSError, ConnectionError, RespError) as e:
+                logger.warning(f"Recent-write store unavailable: {e}")
+                break
+
+        return response
+
+
+replica_router = ReplicaRouter()
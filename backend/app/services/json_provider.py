@@ -0,0 +1,80 @@
+# app/services/json_provider.py
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from enum import Enum
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder produces the same output, only slower
+    orjson = None
+
+
+def default(obj):
+    """Encode the types orjson handles natively the same way for the stdlib encoder"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Datetimes, dates, UUIDs and Enums are encoded natively (ISO 8601, as
+    isoformat() would), so to_dict methods hand over raw values instead of
+    formatting every timestamp themselves. Keys are sorted like Flask's
+    default provider. Calls with encoder options orjson does not have, and
+    values it rejects (e.g. integers over 64 bits), go through the stdlib
+    encoder with the same conversions; so does everything when orjson is not
+    installed.
+    """
+
+    default = staticmethod(default)
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+            except TypeError:
+                pass
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super(FastJSONProvider, self).response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except TypeError:
+            return super(FastJSONProvider, self).response(*args, **kwargs)
+
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
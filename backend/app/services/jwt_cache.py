@@ -0,0 +1,97 @@
+# app/services/jwt_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config as jwt_config
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified JWT claims keyed by a digest of the raw token"""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(encoded_token):
+        return hashlib.sha256(encoded_token.encode('utf-8')).digest()
+
+    def get(self, encoded_token, now=None):
+        """Return cached claims for a token, or None if absent or expired"""
+        key = self._key(encoded_token)
+        now = time.time() if now is None else now
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Callers may add keys to the claims, so hand out a copy
+        return dict(claims)
+
+    def set(self, encoded_token, claims, leeway=0):
+        """Remember the claims of a token that just passed verification"""
+        exp = claims.get('exp')
+        expires_at = exp + leeway if exp is not None else None
+
+        with self._lock:
+            key = self._key(encoded_token)
+            self._entries[key] = (dict(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached token"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips re-verifying tokens it has already verified.
+
+    flask_jwt_extended has no loader hook that runs before signature
+    verification, so the cache sits in the manager's decode step. Revocation
+    and user lookup loaders still run on every request because they are
+    called after decoding.
+    """
+
+    def __init__(self, app=None, add_context_processor=False):
+        self.token_cache = None
+        super(CachingJWTManager, self).__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor=False):
+        super(CachingJWTManager, self).init_app(app, add_context_processor)
+        cache_size = app.config.get('JWT_CLAIMS_CACHE_SIZE', 4096)
+        self.token_cache = VerifiedTokenCache(cache_size) if cache_size else None
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # CSRF and expired-token decodes are rare, so always verify those
+        if self.token_cache is None or csrf_value or allow_expired:
+            return super(CachingJWTManager, self)._decode_jwt_from_config(
+                encoded_token, csrf_value, allow_expired
+            )
+
+        claims = self.token_cache.get(encoded_token)
+        if claims is None:
+            claims = super(CachingJWTManager, self)._decode_jwt_from_config(encoded_token)
+            self.token_cache.set(encoded_token, claims, leeway=jwt_config.leeway)
+        return claims
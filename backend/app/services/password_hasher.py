@@ -0,0 +1,122 @@
+# app/services/password_hasher.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt as _bcrypt
+
+# bcrypt only looks at the first 72 bytes of a password
+MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash takes too long"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool with a bounded queue.
+
+    bcrypt releases the GIL, so hashing on worker threads keeps request
+    threads responsive, and the bounded queue turns a login burst into fast
+    503s instead of every Flask worker stalling on CPU-bound hashing.
+    """
+
+    def __init__(self, app=None):
+        self.log_rounds = 12
+        self.max_workers = 2
+        self.max_queue = 16
+        self.timeout = 10.0
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read hashing settings from the app config"""
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 16)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10.0)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def shutdown(self):
+        """Stop the worker threads (they are recreated on next use)"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+
+    def _get_executor(self):
+        """Create the pool lazily so every forked worker gets its own threads"""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='password-hasher'
+                )
+                # Running plus waiting jobs may never exceed this many
+                self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+                self._pid = os.getpid()
+            return self._executor, self._slots
+
+    def _run(self, func, *args):
+        """Run a hashing job on the pool and wait for its result"""
+        executor, slots = self._get_executor()
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Password hashing queue is full')
+
+        try:
+            future = executor.submit(func, *args)
+        except RuntimeError:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy('Password hashing timed out')
+
+    def hash(self, password):
+        """Hash a password with the configured work factor"""
+        return self._run(_hash_password, _encode(password), self.log_rounds)
+
+    def check(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run(_check_password, password_hash.encode('utf-8'), _encode(password))
+
+    def needs_rehash(self, password_hash):
+        """Check if a stored hash uses a different work factor than configured"""
+        cost = get_hash_cost(password_hash)
+        return cost is not None and cost != self.log_rounds
+
+
+def get_hash_cost(password_hash):
+    """Read the work factor from a '$2b$12$...' style bcrypt hash"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def _encode(password):
+    return password.encode('utf-8')[:MAX_PASSWORD_BYTES]
+
+
+def _hash_password(password, log_rounds):
+    return _bcrypt.hashpw(password, _bcrypt.gensalt(rounds=log_rounds)).decode('utf-8')
+
+
+def _check_password(password_hash, password):
+    try:
+        return _bcrypt.checkpw(password, password_hash)
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,232 @@
+# app/services/pool_metrics.py
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Histogram bucket upper bounds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+AGE_BUCKETS_S = (1, 10, 60, 300, 900, 1800, 3600, 21600)
+
+
+class Histogram:
+    """Cumulative bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels):
+        """Prometheus exposition lines for this histogram"""
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class PoolStats:
+    """Counters and histograms for one engine's connection pool"""
+
+    def __init__(self, name):
+        self.name = name
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.ping_invalidations = 0
+        self.closes = 0
+        self.checkout_wait = Histogram(WAIT_BUCKETS_MS)
+        self.connection_age = Histogram(AGE_BUCKETS_S)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.checkout_wait.observe(seconds * 1000)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def on_connect(self, dbapi_connection, connection_record):
+        connection_record.info['connected_at'] = time.time()
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connected_at = connection_record.info.get('connected_at')
+        with self._lock:
+            self.checkouts += 1
+            if connected_at is not None:
+                self.connection_age.observe(time.time() - connected_at)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        # Checkout-time failures (pre-ping, checkout listeners) arrive as
+        # DisconnectionError and are replaced before any request sees them;
+        # anything else broke a connection a request was using
+        with self._lock:
+            if isinstance(exception, exc.DisconnectionError):
+                self.ping_invalidations += 1
+            else:
+                self.invalidations += 1
+
+    def on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.closes += 1
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    stats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super(TimedQueuePool, self)._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep reporting to the same stats
+        pool = super(TimedQueuePool, self).recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_sizing(config):
+    """Pool size, overflow and timeout for one worker process.
+
+    Every request thread can hold one connection, plus one for background
+    jobs; bursts may open as many again. When DB_MAX_CONNECTIONS is known,
+    the total across WEB_CONCURRENCY workers is kept under it (minus
+    DB_RESERVED_CONNECTIONS for migrations and admin sessions). Explicit
+    DB_POOL_SIZE / DB_MAX_OVERFLOW win over the derived values.
+    """
+    workers = max(1, config.get('WEB_CONCURRENCY') or 1)
+    threads = max(1, config.get('WEB_THREADS') or 1)
+
+    pool_size = config.get('DB_POOL_SIZE') or threads + 1
+    max_overflow = config.get('DB_MAX_OVERFLOW')
+    if max_overflow is None:
+        max_overflow = threads
+
+    max_connections = config.get('DB_MAX_CONNECTIONS')
+    if max_connections:
+        budget = max(1, (max_connections - config.get('DB_RESERVED_CONNECTIONS', 0)) // workers)
+        pool_size = min(pool_size, budget)
+        max_overflow = max(0, min(max_overflow, budget - pool_size))
+
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+    }
+
+
+class PoolMetrics:
+    """Connection pool instrumentation for every engine of the app"""
+
+    def __init__(self):
+        self.stats = {}
+        self.engines = {}
+
+    def configure(self, app):
+        """Apply the pool sizing profile and the timed pool class (call before db.init_app)"""
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if app.config.get('DB_POOL_PROFILE', 'auto') == 'off' or (uri.startswith('sqlite') and ':memory:' in uri):
+            return
+
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.setdefault('poolclass', TimedQueuePool)
+        for key, value in pool_sizing(app.config).items():
+            options.setdefault(key, value)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    def init_app(self, app, db):
+        """Attach pool listeners to each engine of the app"""
+        app.extensions['pool_metrics'] = self
+
+        with app.app_context():
+            engines = dict(db.engines)
+
+        for key, engine in engines.items():
+            name = key or 'primary'
+            if self.engines.get(name) is engine:
+                continue
+
+            stats = PoolStats(name)
+            self.stats[name] = stats
+            self.engines[name] = engine
+            if isinstance(engine.pool, TimedQueuePool):
+                engine.pool.stats = stats
+
+            # Listeners on the engine carry over to pools recreated by dispose()
+            event.listen(engine, 'connect', stats.on_connect)
+            event.listen(engine, 'checkout', stats.on_checkout)
+            event.listen(engine, 'invalidate', stats.on_invalidate)
+            event.listen(engine, 'close', stats.on_close)
+
+    def render(self):
+        """All pool metrics in the Prometheus text format"""
+        families = {}
+
+        def add(name, kind, help_text, lines):
+            family = families.setdefault(name, [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'])
+            family.extend(lines)
+
+        for name, stats in self.stats.items():
+            labels = f'pool="{name}"'
+            pool = self.engines[name].pool
+
+            with stats._lock:
+                add('db_pool_checkouts_total', 'counter', 'Connections handed out by the pool',
+                    [f'db_pool_checkouts_total{{{labels}}} {stats.checkouts}'])
+                add('db_pool_checkout_timeouts_total', 'counter', 'Checkouts that gave up waiting (pool_timeout)',
+                    [f'db_pool_checkout_timeouts_total{{{labels}}} {stats.checkout_timeouts}'])
+                add('db_pool_connects_total', 'counter', 'New database connections opened',
+                    [f'db_pool_connects_total{{{labels}}} {stats.connects}'])
+                add('db_pool_invalidations_total', 'counter', 'Connections invalidated by errors while in use',
+                    [f'db_pool_invalidations_total{{{labels}}} {stats.invalidations}'])
+                add('db_pool_ping_invalidations_total', 'counter', 'Stale connections replaced at checkout (failed pre-pings)',
+                    [f'db_pool_ping_invalidations_total{{{labels}}} {stats.ping_invalidations}'])
+                add('db_pool_closes_total', 'counter', 'Database connections closed',
+                    [f'db_pool_closes_total{{{labels}}} {stats.closes}'])
+                add('db_pool_checkout_wait_ms', 'histogram', 'Time spent waiting for a pooled connection',
+                    stats.checkout_wait.render('db_pool_checkout_wait_ms', labels))
+                add('db_pool_connection_age_seconds', 'histogram', 'Age of connections when checked out',
+                    stats.connection_age.render('db_pool_connection_age_seconds', labels))
+
+            if isinstance(pool, QueuePool):
+                add('db_pool_size', 'gauge', 'Configured pool size',
+                    [f'db_pool_size{{{labels}}} {pool.size()}'])
+                add('db_pool_in_use', 'gauge', 'Connections currently checked out',
+                    [f'db_pool_in_use{{{labels}}} {pool.checkedout()}'])
+                add('db_pool_idle', 'gauge', 'Connections idle in the pool',
+                    [f'db_pool_idle{{{labels}}} {pool.checkedin()}'])
+                add('db_pool_overflow', 'gauge', 'Connections open beyond pool_size',
+                    [f'db_pool_overflow{{{labels}}} {max(0, pool.overflow())}'])
+                add('db_pool_max_overflow', 'gauge', 'Configured max_overflow',
+                    [f'db_pool_max_overflow{{{labels}}} {pool._max_overflow}'])
+
+        return '\n'.join(line for family in families.values() for line in family) + '\n'
+
+
+pool_metrics = PoolMetrics()
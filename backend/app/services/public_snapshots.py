@@ -0,0 +1,264 @@
+# app/services/public_snapshots.py
+import logging
+import os
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import selectinload
+from app.models.memorial import Memorial, MemorialStatus
+from app.models.program import UPSERT_INSERTS
+from app.models.published_snapshot import PublishedSnapshot
+from app.services.db_routing import RoutingSession
+from app.utils.conditional import memorial_etag
+
+logger = logging.getLogger(__name__)
+
+# Sections included in the public page
+PUBLIC_SECTIONS = [
+    'obituary',
+    'body_viewing',
+    'speeches',
+    'acknowledgements',
+    'repass_location',
+    'photos',
+    'burial_location'
+]
+
+
+def surrogate_key(memorial_id):
+    """CDN cache tag of every public response for a memorial"""
+    return f'memorial-{memorial_id}'
+
+
+def public_dict(memorial):
+    """What attendees may see of a memorial: no owner, guest session or wizard state"""
+    data = {
+        'memorial': {
+            'id': memorial.id,
+            'title': memorial.title,
+            'deceased_name': memorial.deceased_name,
+            'updated_at': memorial.updated_at,
+            'pdf_url': memorial.pdf_url,
+            'pdf_generated_at': memorial.pdf_generated_at,
+        }
+    }
+    for name in PUBLIC_SECTIONS:
+        value = getattr(memorial, name)
+        if isinstance(value, list):
+            data[name] = [item.to_dict() for item in value]
+        else:
+            data[name] = value.to_dict() if value is not None else None
+    return data
+
+
+class PublicSnapshots:
+    """Immutable public pages of published memorials, ready for a CDN.
+
+    Each published memorial has one stored JSON body per version
+    (Memorial.updated_at). Snapshots are re-rendered inside the transaction
+    that changes the memorial, so the public read is a single indexed
+    lookup; a memorial without a current snapshot (published before
+    snapshots existed) is rendered and stored on its first read. When that
+    transaction commits, the memorial's surrogate key is purged from the
+    CDN (CDN_PURGE_URL; a Fastly-style POST with a Surrogate-Key header)
+    on a background thread. Without a
+    purge URL nothing is sent and shared caches only get the short
+    PUBLIC_CACHE_MAX_AGE, since they could not be told about edits.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.max_age = 60
+        self.s_maxage = 60
+        self.purge_url = None
+        self.purge_token = None
+        self.purge_token_header = 'Fastly-Key'
+        self.purge_timeout = 5.0
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        if app is not None and db is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        """Read cache and purge settings and hook into session commits"""
+        self.db = db
+        self.max_age = app.config.get('PUBLIC_CACHE_MAX_AGE', 60)
+        self.purge_url = app.config.get('CDN_PURGE_URL')
+        self.purge_token = app.config.get('CDN_PURGE_TOKEN')
+        self.purge_token_header = app.config.get('CDN_PURGE_TOKEN_HEADER', 'Fastly-Key')
+        self.purge_timeout = app.config.get('CDN_PURGE_TIMEOUT', 5.0)
+        # Long shared-cache lifetimes are only safe when edits purge the CDN
+        self.s_maxage = app.config.get('PUBLIC_CACHE_S_MAXAGE', 86400) if self.purge_url else self.max_age
+        app.extensions['public_snapshots'] = self
+
+        if not event.contains(RoutingSession, 'before_commit', self._before_commit):
+            event.listen(RoutingSession, 'before_commit', self._before_commit)
+            event.listen(RoutingSession, 'after_commit', self._after_commit)
+            event.listen(RoutingSession, 'after_rollback', self._after_rollback)
+
+    def cache_control(self):
+        return f'public, max-age={self.max_age}, s-maxage={self.s_maxage}'
+
+    def get(self, memorial_id):
+        """(etag, body) of a published memorial's public page, or None if it is not public"""
+        row = self.db.session.query(
+            Memorial.updated_at, PublishedSnapshot.version, PublishedSnapshot.etag, PublishedSnapshot.body
+        ).outerjoin(
+            PublishedSnapshot, PublishedSnapshot.memorial_id == Memorial.id
+        ).filter(
+            Memorial.id == memorial_id,
+            Memorial.status == MemorialStatus.PUBLISHED,
+            Memorial.deleted_at.is_(None)
+        ).first()
+
+        if row is None:
+            return None
+        if row.version == row.updated_at:
+            return row.etag, row.body
+
+        # Published before snapshots existed, or changed outside the ORM:
+        # render it now and store the rendering for the next request
+        logger.info(f"Rendering public page of memorial {memorial_id} without a current snapshot")
+        snapshots = self._render([memorial_id])
+        if not snapshots:
+            return None
+        self._store(snapshots[0])
+        return snapshots[0]['etag'], snapshots[0]['body']
+
+    def _store(self, snapshot):
+        """Save a rendering made on a read, in its own transaction on the primary.
+
+        The request's own transaction is rolled back (and may be reading the
+        replica), so this commits separately. An existing snapshot is only
+        replaced by a newer version, never by a rendering of stale replica data.
+        """
+        engine = self.db.engine
+        insert = UPSERT_INSERTS.get(engine.dialect.name)
+        if insert is None:
+            return
+
+        table = PublishedSnapshot.__table__
+        stmt = insert(table).values(**snapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.memorial_id],
+            set_={column: stmt.excluded[column] for column in ('version', 'etag', 'body', 'rendered_at')},
+            where=table.c.version < stmt.excluded.version
+        )
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt)
+        except Exception as e:
+            logger.warning(f"Could not store public snapshot of {snapshot['memorial_id']}: {e}")
+
+    def _render(self, memorial_ids):
+        """Snapshot rows for the published, live memorials among memorial_ids"""
+        db = self.db
+        # populate_existing: sections written with Core statements in this
+        # transaction may be stale in the identity map
+        memorials = db.session.scalars(
+            db.select(Memorial)
+            .where(Memorial.id.in_(memorial_ids),
+                   Memorial.status == MemorialStatus.PUBLISHED,
+                   Memorial.deleted_at.is_(None))
+            .options(*[selectinload(getattr(Memorial, name)) for name in PUBLIC_SECTIONS])
+            .execution_options(populate_existing=True)
+        ).all()
+
+        now = datetime.utcnow()
+        return [{
+            'memorial_id': memorial.id,
+            'version': memorial.updated_at,
+            'etag': memorial_etag(f'public|{memorial.id}', memorial.updated_at),
+            'body': current_app.json.dumps(public_dict(memorial)),
+            'rendered_at': now,
+        } for memorial in memorials]
+
+    def _before_commit(self, session):
+        """Replace the snapshots of memorials changed in this transaction"""
+        # Everything staged must be in the rendering; the flush also records
+        # changes made since the last one (no-op when nothing is pending)
+        session.flush()
+        if not session.info.get('changed_memorials'):
+            return
+
+        memorial_ids = [
+            memorial_id for memorial_id in session.info.pop('changed_memorials', ())
+            if self._may_be_public(session, memorial_id)
+        ]
+        session.info.pop('unpublished_memorials', None)
+        if not memorial_ids:
+            return
+
+        table = PublishedSnapshot.__table__
+        purge = set(session.execute(
+            self.db.delete(table).where(table.c.memorial_id.in_(memorial_ids)).returning(table.c.memorial_id)
+        ).scalars())
+
+        snapshots = self._render(memorial_ids)
+        if snapshots:
+            session.execute(self.db.insert(table), snapshots)
+            purge.update(snapshot['memorial_id'] for snapshot in snapshots)
+
+        if purge:
+            session.info.setdefault('purge_memorials', set()).update(purge)
+
+    @staticmethod
+    def _may_be_public(session, memorial_id):
+        """False only when the session shows the memorial is not published and was not
+        unpublished in this transaction, so it has no snapshot to replace"""
+        if memorial_id in session.info.get('unpublished_memorials', ()):
+            return True
+        memorial = session.identity_map.get(session.identity_key(Memorial, memorial_id))
+        if memorial is None or 'status' in inspect(memorial).unloaded:
+            return True  # Not loaded: ask the database
+        return memorial.status == MemorialStatus.PUBLISHED
+
+    def invalidate(self, session, memorial_ids):
+        """Purge these memorials from the CDN once the session commits (for Core deletes,
+        whose snapshots go with ON DELETE CASCADE)"""
+        if memorial_ids:
+            session.info.setdefault('purge_memorials', set()).update(memorial_ids)
+
+    def _after_commit(self, session):
+        memorial_ids = session.info.pop('purge_memorials', None)
+        if memorial_ids:
+            self.purge(memorial_ids)
+
+    def _after_rollback(self, session):
+        session.info.pop('changed_memorials', None)
+        session.info.pop('unpublished_memorials', None)
+        session.info.pop('purge_memorials', None)
+
+    def purge(self, memorial_ids):
+        """Ask the CDN to drop every cached public response of these memorials (in the background)"""
+        if not self.purge_url:
+            return
+        keys = ' '.join(sorted(surrogate_key(memorial_id) for memorial_id in memorial_ids))
+        self._get_executor().submit(self._send_purge, keys)
+
+    def _send_purge(self, keys):
+        headers = {'Surrogate-Key': keys}
+        if self.purge_token:
+            headers[self.purge_token_header] = self.purge_token
+        try:
+            request = urllib.request.Request(self.purge_url, method='POST', headers=headers)
+            with urllib.request.urlopen(request, timeout=self.purge_timeout) as response:
+                response.read()
+        except Exception as e:
+            logger.error(f"CDN purge failed for {keys}: {e}")
+
+    def _get_executor(self):
+        """One purge thread per worker process, created on first use"""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cdn-purge')
+                self._pid = os.getpid()
+            return self._executor
+
+
+public_snapshots = PublicSnapshots()
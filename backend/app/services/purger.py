@@ -0,0 +1,220 @@
+# app/services/purger.py
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, and_
+from app.models.memorial import Memorial, MemorialStatus
+from app.models.revoked_token import RevokedToken
+from app.services.public_snapshots import public_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def enable_sqlite_foreign_keys(engine):
+    """Make SQLite enforce foreign keys (and ON DELETE CASCADE) on every connection"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+def parse_hours(window):
+    """'22-6' -> (22, 6): a start/end UTC hour range, end exclusive"""
+    start, _, end = str(window).partition('-')
+    return int(start), int(end or 24)
+
+
+class MemorialPurger:
+    """Hard-deletes soft-deleted memorials in the background.
+
+    Deleting a memorial in a request only sets deleted_at. The purger removes
+    those rows later in bounded batches, one short transaction each; the
+    database cascades the delete to the program sections (ON DELETE CASCADE)
+    instead of the ORM loading every child row, and the memorial's upload
+    directory goes once its batch has committed. Every worker runs a purger
+    thread; on Postgres batches are claimed with SKIP LOCKED so they never
+    overlap.
+
+    The same thread enforces guest draft retention: draft or in-progress
+    guest memorials (no owner) that nobody touched for
+    GUEST_DRAFT_RETENTION_DAYS are purged, but only inside the
+    GUEST_PURGE_HOURS window (UTC), in batches of GUEST_PURGE_BATCH_SIZE and
+    at most GUEST_PURGE_MAX_BATCHES per run, so the cleanup stays out of
+    business hours and never turns into one long burst of I/O.
+
+    Each run also drops revoked_tokens rows whose token has expired anyway.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.app = None
+        self.db = None
+        self.interval = 60
+        self.batch_size = 100
+        self.batch_pause = 0.1
+        self.guest_retention_days = 30
+        self.guest_purge_hours = (2, 6)
+        self.guest_batch_size = 25
+        self.guest_max_batches = 20
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        """Read purge settings and start the thread with the first request"""
+        self.app = app
+        self.db = db
+        self.interval = app.config.get('PURGE_INTERVAL_SECONDS', 60)
+        self.batch_size = app.config.get('PURGE_BATCH_SIZE', 100)
+        self.batch_pause = app.config.get('PURGE_BATCH_PAUSE_SECONDS', 0.1)
+        self.guest_retention_days = app.config.get('GUEST_DRAFT_RETENTION_DAYS', 30)
+        self.guest_purge_hours = parse_hours(app.config.get('GUEST_PURGE_HOURS', '2-6'))
+        self.guest_batch_size = app.config.get('GUEST_PURGE_BATCH_SIZE', 25)
+        self.guest_max_batches = app.config.get('GUEST_PURGE_MAX_BATCHES', 20)
+        app.extensions['memorial_purger'] = self
+
+        with app.app_context():
+            for engine in db.engines.values():
+                enable_sqlite_foreign_keys(engine)
+
+        # Started lazily so CLI commands and migrations never spawn it
+        if self.interval > 0:
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+    def start(self):
+        """Start the background purge thread (no-op if it is running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='memorial-purger', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Ask the background thread to exit after its current batch"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    purged = self.purge_deleted()
+                    revocations = self.purge_expired_revocations()
+                    expired = 0
+                    if self.in_guest_purge_window():
+                        expired = self.purge_guest_drafts(max_batches=self.guest_max_batches)
+                if purged:
+                    logger.info(f"Purged {purged} deleted memorials")
+                if expired:
+                    logger.info(f"Purged {expired} abandoned guest drafts")
+                if revocations:
+                    logger.info(f"Purged {revocations} expired token revocations")
+            except Exception as e:
+                logger.warning(f"Memorial purge failed: {e}")
+
+    def upload_dir(self, memorial_id):
+        """Directory holding a memorial's uploaded photos"""
+        return os.path.join(self.app.config.get('UPLOAD_FOLDER', 'uploads'), f'memorial_{memorial_id}')
+
+    def purge_batch(self, criterion, batch_size=None):
+        """Hard-delete up to batch_size memorials matching `criterion`; returns the count"""
+        session = self.db.session
+        try:
+            ids = session.execute(
+                self.db.select(Memorial.id)
+                .where(criterion)
+                .limit(batch_size or self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            if ids:
+                # Children (and public snapshots) go through ON DELETE CASCADE in the database
+                ids = session.execute(
+                    self.db.delete(Memorial)
+                    .where(Memorial.id.in_(ids), criterion)
+                    .returning(Memorial.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+                # Cached public pages go from the CDN once the delete commits
+                public_snapshots.invalidate(session, ids)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        for memorial_id in ids:
+            shutil.rmtree(self.upload_dir(memorial_id), ignore_errors=True)
+
+        return len(ids)
+
+    def purge(self, criterion, max_batches=None, batch_size=None):
+        """Purge matching memorials batch by batch until none are left (or max_batches)"""
+        batch_size = batch_size or self.batch_size
+        total, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            purged = self.purge_batch(criterion, batch_size)
+            total += purged
+            batches += 1
+            if purged < batch_size or self._stop.is_set():
+                break
+            # Leave room for request traffic between batches
+            time.sleep(self.batch_pause)
+        return total
+
+    def purge_deleted(self, max_batches=None):
+        """Purge every soft-deleted memorial"""
+        return self.purge(Memorial.deleted_at.isnot(None), max_batches=max_batches)
+
+    def purge_expired_revocations(self, now=None):
+        """Delete revocations of tokens past their expiry; they fail verification anyway"""
+        session = self.db.session
+        try:
+            purged = RevokedToken.purge_expired(now)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return purged
+
+    def in_guest_purge_window(self, now=None):
+        """Whether the current UTC hour is inside GUEST_PURGE_HOURS"""
+        if not self.guest_retention_days:
+            return False
+        hour = (now or datetime.utcnow()).hour
+        start, end = self.guest_purge_hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end  # Window wraps past midnight
+
+    def purge_guest_drafts(self, retention_days=None, max_batches=None):
+        """Purge abandoned guest drafts (no owner, not finished) untouched for `retention_days`"""
+        days = self.guest_retention_days if retention_days is None else retention_days
+        if not days:
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        # Matches ix_memorials_guest_updated (partial on user_id IS NULL); completed
+        # and published memorials are kept however old, their links may be live
+        criterion = and_(
+            Memorial.user_id.is_(None),
+            Memorial.guest_session.isnot(None),
+            Memorial.status.in_((MemorialStatus.DRAFT, MemorialStatus.IN_PROGRESS)),
+            Memorial.updated_at < cutoff
+        )
+        return self.purge(criterion, max_batches=max_batches, batch_size=self.guest_batch_size)
+
+
+memorial_purger = MemorialPurger()
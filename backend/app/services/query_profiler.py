@@ -0,0 +1,161 @@
+# app/services/query_profiler.py
+import logging
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statements are already parameterized; only whitespace and IN-list lengths vary
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*\)')
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement):
+    """Normalize a SQL statement so repeats of the same query compare equal"""
+    return _IN_LIST.sub('(...)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryCounter:
+    """Record every statement run while the block is active.
+
+    Used by the query_budget pytest fixture; counts statements from every
+    engine, across request boundaries.
+
+        with QueryCounter() as counter:
+            client.get('/api/memorials/')
+        assert counter.count <= 3
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(Engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(Engine, 'before_cursor_execute', self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self, threshold=2):
+        """(shape, count) of statements run at least `threshold` times, most frequent first"""
+        shapes = Counter(statement_shape(statement) for statement in self.statements)
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+class QueryProfiler:
+    """Per-request SQL counts, DB time and N+1 detection.
+
+    Times every statement with before/after_cursor_execute and groups them by
+    shape. A shape repeated QUERY_REPEAT_THRESHOLD times in one request is the
+    usual sign of a lazy load inside a loop (N+1) and is logged with the
+    endpoint, as are requests running more than QUERY_COUNT_THRESHOLD
+    statements. With SERVER_TIMING_HEADERS on, responses carry a Server-Timing
+    header (db time and query count, total app time) that browser devtools show.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.server_timing = False
+        self.repeat_threshold = 5
+        self.count_threshold = 30
+        self.last_request_profile = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the engine timers and request hooks"""
+        self.enabled = app.config.get('QUERY_PROFILING', True)
+        self.server_timing = app.config.get('SERVER_TIMING_HEADERS', False)
+        self.repeat_threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 5)
+        self.count_threshold = app.config.get('QUERY_COUNT_THRESHOLD', 30)
+        app.extensions['query_profiler'] = self
+
+        if not self.enabled:
+            return
+
+        if not event.contains(Engine, 'before_cursor_execute', _start_timer):
+            event.listen(Engine, 'before_cursor_execute', _start_timer)
+            event.listen(Engine, 'after_cursor_execute', _stop_timer)
+            event.listen(Engine, 'handle_error', _discard_timer)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        g.query_profile = {'started': time.perf_counter(), 'db_time': 0.0, 'shapes': Counter()}
+
+    def _after_request(self, response):
+        profile = g.get('query_profile')
+        if profile is None:
+            return response
+
+        queries = sum(profile['shapes'].values())
+        db_ms = profile['db_time'] * 1000
+        app_ms = (time.perf_counter() - profile['started']) * 1000
+        repeated = [(shape, count) for shape, count in profile['shapes'].most_common()
+                    if count >= self.repeat_threshold]
+
+        self.last_request_profile = {
+            'endpoint': request.endpoint,
+            'queries': queries,
+            'db_ms': db_ms,
+            'app_ms': app_ms,
+            'repeated': repeated
+        }
+
+        for shape, count in repeated:
+            logger.warning(f"Possible N+1 in {request.endpoint} ({request.method} {request.path}): "
+                           f"{count}x {shape[:300]}")
+        if queries > self.count_threshold:
+            logger.warning(f"{request.endpoint} ({request.method} {request.path}) ran {queries} queries "
+                           f"in {db_ms:.1f} ms")
+
+        if self.server_timing:
+            response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{queries} queries"')
+            response.headers.add('Server-Timing', f'app;dur={app_ms:.1f}')
+
+        return response
+
+
+def _profile():
+    return g.get('query_profile') if has_app_context() else None
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _profile() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile()
+    starts = conn.info.get('query_start')
+    if profile is None or not starts:
+        return
+
+    profile['db_time'] += time.perf_counter() - starts.pop()
+    profile['shapes'][statement_shape(statement)] += 1
+
+
+def _discard_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start'):
+        connection.info['query_start'].pop()
+
+
+query_profiler = QueryProfiler()
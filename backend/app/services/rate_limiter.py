@@ -0,0 +1,327 @@
+# app/services/rate_limiter.py
+import logging
+import math
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import urlparse, unquote
+from flask import request, g, jsonify, current_app
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryStorage:
+    """Token buckets held in process memory (single node)"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._flags = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now, cost=1):
+        """Take `cost` tokens from a bucket; returns (allowed, remaining, retry_after)"""
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (cost - tokens) / rate
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._evict(now)
+
+        return allowed, tokens, retry_after
+
+    def _evict(self, now):
+        # Drop buckets that have had time to refill completely
+        idle = [key for key, (_, last) in self._buckets.items() if now - last > 3600]
+        for key in idle:
+            del self._buckets[key]
+
+    def set_flag(self, key, ttl, now):
+        """Set a flag that expires after `ttl` seconds"""
+        with self._lock:
+            self._flags[key] = now + ttl
+            if len(self._flags) > self.max_keys:
+                expired = [flag for flag, expires_at in self._flags.items() if expires_at <= now]
+                for flag in expired:
+                    del self._flags[flag]
+
+    def has_flag(self, key, now):
+        """Whether a flag is set and not yet expired"""
+        expires_at = self._flags.get(key)
+        return expires_at is not None and expires_at > now
+
+
+# Refill, take and persist a bucket atomically on the Redis server
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RespConnection:
+    """Minimal Redis protocol (RESP2) client over a single socket"""
+
+    def __init__(self, host='localhost', port=6379, db=0, password=None, username=None,
+                 use_ssl=False, timeout=0.5):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.username = username
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url, timeout=0.5):
+        """Build a connection from a redis:// or rediss:// URL"""
+        parsed = urlparse(url)
+        db = parsed.path.lstrip('/')
+        return cls(
+            host=parsed.hostname or 'localhost',
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            use_ssl=parsed.scheme == 'rediss',
+            timeout=timeout
+        )
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        if self.use_ssl:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        self._sock = sock
+        self._file = sock.makefile('rb')
+
+        if self.password:
+            auth = ('AUTH', self.username, self.password) if self.username else ('AUTH', self.password)
+            self._send(*auth)
+        if self.db:
+            self._send('SELECT', self.db)
+
+    def close(self):
+        """Close the socket (it is reopened on the next command)"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def _send(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self._sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('Connection closed by server')
+
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RespError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2].decode('utf-8')
+        if kind == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RespError(f'Unexpected reply: {line!r}')
+
+    def execute(self, *args):
+        """Send one command and return its decoded reply"""
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._send(*args)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+
+
+class RedisStorage:
+    """Token buckets kept on a Redis-protocol server (shared across nodes)"""
+
+    def __init__(self, connection, key_prefix='memora:ratelimit:'):
+        self.connection = connection
+        self.key_prefix = key_prefix
+        self._script_sha = None
+
+    def _eval(self, key, *args):
+        if self._script_sha:
+            try:
+                return self.connection.execute('EVALSHA', self._script_sha, 1, key, *args)
+            except RespError as e:
+                if not str(e).startswith('NOSCRIPT'):
+                    raise
+
+        self._script_sha = self.connection.execute('SCRIPT', 'LOAD', TOKEN_BUCKET_SCRIPT)
+        return self.connection.execute('EVALSHA', self._script_sha, 1, key, *args)
+
+    def consume(self, key, capacity, rate, now, cost=1):
+        """Take `cost` tokens from a bucket; returns (allowed, remaining, retry_after)"""
+        allowed, tokens, retry_after = self._eval(
+            self.key_prefix + key, capacity, repr(rate), repr(now), cost
+        )
+        return bool(allowed), float(tokens), float(retry_after)
+
+    def set_flag(self, key, ttl, now):
+        """Set a flag that expires after `ttl` seconds"""
+        self.connection.execute('SET', self.key_prefix + key, '1', 'PX', max(1, int(ttl * 1000)))
+
+    def has_flag(self, key, now):
+        """Whether a flag is set and not yet expired"""
+        return bool(self.connection.execute('EXISTS', self.key_prefix + key))
+
+
+def create_storage(url, timeout=0.5, key_prefix='memora:ratelimit:'):
+    """Pick a storage backend from RATELIMIT_STORAGE_URL"""
+    scheme = urlparse(url or 'memory://').scheme
+    if scheme in ('redis', 'rediss'):
+        return RedisStorage(RespConnection.from_url(url, timeout=timeout), key_prefix=key_prefix)
+    if scheme == 'memory':
+        return MemoryStorage()
+    raise ValueError(f'Unsupported rate limit storage: {url}')
+
+
+def rate_limit(endpoint_class):
+    """Assign a view to a rate limit budget (see RATELIMIT_BUDGETS)"""
+    def decorator(view):
+        view.rate_limit_class = endpoint_class
+        return view
+    return decorator
+
+
+class RateLimiter:
+    """Per-client token bucket admission control, one budget per endpoint class"""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.budgets = {}
+        self.storage = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure storage and register the request hooks"""
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.budgets = app.config.get('RATELIMIT_BUDGETS', {})
+        self.storage = create_storage(
+            app.config.get('RATELIMIT_STORAGE_URL', 'memory://'),
+            timeout=app.config.get('RATELIMIT_STORAGE_TIMEOUT', 0.5)
+        )
+        app.extensions['rate_limiter'] = self
+
+        workers = app.config.get('WEB_CONCURRENCY') or 1
+        if self.enabled and isinstance(self.storage, MemoryStorage) and workers > 1:
+            # Each worker keeps its own buckets, so a client gets up to `workers` budgets
+            logger.warning(
+                f"Rate limits are per worker with memory:// storage and WEB_CONCURRENCY={workers}; "
+                f"set REDIS_URL to enforce them across workers"
+            )
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def client_key(self):
+        """Identify the caller by address (behind a proxy, the hop ProxyFix trusts)"""
+        return request.remote_addr or 'unknown'
+
+    def _endpoint_class(self):
+        view = current_app.view_functions.get(request.endpoint)
+        if view is None:
+            return None
+        return getattr(view, 'rate_limit_class', 'default')
+
+    def _before_request(self):
+        if not self.enabled or request.method == 'OPTIONS':
+            return None
+
+        endpoint_class = self._endpoint_class()
+        budget = self.budgets.get(endpoint_class)
+        if budget is None:
+            return None
+
+        capacity, period = budget
+        rate = capacity / period
+        key = f'{endpoint_class}:{self.client_key()}'
+
+        try:
+            allowed, remaining, retry_after = self.storage.consume(key, capacity, rate, time.time())
+        except (OSError, ConnectionError, RespError) as e:
+            # Fail open: a storage outage must not take the API down with it
+            logger.warning(f"Rate limit storage unavailable: {e}")
+            return None
+
+        g.rate_limit = (capacity, int(remaining))
+        if not allowed:
+            retry_seconds = max(1, int(math.ceil(retry_after)))
+            response = jsonify({'error': 'Too many requests, please try again later'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_seconds)
+            return response
+
+        return None
+
+    def _after_request(self, response):
+        limit = g.pop('rate_limit', None)
+        if limit is not None:
+            response.headers['X-RateLimit-Limit'] = str(limit[0])
+            response.headers['X-RateLimit-Remaining'] = str(limit[1])
+        return response
+
+
+rate_limiter = RateLimiter()
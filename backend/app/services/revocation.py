@@ -0,0 +1,142 @@
+# app/services/revocation.py
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from app import db
+from app.models.revoked_token import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        """Add an item to the filter"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """In-memory mirror of the revoked_tokens table.
+
+    Lookups only touch the database when the Bloom filter reports a possible
+    match. Each process pulls new revocations incrementally at most once per
+    refresh interval, so a token revoked on another worker is rejected
+    everywhere within that interval.
+
+    revoked_at is stamped before the revoking transaction commits, so a row
+    can become visible after a newer one was already pulled. Each pull
+    therefore starts overlap_seconds before the watermark (the longest a
+    revoking transaction is expected to stay open) and skips the jtis the
+    filter already holds.
+    """
+
+    def __init__(self, app=None):
+        self.refresh_interval = 5
+        self.capacity = 100000
+        self.error_rate = 0.001
+        self.overlap_seconds = 60
+        self._filter = None
+        self._watermark = None
+        self._next_refresh = 0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read revocation settings from the app config"""
+        self.refresh_interval = app.config.get('JWT_REVOCATION_REFRESH_SECONDS', 5)
+        self.capacity = app.config.get('JWT_REVOCATION_FILTER_CAPACITY', 100000)
+        self.error_rate = app.config.get('JWT_REVOCATION_FILTER_ERROR_RATE', 0.001)
+        self.overlap_seconds = app.config.get('JWT_REVOCATION_OVERLAP_SECONDS', 60)
+        self.reset()
+        app.extensions['revocation_list'] = self
+
+    def reset(self):
+        """Forget the in-memory filter; it is rebuilt from the database on next use"""
+        with self._lock:
+            self._filter = None
+            self._watermark = None
+            self._next_refresh = 0
+
+    def refresh(self, force=False):
+        """Pull revocations recorded since the last refresh into the filter"""
+        now = time.monotonic()
+        if not force and self._filter is not None and now < self._next_refresh:
+            return
+
+        with self._lock:
+            if not force and self._filter is not None and now < self._next_refresh:
+                return
+
+            rebuild = self._filter is None or self._filter.count >= self._filter.capacity
+            if rebuild:
+                capacity = self.capacity
+                if self._filter is not None:
+                    capacity = self._filter.capacity * 2
+                bloom = BloomFilter(capacity, self.error_rate)
+                rows = RevokedToken.revoked_since(None)
+            else:
+                bloom = self._filter
+                since = None
+                if self._watermark is not None:
+                    since = self._watermark - timedelta(seconds=self.overlap_seconds)
+                rows = RevokedToken.revoked_since(since)
+
+            watermark = self._watermark if not rebuild else None
+            for jti, revoked_at in rows:
+                # Rows inside the overlap window are returned again on every pull
+                if jti not in bloom:
+                    bloom.add(jti)
+                if watermark is None or revoked_at > watermark:
+                    watermark = revoked_at
+
+            self._filter = bloom
+            self._watermark = watermark
+            self._next_refresh = now + self.refresh_interval
+
+    def is_revoked(self, jti):
+        """Check if a token has been revoked"""
+        if not jti:
+            return False
+
+        self.refresh()
+        if jti not in self._filter:
+            return False
+
+        # Possible match (or a false positive) - confirm with the database
+        return RevokedToken.exists(jti)
+
+    def revoke(self, jti, user_id=None, expires_at=None):
+        """Stage a revocation; the caller commits the session"""
+        if not RevokedToken.exists(jti):
+            db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+
+        self.refresh()
+        with self._lock:
+            if jti not in self._filter:
+                self._filter.add(jti)
+
+
+revocation_list = RevocationList()
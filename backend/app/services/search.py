@@ -0,0 +1,197 @@
+# app/services/search.py
+import html
+import re
+from sqlalchemy import event, DDL, String, bindparam, text
+from app.models.types import GUID
+
+# Markers placed around matches by the database; swapped for <mark> after escaping
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+# Postgres: a weighted tsvector maintained by a trigger on every obituary write
+# (insert, update, upsert), with a GIN index over it. A trigger rather than a
+# generated column, so the migration can add it without rewriting the table.
+POSTGRES_DDL = [
+    "ALTER TABLE obituaries ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION obituaries_search_vector_update() RETURNS trigger AS $$ BEGIN "
+    "NEW.search_vector := "
+    "setweight(to_tsvector('english', coalesce(NEW.full_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(NEW.birth_place, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(NEW.life_story, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(NEW.survived_by, '')), 'C'); "
+    "RETURN NEW; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER obituaries_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF full_name, birth_place, life_story, survived_by ON obituaries "
+    "FOR EACH ROW EXECUTE FUNCTION obituaries_search_vector_update()",
+    "CREATE INDEX IF NOT EXISTS ix_obituaries_search_vector ON obituaries USING GIN (search_vector)",
+]
+
+# SQLite: an FTS5 table maintained by triggers. Rows carry the obituary's
+# memorial_id (unique per obituary) rather than relying on its implicit rowid,
+# which VACUUM and batch table rebuilds are free to renumber.
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS obituaries_fts USING fts5("
+    "memorial_id UNINDEXED, full_name, birth_place, life_story, survived_by, "
+    "tokenize = 'porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS obituaries_fts_insert AFTER INSERT ON obituaries BEGIN "
+    "INSERT INTO obituaries_fts (memorial_id, full_name, birth_place, life_story, survived_by) "
+    "VALUES (new.memorial_id, new.full_name, new.birth_place, new.life_story, new.survived_by); END",
+    "CREATE TRIGGER IF NOT EXISTS obituaries_fts_update AFTER UPDATE ON obituaries BEGIN "
+    "DELETE FROM obituaries_fts WHERE memorial_id = old.memorial_id; "
+    "INSERT INTO obituaries_fts (memorial_id, full_name, birth_place, life_story, survived_by) "
+    "VALUES (new.memorial_id, new.full_name, new.birth_place, new.life_story, new.survived_by); END",
+    "CREATE TRIGGER IF NOT EXISTS obituaries_fts_delete AFTER DELETE ON obituaries BEGIN "
+    "DELETE FROM obituaries_fts WHERE memorial_id = old.memorial_id; END",
+]
+
+SQLITE_DROP = "DROP TABLE IF EXISTS obituaries_fts"
+
+SQLITE_REBUILD = [
+    "DELETE FROM obituaries_fts",
+    "INSERT INTO obituaries_fts (memorial_id, full_name, birth_place, life_story, survived_by) "
+    "SELECT memorial_id, full_name, birth_place, life_story, survived_by FROM obituaries",
+]
+
+POSTGRES_SEARCH = """
+SELECT hits.memorial_id, hits.rank, m.title, m.deceased_name, o.full_name, o.birth_place,
+       ts_headline('english',
+                   concat_ws(' … ', o.life_story, o.survived_by),
+                   hits.query,
+                   'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxFragments=2, MaxWords=20, MinWords=8'
+       ) AS snippet
+FROM (
+    SELECT o.id, o.memorial_id, q.query, ts_rank_cd(o.search_vector, q.query) AS rank
+    FROM obituaries o
+    JOIN memorials m ON m.id = o.memorial_id
+    CROSS JOIN websearch_to_tsquery('english', :query) AS q(query)
+    WHERE o.search_vector @@ q.query AND m.deleted_at IS NULL AND {scope}
+    ORDER BY rank DESC, o.memorial_id
+    LIMIT :limit OFFSET :offset
+) AS hits
+JOIN obituaries o ON o.id = hits.id
+JOIN memorials m ON m.id = hits.memorial_id
+ORDER BY hits.rank DESC, hits.memorial_id
+"""
+
+SQLITE_SEARCH = """
+SELECT o.memorial_id, bm25(obituaries_fts, 10.0, 4.0, 1.0, 1.0) AS rank,
+       m.title, m.deceased_name, o.full_name, o.birth_place,
+       snippet(obituaries_fts, -1, char(2), char(3), ' … ', 16) AS snippet
+FROM obituaries_fts
+JOIN obituaries o ON o.memorial_id = obituaries_fts.memorial_id
+JOIN memorials m ON m.id = o.memorial_id
+WHERE obituaries_fts MATCH :query AND m.deleted_at IS NULL AND {scope}
+ORDER BY rank, o.memorial_id
+LIMIT :limit OFFSET :offset
+"""
+
+
+def fts5_query(query):
+    """Turn free text into a safe FTS5 expression.
+
+    Quoted phrases stay phrases, every other word must match, and the last
+    word also matches as a prefix. FTS5 operators typed by the user are
+    treated as plain words.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        words = re.findall(r'\w+', phrase or word)
+        if words:
+            terms.append((' '.join(words), bool(phrase)))
+
+    if not terms:
+        return None
+
+    parts = [f'"{words}"' for words, _ in terms]
+    last_words, is_phrase = terms[-1]
+    if not is_phrase and ' ' not in last_words:
+        parts[-1] += '*'
+    return ' '.join(parts)
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and wrap matches in <mark>"""
+    if not snippet:
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+class ObituarySearch:
+    """Full-text search over obituaries (tsvector + GIN on Postgres, FTS5 on SQLite)"""
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+
+        if app is not None and db is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        """Create the index objects alongside the obituaries table"""
+        self.db = db
+        app.extensions['obituary_search'] = self
+
+        from app.models.program import Obituary
+        table = Obituary.__table__
+        if table.info.get('search_ddl'):
+            return  # Already registered by an earlier app instance
+        table.info['search_ddl'] = True
+
+        for statement in POSTGRES_DDL:
+            event.listen(table, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+        for statement in SQLITE_DDL:
+            event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+        event.listen(table, 'after_drop', DDL(SQLITE_DROP).execute_if(dialect='sqlite'))
+
+    def dialect(self):
+        """Name of the database dialect in use"""
+        return self.db.session.get_bind().dialect.name
+
+    def search(self, query, user_id=None, guest_session=None, limit=20, offset=0):
+        """Ranked obituary matches within the caller's memorials.
+
+        Returns (results, has_more); each result carries the memorial id,
+        names, rank and a highlighted snippet.
+        """
+        if user_id is not None:
+            scope, owner = 'm.user_id = :owner', bindparam('owner', user_id, type_=GUID())
+        elif guest_session:
+            scope, owner = 'm.guest_session = :owner', bindparam('owner', guest_session, type_=String())
+        else:
+            return [], False
+
+        if self.dialect() == 'postgresql':
+            statement, match = POSTGRES_SEARCH, query
+        else:
+            statement, match = SQLITE_SEARCH, fts5_query(query)
+            if match is None:
+                return [], False
+
+        stmt = text(statement.format(scope=scope)).bindparams(owner).columns(memorial_id=GUID())
+        rows = self.db.session.execute(stmt, {'query': match, 'limit': limit + 1, 'offset': offset}).fetchall()
+
+        has_more = len(rows) > limit
+        return [self._to_dict(row) for row in rows[:limit]], has_more
+
+    @staticmethod
+    def _to_dict(row):
+        return {
+            'memorial_id': row.memorial_id,
+            'title': row.title,
+            'deceased_name': row.deceased_name,
+            'full_name': row.full_name,
+            'birth_place': row.birth_place,
+            'snippet': highlight(row.snippet),
+            'rank': round(abs(float(row.rank)), 6)
+        }
+
+    def rebuild(self):
+        """Repopulate the SQLite FTS table from obituaries, restoring its triggers
+        (a batch table rebuild drops them)"""
+        if self.dialect() != 'sqlite':
+            return
+        for statement in SQLITE_DDL + SQLITE_REBUILD:
+            self.db.session.execute(text(statement))
+
+
+obituary_search = ObituarySearch()
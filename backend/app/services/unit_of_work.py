@@ -0,0 +1,84 @@
+# app/services/unit_of_work.py
+import logging
+from flask import g, request, jsonify, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Methods whose changes are committed at the end of the request
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class UnitOfWork:
+    """One transaction per API call.
+
+    Views and model helpers only stage changes (and flush when they need
+    generated values); the session is committed exactly once after a
+    successful write request and rolled back otherwise. Per-request query
+    and commit counters are kept so tests can assert on them.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.expose_headers = False
+        self.last_request_stats = None
+
+        if app is not None and db is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        """Register the request hooks and the engine counters"""
+        self.db = db
+        self.expose_headers = app.config.get('DB_STATS_HEADERS', False)
+        app.extensions['unit_of_work'] = self
+
+        if not event.contains(Engine, 'before_cursor_execute', _count_query):
+            event.listen(Engine, 'before_cursor_execute', _count_query)
+            event.listen(Engine, 'commit', _count_commit)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        g.db_stats = {'queries': 0, 'commits': 0}
+
+    def _after_request(self, response):
+        session = self.db.session
+
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.exception(f"Commit failed for {request.endpoint}: {e}")
+                response = jsonify({'error': 'Failed to save changes'})
+                response.status_code = 500
+        else:
+            session.rollback()
+
+        stats = g.get('db_stats')
+        if stats is not None:
+            self.last_request_stats = dict(stats, endpoint=request.endpoint)
+            if self.expose_headers:
+                response.headers['X-DB-Queries'] = str(stats['queries'])
+                response.headers['X-DB-Commits'] = str(stats['commits'])
+
+        return response
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        stats = g.get('db_stats')
+        if stats is not None:
+            stats['queries'] += 1
+
+
+def _count_commit(conn):
+    if has_app_context():
+        stats = g.get('db_stats')
+        if stats is not None:
+            stats['commits'] += 1
+
+
+unit_of_work = UnitOfWork()
@@ -0,0 +1,86 @@
+# app/utils/async_files.py
+import asyncio
+import shutil
+from contextvars import ContextVar
+import aiofiles
+
+# Bytes per read when copying an upload stream to disk
+CHUNK_SIZE = 64 * 1024
+
+# The ASGI server's event loop; set per request by app.services.asgi_adapter and
+# carried into the request thread with the context. None under WSGI servers.
+server_loop = ContextVar('server_loop', default=None)
+
+
+async def _read(path):
+    try:
+        async with aiofiles.open(path, 'rb') as file:
+            return await file.read()
+    except OSError:
+        return None
+
+
+async def _write(path, source):
+    async with aiofiles.open(path, 'wb') as file:
+        if isinstance(source, bytes):
+            await file.write(source)
+            return
+        while True:
+            # The stream may be a spooled temp file on disk; read it off the loop
+            chunk = await asyncio.to_thread(source.read, CHUNK_SIZE)
+            if not chunk:
+                break
+            await file.write(chunk)
+
+
+async def _read_all(paths):
+    return await asyncio.gather(*(_read(path) for path in paths))
+
+
+async def _write_all(files):
+    await asyncio.gather(*(_write(path, source) for path, source in files))
+
+
+def _read_sync(path):
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def _write_sync(path, source):
+    with open(path, 'wb') as file:
+        if isinstance(source, bytes):
+            file.write(source)
+        else:
+            shutil.copyfileobj(source, file, CHUNK_SIZE)
+
+
+def read_files(paths):
+    """Read files; returns their bytes in order (None for unreadable ones).
+
+    Under the ASGI server the reads run concurrently on its event loop.
+    Under WSGI servers there is no loop to borrow, so they run one after
+    another with plain file I/O.
+    """
+    paths = list(paths)
+    loop = server_loop.get()
+    if not paths or loop is None:
+        return [_read_sync(path) for path in paths]
+    return asyncio.run_coroutine_threadsafe(_read_all(paths), loop).result()
+
+
+def write_files(files):
+    """Write (path, bytes or readable stream) pairs; raises the first OSError.
+
+    Streams are copied in CHUNK_SIZE pieces, so an upload is never held in
+    memory whole.
+    """
+    files = list(files)
+    loop = server_loop.get()
+    if not files or loop is None:
+        for path, source in files:
+            _write_sync(path, source)
+        return
+    asyncio.run_coroutine_threadsafe(_write_all(files), loop).result()
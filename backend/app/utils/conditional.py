@@ -0,0 +1,63 @@
+# app/utils/conditional.py
+import hashlib
+from functools import wraps
+from flask import request, make_response, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from app.models.memorial import Memorial
+
+
+def memorial_etag(scope, updated_at):
+    """Opaque ETag value for one view of a memorial at a given version"""
+    raw = f'{scope}|{updated_at.isoformat()}'.encode('utf-8')
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def _can_access(version):
+    """Whether the caller owns the memorial, by user id or guest session.
+
+    A missing identity never matches, so an anonymous caller is not taken for
+    the owner of a guest memorial (both user ids None).
+    """
+    user_id = None
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except:
+        pass
+
+    guest_session = request.headers.get('X-Guest-Session')
+    return (user_id is not None and version.user_id == user_id) or \
+        (bool(guest_session) and version.guest_session == guest_session)
+
+
+def _set_validators(response, etag):
+    response.set_etag(etag, weak=True)
+    # Let the browser keep the body but ask every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional_memorial(view):
+    """Answer If-None-Match with 304 for GET views of a memorial or its sections.
+
+    Before the view runs, one primary-key query reads the memorial's owner and
+    updated_at (which Memorial.touch keeps current for every section change).
+    If the caller may see the memorial and sends the matching weak ETag, the
+    view is skipped entirely; otherwise its 200 response gets the ETag.
+    Missing or foreign memorials fall through to the view's own 404/403.
+    """
+    @wraps(view)
+    def wrapper(memorial_id, *args, **kwargs):
+        etag = None
+        version = Memorial.version_of(memorial_id)
+        if version is not None and _can_access(version):
+            etag = memorial_etag(f'{request.endpoint}|{memorial_id}', version.updated_at)
+            if request.if_none_match.contains_weak(etag):
+                return _set_validators(current_app.response_class(status=304), etag)
+
+        response = make_response(view(memorial_id, *args, **kwargs))
+        if etag is not None and response.status_code == 200:
+            _set_validators(response, etag)
+        return response
+
+    return wrapper
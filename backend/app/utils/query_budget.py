@@ -0,0 +1,39 @@
+# app/utils/query_budget.py - pytest plugin that fails tests over a SQL query budget
+#
+# Enable it from a conftest.py:
+#     pytest_plugins = ['app.utils.query_budget']
+# or on the command line:
+#     python -m pytest -p app.utils.query_budget
+#
+# Then, in a test:
+#     def test_list_memorials(client, auth_headers, query_budget):
+#         with query_budget(3):
+#             client.get('/api/memorials/', headers=auth_headers)
+from contextlib import contextmanager
+import pytest
+from app.services.query_profiler import QueryCounter
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager factory: fail the test if the block runs more than `max_queries` statements.
+
+    `max_repeats` additionally caps how often one statement shape may run
+    (catches N+1 loops that stay under the total budget).
+    """
+    @contextmanager
+    def budget(max_queries, max_repeats=None):
+        with QueryCounter() as counter:
+            yield counter
+
+        if counter.count > max_queries:
+            listing = '\n'.join(f'  {statement}' for statement in counter.statements)
+            pytest.fail(f'{counter.count} queries run, budget is {max_queries}:\n{listing}', pytrace=False)
+
+        if max_repeats is not None:
+            over = [(shape, count) for shape, count in counter.repeated() if count > max_repeats]
+            if over:
+                listing = '\n'.join(f'  {count}x {shape}' for shape, count in over)
+                pytest.fail(f'Statements repeated more than {max_repeats} times (N+1?):\n{listing}', pytrace=False)
+
+    return budget
@@ -0,0 +1,19 @@
+# asgi.py - ASGI entry point
+#
+# Usage (from the backend directory):
+#   uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers $WEB_CONCURRENCY
+#
+# The event loop accepts connections and receives request bodies, so slow
+# uploads do not hold a request thread; the Flask app then runs unchanged on
+# WEB_THREADS threads per process (see app/services/asgi_adapter.py). Files
+# under /uploads are streamed straight from the loop.
+import os
+
+# Same defaults as gunicorn.conf.py, so the DB pool is sized for these threads
+os.environ.setdefault('WEB_CONCURRENCY', '2')
+os.environ.setdefault('WEB_THREADS', '4')
+
+from run import app as flask_app
+from app.services.asgi_adapter import MemoraASGI
+
+app = MemoraASGI(flask_app, threads=int(os.environ['WEB_THREADS']))
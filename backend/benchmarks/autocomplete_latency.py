@@ -0,0 +1,108 @@
+# benchmarks/autocomplete_latency.py - Autocomplete latency against a budget
+#
+# Seeds one account with many memorials, then replays type-ahead keystrokes
+# through the API and fails (exit code 1) if the p95 exceeds the budget.
+#
+# Usage (from the backend directory):
+#   python benchmarks/autocomplete_latency.py --memorials 5000 --budget-ms 50
+#   DATABASE_URL=postgresql://... python benchmarks/autocomplete_latency.py
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+
+FIRST_NAMES = ['Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+               'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson']
+
+
+def build_app():
+    """Create a testing app on DATABASE_URL (in-memory SQLite by default)"""
+    from config import config, TestingConfig
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///:memory:')
+        AUTOCOMPLETE_CACHE_SECONDS = 0
+
+    config['bench'] = BenchConfig
+    return create_app('bench')
+
+
+def seed(app, count):
+    """Create a user owning `count` memorials; returns an access token"""
+    from app.models import User, Memorial
+
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        user = User(email=f'bench-{time.time_ns()}@example.com', password='bench-password')
+        db.session.add(user)
+        db.session.flush()
+
+        db.session.execute(db.insert(Memorial), [
+            {
+                'user_id': user.id,
+                'deceased_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'title': f'Celebration of Life #{i}'
+            }
+            for i in range(count)
+        ])
+        db.session.commit()
+        return create_access_token(identity=user.id)
+
+
+def keystrokes(word):
+    """Prefixes a user produces while typing a word"""
+    return [word[:i] for i in range(1, len(word) + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check autocomplete latency against a budget')
+    parser.add_argument('--memorials', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=50.0, help='p95 budget per request')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    app = build_app()
+    token = seed(app, args.memorials)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    words = FIRST_NAMES[:4] + LAST_NAMES[:4] + ['Celebration']
+    timings = []
+    for _ in range(args.rounds):
+        for word in words:
+            for prefix in keystrokes(word):
+                start = time.perf_counter()
+                response = client.get('/api/search/autocomplete', query_string={'q': prefix}, headers=headers)
+                timings.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.get_json()
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+
+    print(f"memorials: {args.memorials}, requests: {len(timings)}")
+    print(f"p50: {p50:7.2f} ms")
+    print(f"p95: {p95:7.2f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"max: {timings[-1]:7.2f} ms")
+
+    if p95 > args.budget_ms:
+        print("FAIL: p95 latency over budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
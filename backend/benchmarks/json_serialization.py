@@ -0,0 +1,138 @@
+# benchmarks/json_serialization.py - JSON encoding cost of realistic API payloads
+#
+# Builds a fully populated memorial (the review/PDF payload) and a page of
+# memorial summaries (the listing), then times app.json.dumps over them with
+# the orjson-backed provider and with the stdlib fallback.
+#
+# Usage (from the backend directory):
+#   python benchmarks/json_serialization.py
+#   python benchmarks/json_serialization.py --iterations 2000 --speeches 12 --photos 40
+import argparse
+import os
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+import app.services.json_provider as json_provider
+
+LIFE_STORY = ('Born in a small coastal town, she spent her life teaching, gardening and '
+              'gathering her family around the kitchen table every Sunday. ') * 30
+
+
+def build_app():
+    """Create a testing app on in-memory SQLite"""
+    from config import config, TestingConfig
+
+    class BenchConfig(TestingConfig):
+        DEBUG = False  # Compact output, as in production
+
+    config['bench'] = BenchConfig
+    return create_app('bench')
+
+
+def seed(speeches, photos, listing):
+    """Store one complete memorial plus `listing` bare ones for the same user"""
+    from app.models import (User, Memorial, Obituary, Speech, Photo, Acknowledgements,
+                            BodyViewing, RepassLocation, BurialLocation)
+
+    user = User(email='bench@example.com', password='bench-password')
+    db.session.add(user)
+    db.session.flush()
+
+    memorial = Memorial(user_id=user.id, title='Celebrating the Life of Mary Smith', deceased_name='Mary Smith')
+    db.session.add(memorial)
+    db.session.flush()
+
+    db.session.add_all([
+        Obituary(memorial_id=memorial.id, full_name='Mary Elizabeth Smith', birth_date=date(1941, 3, 14),
+                 death_date=date(2026, 9, 30), birth_place='Charleston, South Carolina',
+                 life_story=LIFE_STORY, survived_by='Her children Ann, Robert and Grace; nine grandchildren',
+                 preceded_by='Her husband John', tone='celebratory'),
+        Acknowledgements(memorial_id=memorial.id, acknowledgment_text='The family thanks everyone. ' * 10),
+        BodyViewing(memorial_id=memorial.id, has_viewing=True, viewing_date=date(2026, 10, 5),
+                    viewing_start_time='10:00', viewing_end_time='12:00', viewing_location='Grace Chapel'),
+        RepassLocation(memorial_id=memorial.id, has_repass=True, venue_name='Fellowship Hall',
+                       repass_address='12 Church St', repass_date=date(2026, 10, 5), repass_time='14:00'),
+        BurialLocation(memorial_id=memorial.id, burial_type='burial', cemetery_name='Magnolia Cemetery',
+                       burial_address='70 Cunnington Ave', burial_date=date(2026, 10, 5), burial_time='13:00'),
+    ])
+    db.session.add_all([
+        Speech(memorial_id=memorial.id, position=i, speaker_name=f'Speaker {i}', relationship='Grandchild',
+               speech_type='eulogy', notes='Five minutes, followed by a hymn')
+        for i in range(speeches)
+    ])
+    db.session.add_all([
+        Photo(memorial_id=memorial.id, filename=f'{i:04d}.jpg', original_filename=f'IMG_{i:04d}.jpg',
+              file_url=f'/uploads/memorial_{memorial.id}/{i:04d}.jpg', photo_type='gallery')
+        for i in range(photos)
+    ])
+
+    now = datetime.utcnow()
+    db.session.execute(db.insert(Memorial), [
+        {'user_id': user.id, 'title': f'Memorial #{i}', 'deceased_name': f'Person {i}',
+         'updated_at': now - timedelta(minutes=i)}
+        for i in range(listing)
+    ])
+    db.session.commit()
+    return user.id, memorial.id
+
+
+def time_dumps(app, payload, iterations):
+    """Microseconds per app.json.dumps call"""
+    app.json.dumps(payload)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        app.json.dumps(payload)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time JSON encoding of memorial payloads')
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--speeches', type=int, default=8)
+    parser.add_argument('--photos', type=int, default=24)
+    parser.add_argument('--listing', type=int, default=50)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    app = build_app()
+    with app.app_context():
+        db.create_all()
+        from app.models import Memorial
+
+        user_id, memorial_id = seed(args.speeches, args.photos, args.listing)
+        memorial = db.session.get(Memorial, memorial_id)
+        summaries, _ = Memorial.list_summaries_for_user(user_id, limit=args.listing)
+
+        payloads = {
+            'memorial with relations': {'memorial': memorial.to_dict(include_relations=True)},
+            f'listing of {len(summaries)}': {'memorials': summaries, 'next_cursor': None},
+        }
+
+        orjson = json_provider.orjson
+        if orjson is None:
+            print("orjson is not installed; only the stdlib encoder is measured")
+
+        print(f"{'payload':>26} {'bytes':>8} {'stdlib us':>10} {'orjson us':>10} {'speedup':>8}")
+        for name, payload in payloads.items():
+            size = len(app.json.dumps(payload).encode('utf-8'))
+
+            json_provider.orjson = None
+            stdlib_us = time_dumps(app, payload, args.iterations)
+            json_provider.orjson = orjson
+
+            if orjson is None:
+                print(f"{name:>26} {size:8d} {stdlib_us:10.1f} {'-':>10} {'-':>8}")
+                continue
+
+            orjson_us = time_dumps(app, payload, args.iterations)
+            print(f"{name:>26} {size:8d} {stdlib_us:10.1f} {orjson_us:10.1f} {stdlib_us / orjson_us:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
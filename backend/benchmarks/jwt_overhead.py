@@ -0,0 +1,63 @@
+# benchmarks/jwt_overhead.py - Per-request cost of verify_jwt_in_request with and without the claims cache
+#
+# Usage (from the backend directory):
+#   python benchmarks/jwt_overhead.py --iterations 20000
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token, verify_jwt_in_request, get_jwt_identity
+from app import create_app
+
+
+def build_app(cache_size):
+    """Create a testing app with the given JWT_CLAIMS_CACHE_SIZE"""
+    from config import config, TestingConfig
+
+    class BenchConfig(TestingConfig):
+        JWT_CLAIMS_CACHE_SIZE = cache_size
+
+    config['bench'] = BenchConfig
+    return create_app('bench')
+
+
+def measure(app, iterations):
+    """Average microseconds spent authenticating one request"""
+    with app.app_context():
+        token = create_access_token(identity='bench-user')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Request context setup is the same in both runs, so time only the auth call
+    total = 0.0
+    for _ in range(iterations):
+        with app.test_request_context('/api/memorials/', headers=headers):
+            start = time.perf_counter()
+            verify_jwt_in_request(optional=True)
+            get_jwt_identity()
+            total += time.perf_counter() - start
+
+    return total / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JWT verification overhead per request')
+    parser.add_argument('--iterations', type=int, default=10000)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    uncached = measure(build_app(0), args.iterations)
+    cached = measure(build_app(4096), args.iterations)
+
+    print(f"iterations: {args.iterations}")
+    print(f"without cache: {uncached:8.1f} us/request")
+    print(f"with cache:    {cached:8.1f} us/request")
+    print(f"speedup:       {uncached / cached:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/login_throughput.py - Throughput of /api/auth/login under concurrency
+#
+# Usage (from the backend directory):
+#   python benchmarks/login_throughput.py
+#   python benchmarks/login_throughput.py --rounds 12 --concurrency 1 8 32
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.user import User
+
+EMAIL = 'bench@example.com'
+PASSWORD = 'benchmark-password'
+
+
+def build_app(rounds, workers, max_queue):
+    """Create a testing app backed by a throwaway SQLite file"""
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+
+    from config import TestingConfig
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file.name}'
+        BCRYPT_LOG_ROUNDS = rounds
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_MAX_QUEUE = max_queue
+
+    from config import config
+    config['bench'] = BenchConfig
+    app = create_app('bench')
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email=EMAIL, password=PASSWORD))
+        db.session.commit()
+
+    return app, db_file.name
+
+
+def run_level(app, concurrency, requests_per_client):
+    """Fire logins from `concurrency` client threads and time them"""
+    latencies = []
+    statuses = {}
+
+    def client():
+        local = []
+        codes = {}
+        test_client = app.test_client()
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            response = test_client.post('/api/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+            local.append(time.perf_counter() - start)
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        return local, codes
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for local, codes in pool.map(lambda _: client(), range(concurrency)):
+            latencies.extend(local)
+            for code, count in codes.items():
+                statuses[code] = statuses.get(code, 0) + count
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'ok': statuses.get(200, 0),
+        'busy': statuses.get(503, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /api/auth/login throughput')
+    parser.add_argument('--rounds', type=int, default=10, help='bcrypt work factor')
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_HASH_WORKERS')
+    parser.add_argument('--max-queue', type=int, default=16, help='PASSWORD_HASH_MAX_QUEUE')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32])
+    parser.add_argument('--requests', type=int, default=10, help='requests per client thread')
+    args = parser.parse_args()
+
+    app, db_path = build_app(args.rounds, args.workers, args.max_queue)
+    print(f"bcrypt rounds={args.rounds} workers={args.workers} max_queue={args.max_queue}")
+    print(f"{'clients':>8} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'200':>6} {'503':>6}")
+
+    try:
+        for concurrency in args.concurrency:
+            result = run_level(app, concurrency, args.requests)
+            print(f"{result['concurrency']:>8} {result['requests']:>6} {result['throughput']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['ok']:>6} {result['busy']:>6}")
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/server_throughput.py - Flask dev server vs gunicorn under concurrent load
+#
+# Starts each launcher on a throwaway SQLite database, then drives it over
+# HTTP from client threads for a fixed time and reports throughput and
+# latency for a memorial read (the app's most common request).
+#
+# Usage (from the backend directory):
+#   python benchmarks/server_throughput.py
+#   python benchmarks/server_throughput.py --clients 32 --seconds 20 --launchers gunicorn
+#   WEB_CONCURRENCY=4 WEB_THREADS=8 python benchmarks/server_throughput.py
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+GUEST_SESSION = 'bench-guest-session'
+
+LAUNCHERS = {
+    # What render.yaml used to run: Flask's development server via app.run
+    'dev': [sys.executable, 'run.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+}
+
+
+def seed(database_url):
+    """Create the schema and one guest memorial with an obituary and speeches; returns its id"""
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app, db
+    from app.models import Memorial, Obituary, Speech
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        memorial = Memorial(guest_session=GUEST_SESSION, deceased_name='Ada Lovelace', title='In Loving Memory')
+        db.session.add(memorial)
+        db.session.flush()
+        db.session.add(Obituary(memorial_id=memorial.id, full_name='Ada Lovelace',
+                                life_story='Mathematician and writer. ' * 40))
+        db.session.add_all([
+            Speech(memorial_id=memorial.id, position=i, speaker_name=f'Speaker {i}', speech_type='eulogy')
+            for i in range(5)
+        ])
+        db.session.commit()
+        return memorial.id
+
+
+def start_server(name, port, env, command=None):
+    """Launch a server process (LAUNCHERS[name] unless `command` is given) and wait until /health answers"""
+    process = subprocess.Popen(command or LAUNCHERS[name], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{name} did not start on port {port}')
+
+
+def drive(port, path, clients, seconds):
+    """Hit `path` from `clients` threads for `seconds`; returns (latencies, errors)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client():
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                connection.request('GET', path, headers={'X-Guest-Session': GUEST_SESSION})
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except OSError:
+                failed += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the dev server and gunicorn under load')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--launchers', nargs='+', default=['dev', 'gunicorn'], choices=sorted(LAUNCHERS))
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    database_url = f'sqlite:///{db_file.name}'
+    memorial_id = seed(database_url)
+    path = f'/api/memorials/{memorial_id}'
+
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production', PORT=str(args.port),
+               RATELIMIT_ENABLED='false', PURGE_INTERVAL_SECONDS='0')
+
+    print(f"GET {path} with {args.clients} clients for {args.seconds:.0f}s "
+          f"(WEB_CONCURRENCY={os.environ.get('WEB_CONCURRENCY', '2')}, WEB_THREADS={os.environ.get('WEB_THREADS', '4')})")
+    print(f"{'launcher':>10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+
+    try:
+        for name in args.launchers:
+            process = start_server(name, args.port, env)
+            try:
+                drive(args.port, path, args.clients, 1.0)  # Warm up
+                latencies, errors = drive(args.port, path, args.clients, args.seconds)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000 if latencies else float('nan')
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else float('nan')
+            print(f"{name:>10} {len(latencies) / args.seconds:9.1f} {p50:9.2f} {p95:9.2f} {errors:7d}")
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/slow_uploads.py - gunicorn (sync) vs uvicorn (asgi.py) with slow uploads in flight
+#
+# Opens many photo uploads that trickle their body in like a weak mobile
+# connection, then measures how quickly the same server still answers a
+# memorial read. A sync worker holds a thread per upload while it reads the
+# body; the ASGI entry point receives bodies on its event loop.
+#
+# Usage (from the backend directory):
+#   python benchmarks/slow_uploads.py
+#   python benchmarks/slow_uploads.py --uploads 200 --trickle-seconds 20 --launchers asgi
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from server_throughput import GUEST_SESSION, seed, start_server
+
+LAUNCHERS = {
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '0.0.0.0', '--port', '{port}',
+             '--workers', os.environ.get('WEB_CONCURRENCY', '2'), '--log-level', 'warning'],
+}
+
+BOUNDARY = 'slow-upload-boundary'
+
+
+def upload_body(size):
+    """A multipart body with one photo of `size` bytes"""
+    head = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="photos"; filename="slow.jpg"\r\n'
+            'Content-Type: image/jpeg\r\n\r\n').encode('ascii')
+    return head + b'\xff' * size + f'\r\n--{BOUNDARY}--\r\n'.encode('ascii')
+
+
+def slow_upload(port, path, body, seconds, stop, results):
+    """Send `body` in small pieces spread over `seconds`; records the final status"""
+    try:
+        sock = socket.create_connection(('127.0.0.1', port), timeout=seconds + 30)
+        sock.sendall((f'POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nX-Guest-Session: {GUEST_SESSION}\r\n'
+                      f'Content-Type: multipart/form-data; boundary={BOUNDARY}\r\n'
+                      f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n').encode('ascii'))
+        pieces = 50
+        step = max(1, len(body) // pieces)
+        for offset in range(0, len(body), step):
+            if stop.is_set():
+                break
+            sock.sendall(body[offset:offset + step])
+            time.sleep(seconds / pieces)
+        status = sock.recv(64).split(b' ')[1].decode('ascii') if not stop.is_set() else 'aborted'
+        sock.close()
+    except OSError as e:
+        status = type(e).__name__
+    results.append(status)
+
+
+def probe(port, path, seconds):
+    """Sequential reads for `seconds`; returns (latencies, failures)"""
+    latencies, failures = [], 0
+    stop_at = time.monotonic() + seconds
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            connection.request('GET', path, headers={'X-Guest-Session': GUEST_SESSION})
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                failures += 1
+                continue
+        except OSError:
+            failures += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read latency while slow uploads are in flight')
+    parser.add_argument('--uploads', type=int, default=64)
+    parser.add_argument('--upload-kb', type=int, default=512)
+    parser.add_argument('--trickle-seconds', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--launchers', nargs='+', default=['gunicorn', 'asgi'], choices=sorted(LAUNCHERS))
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    upload_dir = tempfile.mkdtemp()
+    database_url = f'sqlite:///{db_file.name}'
+    memorial_id = seed(database_url)
+    read_path = f'/api/memorials/{memorial_id}'
+    upload_path = f'/api/photos/{memorial_id}/photos'
+    body = upload_body(args.upload_kb * 1024)
+
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production', PORT=str(args.port),
+               UPLOAD_FOLDER=upload_dir, RATELIMIT_ENABLED='false', PURGE_INTERVAL_SECONDS='0')
+
+    print(f"GET {read_path} while {args.uploads} uploads of {args.upload_kb} KB trickle in over "
+          f"{args.trickle_seconds:.0f}s (WEB_CONCURRENCY={os.environ.get('WEB_CONCURRENCY', '2')}, "
+          f"WEB_THREADS={os.environ.get('WEB_THREADS', '4')})")
+    print(f"{'launcher':>10} {'reads':>6} {'p50 ms':>9} {'max ms':>9} {'failed':>7} {'uploads ok':>11}")
+
+    for name in args.launchers:
+        command = [part.format(port=args.port) for part in LAUNCHERS[name]]
+        process = start_server(name, args.port, env, command=command)
+        stop, results = threading.Event(), []
+        try:
+            uploaders = [threading.Thread(target=slow_upload,
+                                          args=(args.port, upload_path, body, args.trickle_seconds, stop, results))
+                         for _ in range(args.uploads)]
+            for thread in uploaders:
+                thread.start()
+            time.sleep(1.0)  # Let every upload get its headers in
+
+            latencies, failures = probe(args.port, read_path, args.trickle_seconds - 2)
+
+            for thread in uploaders:
+                thread.join(timeout=args.trickle_seconds + 60)
+        finally:
+            stop.set()
+            process.terminate()
+            process.wait(timeout=30)
+
+        p50 = statistics.median(latencies) * 1000 if latencies else float('nan')
+        worst = max(latencies) * 1000 if latencies else float('nan')
+        uploaded = sum(1 for status in results if status == '201')
+        print(f"{name:>10} {len(latencies):6d} {p50:9.2f} {worst:9.2f} {failures:7d} {uploaded:>5d}/{args.uploads:<5d}")
+
+    os.unlink(db_file.name)
+    shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
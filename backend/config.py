@@ -15,15 +15,43 @@ class Config:
     # Database Configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///memoras.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_STATS_HEADERS = False  # Add X-DB-Queries / X-DB-Commits to responses
+    # Optional read replica: GETs read from it unless the caller wrote recently
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 10))
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
     }
     
+    # Connection pool sizing ('auto' derives it from the worker layout, 'off' leaves SQLAlchemy defaults)
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'auto')
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))  # Worker processes
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 1))  # Request threads per worker
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 0))  # Server connection limit (0 = unknown)
+    DB_RESERVED_CONNECTIONS = int(os.environ.get('DB_RESERVED_CONNECTIONS', 5))  # Kept free for admin/migrations
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token required by /metrics when set
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
     JWT_ALGORITHM = 'HS256'
+    JWT_CLAIMS_CACHE_SIZE = int(os.environ.get('JWT_CLAIMS_CACHE_SIZE', 4096))  # 0 disables the cache
+    JWT_REVOCATION_REFRESH_SECONDS = int(os.environ.get('JWT_REVOCATION_REFRESH_SECONDS', 5))
+    JWT_REVOCATION_FILTER_CAPACITY = int(os.environ.get('JWT_REVOCATION_FILTER_CAPACITY', 100000))
+    # Each refresh re-reads this far behind its watermark, for revocations whose
+    # transaction committed after a newer one was already pulled
+    JWT_REVOCATION_OVERLAP_SECONDS = int(os.environ.get('JWT_REVOCATION_OVERLAP_SECONDS', 60))
+    
+    # Password Hashing (bcrypt runs on a dedicated bounded thread pool)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
     
     # File Upload Configuration
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
@@ -46,15 +74,66 @@ class Config:
     
     # CORS Configuration
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'https://memora-app-wawu.vercel.app/')
+    CORS_ORIGINS = ['http://localhost:5173', 'https://memora-app-wawu.vercel.app']
     
-    # Rate Limiting
+    # Rate Limiting (memory:// for a single node, redis://host:port/db to share buckets)
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL', 'memory://')
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    # Reverse proxies in front of the app; each appends one X-Forwarded-For hop, and
+    # only hops they appended are trusted as the client address (ProxyFix)
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+    # Endpoint class -> (burst capacity, seconds to refill it completely)
+    RATELIMIT_BUDGETS = {
+        'default': (120, 60),
+        'auth': (10, 60),
+        'guest_session': (5, 60),
+        'upload': (20, 60),
+        'pdf': (10, 60),
+        'autocomplete': (300, 60),
+        'public': (600, 60),
+    }
+    
+    # Autocomplete (in-process trigram indexes are used when not on Postgres)
+    AUTOCOMPLETE_CACHE_SECONDS = int(os.environ.get('AUTOCOMPLETE_CACHE_SECONDS', 30))
+    AUTOCOMPLETE_INDEX_OWNERS = int(os.environ.get('AUTOCOMPLETE_INDEX_OWNERS', 1024))
+    
+    # Per-request SQL profiling (N+1 warnings in the log, optional Server-Timing header)
+    QUERY_PROFILING = os.environ.get('QUERY_PROFILING', 'true').lower() == 'true'
+    SERVER_TIMING_HEADERS = os.environ.get('SERVER_TIMING_HEADERS', 'false').lower() == 'true'
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))  # Same statement per request
+    QUERY_COUNT_THRESHOLD = int(os.environ.get('QUERY_COUNT_THRESHOLD', 30))  # Statements per request
+    
+    # Response compression (br when the Brotli package is installed, else gzip)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # Bytes; smaller bodies go out as-is
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))  # 0-11; 4 suits dynamic responses
+    
+    # Background purge of soft-deleted memorials (0 disables the thread)
+    PURGE_INTERVAL_SECONDS = int(os.environ.get('PURGE_INTERVAL_SECONDS', 60))
+    PURGE_BATCH_SIZE = int(os.environ.get('PURGE_BATCH_SIZE', 100))
+    PURGE_BATCH_PAUSE_SECONDS = float(os.environ.get('PURGE_BATCH_PAUSE_SECONDS', 0.1))
+    
+    # Retention of abandoned guest drafts (0 days keeps them forever)
+    GUEST_DRAFT_RETENTION_DAYS = int(os.environ.get('GUEST_DRAFT_RETENTION_DAYS', 30))
+    GUEST_PURGE_HOURS = os.environ.get('GUEST_PURGE_HOURS', '2-6')  # UTC hours, e.g. '22-6' wraps midnight
+    GUEST_PURGE_BATCH_SIZE = int(os.environ.get('GUEST_PURGE_BATCH_SIZE', 25))
+    GUEST_PURGE_MAX_BATCHES = int(os.environ.get('GUEST_PURGE_MAX_BATCHES', 20))  # Per purger run
+    
+    # Public pages of published memorials (s-maxage only applies when edits can purge the CDN)
+    PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', 60))
+    PUBLIC_CACHE_S_MAXAGE = int(os.environ.get('PUBLIC_CACHE_S_MAXAGE', 86400))
+    CDN_PURGE_URL = os.environ.get('CDN_PURGE_URL')  # e.g. https://api.fastly.com/service/<id>/purge
+    CDN_PURGE_TOKEN = os.environ.get('CDN_PURGE_TOKEN')
+    CDN_PURGE_TOKEN_HEADER = os.environ.get('CDN_PURGE_TOKEN_HEADER', 'Fastly-Key')
+    CDN_PURGE_TIMEOUT = float(os.environ.get('CDN_PURGE_TIMEOUT', 5))
 
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
+    SERVER_TIMING_HEADERS = True
 
 
 class TestingConfig(Config):
@@ -62,7 +141,13 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_BINDS = {}
     WTF_CSRF_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4
+    RATELIMIT_ENABLED = False
+    DB_STATS_HEADERS = True
+    SERVER_TIMING_HEADERS = True
+    PURGE_INTERVAL_SECONDS = 0
 
 
 class ProductionConfig(Config):
@@ -70,12 +155,10 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     
-    # Override with more secure settings for production
+    # Pool size and overflow come from the DB_POOL_PROFILE sizing (see pool_sizing)
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
-        'pool_size': 10,
-        'max_overflow': 20,
     }
 
 
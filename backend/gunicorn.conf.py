@@ -0,0 +1,56 @@
+# gunicorn.conf.py - Production server settings
+#
+# Usage (from the backend directory):
+#   gunicorn -c gunicorn.conf.py run:app
+#
+# Worker model: a few processes (WEB_CONCURRENCY), each running WEB_THREADS
+# request threads (gthread). Requests mostly wait on Postgres, bcrypt (run on
+# its own thread pool), file uploads and WeasyPrint, so threads overlap that
+# waiting without gevent monkey-patching psycopg2. The same two variables
+# size each worker's DB connection pool (see app/services/pool_metrics.py).
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+
+# Import the app once in the master; workers fork with the code already loaded
+preload_app = True
+
+# PDF generation can take a while; keep-alive matches the proxy in front of us
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so WeasyPrint/Pillow memory growth is bounded
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# Render's proxy already logs every request; set GUNICORN_ACCESS_LOG=- to log here too
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Config.WEB_CONCURRENCY / WEB_THREADS default to 1 when unset; keep the pool
+# sizing in step with the defaults above
+os.environ.setdefault('WEB_CONCURRENCY', str(workers))
+os.environ.setdefault('WEB_THREADS', str(threads))
+
+
+def post_fork(server, worker):
+    """Give each worker its own DB connections and background threads"""
+    from run import app
+    from app import db
+    from app.services.purger import memorial_purger
+
+    # Connections opened in the master must not be shared across processes;
+    # close=False leaves them to the master instead of closing its sockets
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    # Threads do not survive fork
+    if memorial_purger.interval > 0:
+        memorial_purger.start()
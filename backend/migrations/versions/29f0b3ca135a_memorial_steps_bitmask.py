@@ -0,0 +1,90 @@
+"""Replace memorials.completed_steps JSON list with a steps_mask bitmask
+
+Revision ID: 29f0b3ca135a
+Revises: af35375f0296
+Create Date: 2026-10-19 12:03:18.274511
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '29f0b3ca135a'
+down_revision = 'af35375f0296'
+branch_labels = None
+depends_on = None
+
+
+# Bit order must match STEP_SEQUENCE in app/models/memorial.py
+STEP_SEQUENCE = [
+    'obituary',
+    'body_viewing',
+    'speeches',
+    'acknowledgements',
+    'repass_location',
+    'photos',
+    'burial_location'
+]
+
+memorials = sa.table(
+    'memorials',
+    sa.column('id'),
+    sa.column('completed_steps', sa.JSON),
+    sa.column('steps_mask', sa.Integer),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('steps_mask', sa.Integer(), server_default='0', nullable=False))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(memorials.c.id, memorials.c.completed_steps)).fetchall()
+    updates = []
+    for memorial_id, completed_steps in rows:
+        if isinstance(completed_steps, str):
+            completed_steps = json.loads(completed_steps)
+        mask = 0
+        for step in completed_steps or []:
+            if step in STEP_SEQUENCE:
+                mask |= 1 << STEP_SEQUENCE.index(step)
+        if mask:
+            updates.append({'memorial_id': memorial_id, 'mask': mask})
+
+    if updates:
+        conn.execute(
+            memorials.update()
+            .where(memorials.c.id == sa.bindparam('memorial_id'))
+            .values(steps_mask=sa.bindparam('mask')),
+            updates
+        )
+
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.drop_column('completed_steps')
+
+
+def downgrade():
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_steps', sa.JSON(), server_default='[]', nullable=False))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(memorials.c.id, memorials.c.steps_mask)).fetchall()
+    updates = [
+        {
+            'memorial_id': memorial_id,
+            'steps': [step for index, step in enumerate(STEP_SEQUENCE) if mask & (1 << index)]
+        }
+        for memorial_id, mask in rows if mask
+    ]
+    if updates:
+        conn.execute(
+            memorials.update()
+            .where(memorials.c.id == sa.bindparam('memorial_id'))
+            .values(completed_steps=sa.bindparam('steps', type_=sa.JSON)),
+            updates
+        )
+
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.drop_column('steps_mask')
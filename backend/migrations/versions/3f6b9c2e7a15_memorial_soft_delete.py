@@ -0,0 +1,53 @@
+"""Soft delete for memorials (deleted_at) with partial indexes
+
+Revision ID: 3f6b9c2e7a15
+Revises: e2a4c8f61d07
+Create Date: 2026-10-19 16:12:08.417530
+
+The listing index only covers live rows now, and a second partial index
+lets the purger find soft-deleted rows.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6b9c2e7a15'
+down_revision = 'e2a4c8f61d07'
+branch_labels = None
+depends_on = None
+
+# Tables whose rows cascade from memorials
+CHILD_TABLES = ['obituaries', 'acknowledgements', 'photos', 'speeches',
+                'body_viewings', 'repass_locations', 'burial_locations']
+
+
+def upgrade():
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.create_index('ix_memorials_user_updated_active', ['user_id', 'updated_at', 'id'], unique=False,
+                              postgresql_where=sa.text('deleted_at IS NULL'),
+                              sqlite_where=sa.text('deleted_at IS NULL'))
+        batch_op.create_index('ix_memorials_deleted_at', ['deleted_at'], unique=False,
+                              postgresql_where=sa.text('deleted_at IS NOT NULL'),
+                              sqlite_where=sa.text('deleted_at IS NOT NULL'))
+        batch_op.drop_index('ix_memorials_user_updated')
+
+
+def downgrade():
+    # Soft-deleted rows would become visible again, so finish deleting them first
+    # (explicitly, as SQLite runs migrations with foreign keys off)
+    for table in CHILD_TABLES:
+        op.execute(f'DELETE FROM {table} WHERE memorial_id IN (SELECT id FROM memorials WHERE deleted_at IS NOT NULL)')
+    op.execute('DELETE FROM memorials WHERE deleted_at IS NOT NULL')
+
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.create_index('ix_memorials_user_updated', ['user_id', 'updated_at', 'id'], unique=False)
+        batch_op.drop_index('ix_memorials_deleted_at')
+        batch_op.drop_index('ix_memorials_user_updated_active')
+
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
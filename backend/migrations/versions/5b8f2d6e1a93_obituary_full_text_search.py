@@ -0,0 +1,124 @@
+"""Full-text search index over obituaries
+
+Revision ID: 5b8f2d6e1a93
+Revises: 7c1e5a9d4b20
+Create Date: 2026-10-19 14:52:09.337106
+
+Postgres, online: a weighted tsvector column kept up to date by a trigger.
+Adding the column is catalog-only; existing rows are backfilled in batches,
+one commit per batch, and the GIN index is built CONCURRENTLY, so obituaries
+stay writable throughout.
+SQLite: an FTS5 table keyed by memorial_id, kept in sync by triggers and
+filled from existing rows.
+
+Statements are copied from app/services/search.py (the app creates the same
+objects for create_all); keep the two in step.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8f2d6e1a93'
+down_revision = '7c1e5a9d4b20'
+branch_labels = None
+depends_on = None
+
+
+POSTGRES_UPGRADE = [
+    "ALTER TABLE obituaries ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION obituaries_search_vector_update() RETURNS trigger AS $$ BEGIN "
+    "NEW.search_vector := "
+    "setweight(to_tsvector('english', coalesce(NEW.full_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(NEW.birth_place, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(NEW.life_story, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(NEW.survived_by, '')), 'C'); "
+    "RETURN NEW; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER obituaries_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF full_name, birth_place, life_story, survived_by ON obituaries "
+    "FOR EACH ROW EXECUTE FUNCTION obituaries_search_vector_update()",
+]
+
+# Touching full_name fires the trigger, which fills search_vector for the batch
+POSTGRES_BACKFILL = (
+    "WITH batch AS (SELECT id FROM obituaries {where} ORDER BY id LIMIT :size) "
+    "UPDATE obituaries SET full_name = obituaries.full_name FROM batch "
+    "WHERE obituaries.id = batch.id RETURNING obituaries.id"
+)
+BACKFILL_BATCH_SIZE = 1000
+
+POSTGRES_INDEX = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_obituaries_search_vector "
+    "ON obituaries USING GIN (search_vector)"
+)
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS obituaries_search_vector_update ON obituaries",
+    "DROP FUNCTION IF EXISTS obituaries_search_vector_update()",
+    "ALTER TABLE obituaries DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS obituaries_fts USING fts5("
+    "memorial_id UNINDEXED, full_name, birth_place, life_story, survived_by, "
+    "tokenize = 'porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS obituaries_fts_insert AFTER INSERT ON obituaries BEGIN "
+    "INSERT INTO obituaries_fts (memorial_id, full_name, birth_place, life_story, survived_by) "
+    "VALUES (new.memorial_id, new.full_name, new.birth_place, new.life_story, new.survived_by); END",
+    "CREATE TRIGGER IF NOT EXISTS obituaries_fts_update AFTER UPDATE ON obituaries BEGIN "
+    "DELETE FROM obituaries_fts WHERE memorial_id = old.memorial_id; "
+    "INSERT INTO obituaries_fts (memorial_id, full_name, birth_place, life_story, survived_by) "
+    "VALUES (new.memorial_id, new.full_name, new.birth_place, new.life_story, new.survived_by); END",
+    "CREATE TRIGGER IF NOT EXISTS obituaries_fts_delete AFTER DELETE ON obituaries BEGIN "
+    "DELETE FROM obituaries_fts WHERE memorial_id = old.memorial_id; END",
+    "DELETE FROM obituaries_fts",
+    "INSERT INTO obituaries_fts (memorial_id, full_name, birth_place, life_story, survived_by) "
+    "SELECT memorial_id, full_name, birth_place, life_story, survived_by FROM obituaries",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS obituaries_fts_delete",
+    "DROP TRIGGER IF EXISTS obituaries_fts_update",
+    "DROP TRIGGER IF EXISTS obituaries_fts_insert",
+    "DROP TABLE IF EXISTS obituaries_fts",
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        return
+
+    for statement in POSTGRES_UPGRADE:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        _backfill()
+        op.execute(POSTGRES_INDEX)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_obituaries_search_vector')
+    for statement in POSTGRES_DOWNGRADE:
+        op.execute(statement)
+
+
+def _backfill():
+    """Fill search_vector for existing rows, BACKFILL_BATCH_SIZE rows per commit"""
+    conn = op.get_bind()
+    last = None
+    while True:
+        where = '' if last is None else 'WHERE id > :last'
+        params = {'size': BACKFILL_BATCH_SIZE, 'last': last}
+        ids = conn.execute(sa.text(POSTGRES_BACKFILL.format(where=where)), params).scalars().all()
+        if not ids:
+            return
+        last = max(ids)
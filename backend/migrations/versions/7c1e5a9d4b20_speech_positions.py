@@ -0,0 +1,38 @@
+"""Explicit speech ordering: speeches.position and a (memorial_id, position) index
+
+Revision ID: 7c1e5a9d4b20
+Revises: 29f0b3ca135a
+Create Date: 2026-10-19 13:12:40.581237
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e5a9d4b20'
+down_revision = '29f0b3ca135a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('speeches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_speeches_memorial_position', ['memorial_id', 'position'], unique=False)
+
+    # Keep the order the speeches were created in: one pass over the table
+    # (UPDATE ... FROM needs SQLite 3.33+)
+    op.execute(
+        'UPDATE speeches SET position = ordered.position FROM ('
+        'SELECT id, ROW_NUMBER() OVER ('
+        'PARTITION BY memorial_id ORDER BY created_at NULLS FIRST, id) - 1 AS position '
+        'FROM speeches) AS ordered '
+        'WHERE speeches.id = ordered.id'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('speeches', schema=None) as batch_op:
+        batch_op.drop_index('ix_speeches_memorial_position')
+        batch_op.drop_column('position')
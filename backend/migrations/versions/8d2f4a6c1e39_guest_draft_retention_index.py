@@ -0,0 +1,28 @@
+"""Partial index on memorials.updated_at for guest drafts (user_id IS NULL)
+
+Revision ID: 8d2f4a6c1e39
+Revises: 3f6b9c2e7a15
+Create Date: 2026-10-19 16:48:51.203664
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4a6c1e39'
+down_revision = '3f6b9c2e7a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.create_index('ix_memorials_guest_updated', ['updated_at'], unique=False,
+                              postgresql_where=sa.text('user_id IS NULL'),
+                              sqlite_where=sa.text('user_id IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.drop_index('ix_memorials_guest_updated')
@@ -0,0 +1,29 @@
+"""Composite (user_id, updated_at, id) index for memorial listing
+
+Revision ID: af35375f0296
+Revises: d4e7abefe8b3
+Create Date: 2026-10-19 11:26:52.530914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'af35375f0296'
+down_revision = 'd4e7abefe8b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The composite index also serves plain user_id lookups, so the old one goes
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.create_index('ix_memorials_user_updated', ['user_id', 'updated_at', 'id'], unique=False)
+        batch_op.drop_index('ix_memorials_user_id')
+
+
+def downgrade():
+    with op.batch_alter_table('memorials', schema=None) as batch_op:
+        batch_op.create_index('ix_memorials_user_id', ['user_id'], unique=False)
+        batch_op.drop_index('ix_memorials_user_updated')
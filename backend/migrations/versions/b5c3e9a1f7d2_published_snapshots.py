@@ -0,0 +1,34 @@
+"""Add published_snapshots table for the public memorial pages
+
+Revision ID: b5c3e9a1f7d2
+Revises: 8d2f4a6c1e39
+Create Date: 2026-10-19 18:05:12.734905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c3e9a1f7d2'
+down_revision = '8d2f4a6c1e39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('published_snapshots',
+    sa.Column('memorial_id', sa.LargeBinary(length=16).with_variant(postgresql.UUID(as_uuid=True), 'postgresql'),
+              nullable=False),
+    sa.Column('version', sa.DateTime(), nullable=False),
+    sa.Column('etag', sa.String(length=32), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('rendered_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['memorial_id'], ['memorials.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('memorial_id')
+    )
+
+
+def downgrade():
+    op.drop_table('published_snapshots')
@@ -0,0 +1,234 @@
+"""Store UUID keys natively (Postgres) or as 16-byte blobs (SQLite)
+
+Revision ID: d4e7abefe8b3
+Revises: 192563e1b067
+Create Date: 2026-10-19 10:41:07.118342
+
+Postgres, online: ALTER COLUMN ... TYPE would rewrite every table under an
+ACCESS EXCLUSIVE lock, so each column gets a shadow column of the new type
+instead. A trigger keeps the shadow in step with writes while existing rows
+are backfilled in batches, one commit per batch, and the unique indexes are
+built CONCURRENTLY. The swap itself (drop the old column, rename the shadow,
+attach the indexes as constraints) only touches the catalog, under a short
+lock_timeout. Foreign keys come back NOT VALID and are validated afterwards.
+The swapped columns move to the end of each table.
+
+SQLite: the text ids are rewritten to 16 raw bytes, then the declared
+column types are changed with a batch table rebuild.
+
+"""
+import uuid
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e7abefe8b3'
+down_revision = '192563e1b067'
+branch_labels = None
+depends_on = None
+
+
+# Columns holding UUIDs, by table (parents before children)
+UUID_COLUMNS = {
+    'users': ['id'],
+    'memorials': ['id', 'user_id'],
+    'obituaries': ['id', 'memorial_id'],
+    'acknowledgements': ['id', 'memorial_id'],
+    'photos': ['id', 'memorial_id'],
+    'speeches': ['id', 'memorial_id'],
+    'body_viewings': ['id', 'memorial_id'],
+    'repass_locations': ['id', 'memorial_id'],
+    'burial_locations': ['id', 'memorial_id'],
+    'revoked_tokens': ['user_id'],
+}
+
+# (table, column, referenced table, ondelete)
+FOREIGN_KEYS = [
+    ('memorials', 'user_id', 'users', None),
+    ('obituaries', 'memorial_id', 'memorials', 'CASCADE'),
+    ('acknowledgements', 'memorial_id', 'memorials', 'CASCADE'),
+    ('photos', 'memorial_id', 'memorials', 'CASCADE'),
+    ('speeches', 'memorial_id', 'memorials', 'CASCADE'),
+    ('body_viewings', 'memorial_id', 'memorials', 'CASCADE'),
+    ('repass_locations', 'memorial_id', 'memorials', 'CASCADE'),
+    ('burial_locations', 'memorial_id', 'memorials', 'CASCADE'),
+    ('revoked_tokens', 'user_id', 'users', 'CASCADE'),
+]
+
+# Indexes on UUID columns, rebuilt on the new columns: (table, column, unique, name).
+# Names ending _pkey/_key are attached back as primary key/unique constraints.
+INDEXES = [
+    ('users', 'id', True, 'users_pkey'),
+    ('memorials', 'id', True, 'memorials_pkey'),
+    ('memorials', 'user_id', False, 'ix_memorials_user_id'),
+    ('obituaries', 'id', True, 'obituaries_pkey'),
+    ('obituaries', 'memorial_id', True, 'obituaries_memorial_id_key'),
+    ('acknowledgements', 'id', True, 'acknowledgements_pkey'),
+    ('acknowledgements', 'memorial_id', True, 'acknowledgements_memorial_id_key'),
+    ('photos', 'id', True, 'photos_pkey'),
+    ('speeches', 'id', True, 'speeches_pkey'),
+    ('body_viewings', 'id', True, 'body_viewings_pkey'),
+    ('body_viewings', 'memorial_id', True, 'body_viewings_memorial_id_key'),
+    ('repass_locations', 'id', True, 'repass_locations_pkey'),
+    ('repass_locations', 'memorial_id', True, 'repass_locations_memorial_id_key'),
+    ('burial_locations', 'id', True, 'burial_locations_pkey'),
+    ('burial_locations', 'memorial_id', True, 'burial_locations_memorial_id_key'),
+    ('revoked_tokens', 'user_id', False, 'ix_revoked_tokens_user_id'),
+]
+
+# Columns that allow NULL; every other UUID column is NOT NULL
+NULLABLE = {'user_id'}
+
+# Walk tables in key order while backfilling; revoked_tokens is keyed by jti
+BATCH_KEYS = {'revoked_tokens': 'jti'}
+BACKFILL_BATCH_SIZE = 5000
+
+# Suffix for the shadow columns (and their indexes) during the conversion
+SHADOW = '__new'
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _convert_postgresql('uuid', '{column}::uuid')
+    else:
+        _convert_sqlite(_to_bytes, sa.LargeBinary(length=16))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _convert_postgresql('varchar(36)', '{column}::text')
+    else:
+        _convert_sqlite(_to_text, sa.String(length=36))
+
+
+def _convert_postgresql(new_type, using):
+    op.execute("SET LOCAL lock_timeout = '5s'")
+
+    # Shadow columns, kept in step by a trigger; NOT NULL is staged as a CHECK
+    # so SET NOT NULL during the swap can skip the table scan
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.execute(f'ALTER TABLE {table} ADD COLUMN {column}{SHADOW} {new_type}')
+            if column not in NULLABLE:
+                op.execute(
+                    f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}{SHADOW}_not_null '
+                    f'CHECK ({column}{SHADOW} IS NOT NULL) NOT VALID'
+                )
+        assignments = ' '.join(
+            f'NEW.{column}{SHADOW} := {using.format(column=f"NEW.{column}")};' for column in columns
+        )
+        op.execute(
+            f'CREATE FUNCTION {table}{SHADOW}_sync() RETURNS trigger AS $$ '
+            f'BEGIN {assignments} RETURN NEW; END $$ LANGUAGE plpgsql'
+        )
+        op.execute(
+            f'CREATE TRIGGER {table}{SHADOW}_sync BEFORE INSERT OR UPDATE ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION {table}{SHADOW}_sync()'
+        )
+
+    with op.get_context().autocommit_block():
+        for table, columns in UUID_COLUMNS.items():
+            _backfill(table, columns, using)
+            for column in columns:
+                if column not in NULLABLE:
+                    op.execute(
+                        f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}{SHADOW}_not_null'
+                    )
+        for table, column, unique, name in INDEXES:
+            op.execute(
+                f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS '
+                f'{name}{SHADOW} ON {table} ({column}{SHADOW})'
+            )
+
+    # The swap: catalog changes only, so the exclusive locks are held briefly
+    op.execute("SET LOCAL lock_timeout = '5s'")
+
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+
+    for table, columns in UUID_COLUMNS.items():
+        op.execute(f'DROP TRIGGER {table}{SHADOW}_sync ON {table}')
+        op.execute(f'DROP FUNCTION {table}{SHADOW}_sync()')
+        for column in columns:
+            # Takes the column's old primary key, unique constraint and index with it
+            op.execute(f'ALTER TABLE {table} DROP COLUMN {column}')
+            op.execute(f'ALTER TABLE {table} RENAME COLUMN {column}{SHADOW} TO {column}')
+            if column not in NULLABLE:
+                op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+                op.execute(f'ALTER TABLE {table} DROP CONSTRAINT {table}_{column}{SHADOW}_not_null')
+
+    for table, column, unique, name in INDEXES:
+        if name.endswith(('_pkey', '_key')):
+            kind = 'PRIMARY KEY' if name.endswith('_pkey') else 'UNIQUE'
+            op.execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {name} {kind} USING INDEX {name}{SHADOW}'
+            )
+        else:
+            op.execute(f'ALTER INDEX {name}{SHADOW} RENAME TO {name}')
+
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        on_delete = f' ON DELETE {ondelete}' if ondelete else ''
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey '
+            f'FOREIGN KEY ({column}) REFERENCES {referred} (id){on_delete} NOT VALID'
+        )
+
+    # Commit the swap first so validation runs without its locks
+    with op.get_context().autocommit_block():
+        for table, column, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey')
+
+
+def _backfill(table, columns, using):
+    """Copy existing rows into the shadow columns, BACKFILL_BATCH_SIZE rows per commit"""
+    conn = op.get_bind()
+    key = BATCH_KEYS.get(table, 'id')
+    assignments = ', '.join(
+        f'{column}{SHADOW} = {using.format(column=f"{table}.{column}")}' for column in columns
+    )
+    update = (
+        f'WITH batch AS (SELECT {key} FROM {table} {{where}} ORDER BY {key} LIMIT :size) '
+        f'UPDATE {table} SET {assignments} FROM batch WHERE {table}.{key} = batch.{key} '
+        f'RETURNING {table}.{key}'
+    )
+
+    last = None
+    while True:
+        where = '' if last is None else f'WHERE {key} > :last'
+        keys = conn.execute(
+            sa.text(update.format(where=where)), {'size': BACKFILL_BATCH_SIZE, 'last': last}
+        ).scalars().all()
+        if not keys:
+            return
+        last = max(keys)
+
+
+def _convert_sqlite(convert, new_type):
+    conn = op.get_bind()
+
+    for table, columns in UUID_COLUMNS.items():
+        rows = conn.execute(sa.text(f'SELECT rowid, {", ".join(columns)} FROM {table}')).fetchall()
+        updates = [
+            dict({'row': row[0]}, **{column: convert(value) for column, value in zip(columns, row[1:])})
+            for row in rows
+        ]
+        if updates:
+            assignments = ', '.join(f'{column} = :{column}' for column in columns)
+            conn.execute(sa.text(f'UPDATE {table} SET {assignments} WHERE rowid = :row'), updates)
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, type_=new_type)
+
+
+def _to_bytes(value):
+    if value is None or isinstance(value, bytes):
+        return value
+    return uuid.UUID(value).bytes
+
+
+def _to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(uuid.UUID(bytes=bytes(value)))
@@ -0,0 +1,44 @@
+"""Trigram GIN indexes on memorials.deceased_name and title (Postgres only)
+
+Revision ID: e2a4c8f61d07
+Revises: 5b8f2d6e1a93
+Create Date: 2026-10-19 15:34:26.904418
+
+The indexes are built CONCURRENTLY outside the migration transaction so the
+memorials table stays writable. SQLite has no pg_trgm; the app keeps an
+in-process trigram index there instead, so nothing changes.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a4c8f61d07'
+down_revision = '5b8f2d6e1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_memorials_deceased_name_trgm '
+            'ON memorials USING GIN (deceased_name gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_memorials_title_trgm '
+            'ON memorials USING GIN (title gin_trgm_ops)'
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_memorials_title_trgm')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_memorials_deceased_name_trgm')
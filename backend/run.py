@@ -1,5 +1,6 @@
 # run.py
 import os
+import click
 from app import create_app, db
 from flask_migrate import upgrade
 
@@ -14,6 +15,32 @@ def init_db():
     print("Database initialized!")
 
 
+@app.cli.command()
+def search_reindex():
+    """Rebuild the obituary full-text index (SQLite)."""
+    from app.services.search import obituary_search
+    obituary_search.rebuild()
+    db.session.commit()
+    print("Search index rebuilt!")
+
+
+@app.cli.command()
+def purge_deleted():
+    """Hard-delete soft-deleted memorials and their uploads."""
+    from app.services.purger import memorial_purger
+    purged = memorial_purger.purge_deleted()
+    print(f"Purged {purged} deleted memorials!")
+
+
+@app.cli.command()
+@click.option('--days', type=int, default=None, help='Retention in days (default GUEST_DRAFT_RETENTION_DAYS)')
+def purge_guest_drafts(days):
+    """Hard-delete guest drafts nobody touched within the retention period."""
+    from app.services.purger import memorial_purger
+    purged = memorial_purger.purge_guest_drafts(retention_days=days)
+    print(f"Purged {purged} abandoned guest drafts!")
+
+
 @app.cli.command()
 def deploy():
     """Run deployment tasks."""
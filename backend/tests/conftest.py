@@ -0,0 +1,189 @@
+# tests/conftest.py
+import pytest
+from app import create_app, db as _db
+
+pytest_plugins = ['app.utils.query_budget']
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Testing app on in-memory SQLite with a throwaway upload folder"""
+    app = create_app('testing')
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+class FakeRedisServer:
+    """Redis-protocol server for tests: strings, hashes, TTLs and Lua scripts.
+
+    Scripts run on a real Lua 5.1 interpreter (lupa) with the same reply
+    conversions as Redis, so TOKEN_BUCKET_SCRIPT is exercised as written.
+    """
+
+    def __init__(self):
+        import hashlib
+        import socketserver
+        import threading
+        from lupa.lua51 import LuaRuntime
+
+        self._sha1 = lambda source: hashlib.sha1(source.encode('utf-8')).hexdigest()
+        self.data = {}
+        self.expires = {}
+        self.scripts = {}
+        self.clock = None  # Monotonic seconds unless a test pins it
+        self._lock = threading.RLock()
+        self._lua = LuaRuntime(unpack_returned_tuples=False)
+        self._lua.globals().redis = self._lua.table_from({'call': self._lua_call})
+
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    command = server._read_command(self.rfile)
+                    if command is None:
+                        return
+                    self.wfile.write(server._encode(server.dispatch(command)))
+
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f'redis://127.0.0.1:{self._server.server_address[1]}/0'
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def now(self):
+        import time
+        return self.clock if self.clock is not None else time.monotonic()
+
+    @staticmethod
+    def _read_command(rfile):
+        line = rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(rfile.readline()[1:-2])
+            args.append(rfile.read(length + 2)[:-2].decode('utf-8'))
+        return args
+
+    def _encode(self, reply):
+        if isinstance(reply, Exception):
+            return b'-%s\r\n' % str(reply).encode('utf-8')
+        if reply is None:
+            return b'$-1\r\n'
+        if isinstance(reply, bool):
+            return b':%d\r\n' % reply
+        if isinstance(reply, int):
+            return b':%d\r\n' % reply
+        if isinstance(reply, list):
+            return b'*%d\r\n' % len(reply) + b''.join(self._encode(item) for item in reply)
+        if reply == 'OK':
+            return b'+OK\r\n'
+        data = str(reply).encode('utf-8')
+        return b'$%d\r\n%s\r\n' % (len(data), data)
+
+    def _live(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= self.now():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def pttl(self, key):
+        """Remaining TTL in ms (-2 missing, -1 no expiry)"""
+        with self._lock:
+            if not self._live(key):
+                return -2
+            expires_at = self.expires.get(key)
+            return -1 if expires_at is None else int((expires_at - self.now()) * 1000)
+
+    def dispatch(self, args):
+        with self._lock:
+            try:
+                return self.call(args[0].upper(), *args[1:])
+            except Exception as e:
+                return e if str(e).startswith(('ERR', 'NOSCRIPT')) else Exception(f'ERR {e}')
+
+    def call(self, name, *args):
+        if name in ('AUTH', 'SELECT', 'PING'):
+            return 'OK'
+        if name == 'SET':
+            key, value = args[0], args[1]
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if len(args) > 3 and args[2].upper() == 'PX':
+                self.expires[key] = self.now() + int(args[3]) / 1000
+            return 'OK'
+        if name == 'EXISTS':
+            return sum(1 for key in args if self._live(key))
+        if name == 'HMGET':
+            values = self.data.get(args[0], {}) if self._live(args[0]) else {}
+            return [values.get(field) for field in args[1:]]
+        if name == 'HSET':
+            if not self._live(args[0]):
+                self.data[args[0]] = {}
+            values = self.data[args[0]]
+            added = sum(1 for field in args[1::2] if field not in values)
+            values.update(zip(args[1::2], args[2::2]))
+            return added
+        if name == 'PEXPIRE':
+            if not self._live(args[0]):
+                return 0
+            self.expires[args[0]] = self.now() + int(args[1]) / 1000
+            return 1
+        if name == 'SCRIPT' and args[0].upper() == 'LOAD':
+            sha = self._sha1(args[1])
+            self.scripts[sha] = self._lua.eval(f'function(KEYS, ARGV) {args[1]}\nend')
+            return sha
+        if name == 'EVALSHA':
+            script = self.scripts.get(args[0])
+            if script is None:
+                raise Exception('NOSCRIPT No matching script. Please use EVAL.')
+            numkeys = int(args[1])
+            keys, argv = args[2:2 + numkeys], args[2 + numkeys:]
+            return self._from_lua(script(self._lua.table(*keys), self._lua.table(*argv)))
+        raise Exception(f"ERR unknown command '{name}'")
+
+    def _lua_call(self, name, *args):
+        # Numbers reach commands as %.17g strings; nil bulk replies come back as false
+        args = [format(arg, '.17g') if isinstance(arg, (int, float)) else str(arg) for arg in args]
+        reply = self.call(str(name).upper(), *args)
+        if isinstance(reply, list):
+            return self._lua.table(*(False if item is None else item for item in reply))
+        return False if reply is None else reply
+
+    def _from_lua(self, value):
+        import lupa.lua51 as lupa
+        if lupa.lua_type(value) == 'table':
+            items = []
+            while value[len(items) + 1] is not None:
+                items.append(self._from_lua(value[len(items) + 1]))
+            return items
+        if value is True:
+            return 1
+        if value is None or value is False:
+            return None
+        if isinstance(value, float):
+            return int(value)  # Lua numbers become integer replies
+        return value
+
+
+@pytest.fixture
+def redis_server():
+    pytest.importorskip('lupa')
+    server = FakeRedisServer()
+    yield server
+    server.close()
@@ -0,0 +1,61 @@
+# tests/test_asgi_adapter.py
+import asyncio
+import os
+from app.models import Memorial
+from app.services.asgi_adapter import MemoraASGI
+
+BOUNDARY = 'test-boundary'
+
+
+def call(asgi, method, path, body=b'', headers=(), pieces=1):
+    """Drive one HTTP request through the ASGI app; returns (status, headers, body)"""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': b'',
+        'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    }
+    step = max(1, len(body) // pieces)
+    chunks = [body[i:i + step] for i in range(0, len(body), step)] or [b'']
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi(scope, receive, send))
+    start = sent[0]
+    return (start['status'], {k.decode(): v.decode() for k, v in start['headers']},
+            b''.join(message.get('body', b'') for message in sent[1:]))
+
+
+def test_upload_is_streamed_to_disk_and_read_back_through_the_pool(app, db):
+    memorial = Memorial(guest_session='guest-1')
+    db.session.add(memorial)
+    db.session.commit()
+    asgi = MemoraASGI(app, threads=2)
+
+    photo = b'\xff\xd8' + os.urandom(200 * 1024)
+    body = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="photos"; filename="a.jpg"\r\n'
+            'Content-Type: image/jpeg\r\n\r\n').encode('latin-1') + photo + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    status, _, _ = call(asgi, 'POST', f'/api/photos/{memorial.id}/photos', body, pieces=8, headers=[
+        ('Content-Type', f'multipart/form-data; boundary={BOUNDARY}'),
+        ('Content-Length', str(len(body))),
+        ('X-Guest-Session', 'guest-1'),
+    ])
+    assert status == 201
+
+    memorial_dir = os.path.join(app.config['UPLOAD_FOLDER'], f'memorial_{memorial.id}')
+    [filename] = os.listdir(memorial_dir)
+    with open(os.path.join(memorial_dir, filename), 'rb') as file:
+        assert file.read() == photo
+
+    status, headers, content = call(asgi, 'GET', f'/uploads/memorial_{memorial.id}/{filename}')
+    assert status == 200 and content == photo and headers['content-type'] == 'image/jpeg'
+
+    status, _, content = call(asgi, 'GET', f'/api/pdf/{memorial.id}/data', headers=[('X-Guest-Session', 'guest-1')])
+    assert status == 200 and b'data:image/jpeg;base64,' in content
+    asgi.wsgi.executor.shutdown()
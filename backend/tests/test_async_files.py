@@ -0,0 +1,46 @@
+# tests/test_async_files.py
+import asyncio
+import io
+import threading
+from app.utils.async_files import CHUNK_SIZE, read_files, server_loop, write_files
+
+
+def test_plain_file_io_without_a_server_loop(tmp_path):
+    paths = [str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')]
+    upload = io.BytesIO(b'\xff' * (CHUNK_SIZE * 2 + 7))
+
+    write_files([(paths[0], b'first'), (paths[1], upload)])
+
+    assert read_files(paths + [str(tmp_path / 'missing.jpg')]) == [b'first', upload.getvalue(), None]
+
+
+class RecordingStream(io.BytesIO):
+    """Upload stream that remembers which threads read from it"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.threads = set()
+
+    def read(self, size=-1):
+        self.threads.add(threading.current_thread())
+        return super().read(size)
+
+
+def test_multi_megabyte_upload_is_read_off_the_server_loop(tmp_path):
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    data = bytes(range(256)) * (8 * 1024 * 1024 // 256 + 3)
+    upload = RecordingStream(data)
+    path = str(tmp_path / 'large.jpg')
+    token = server_loop.set(loop)
+    try:
+        write_files([(path, upload)])
+        assert read_files([path]) == [data]
+    finally:
+        server_loop.reset(token)
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+    assert upload.threads and loop_thread not in upload.threads
@@ -0,0 +1,22 @@
+# tests/test_auth.py
+from app.models import User
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
+
+
+def test_login_skips_the_rehash_when_the_hasher_is_busy(client, db, monkeypatch):
+    user = User(email='owner@example.com', password='password123')
+    db.session.add(user)
+    db.session.commit()
+    old_hash = user.password_hash
+    monkeypatch.setattr(password_hasher, 'log_rounds', password_hasher.log_rounds + 1)
+
+    def busy(password):
+        raise PasswordHasherBusy('Password hashing queue is full')
+
+    monkeypatch.setattr(password_hasher, 'hash', busy)
+
+    response = client.post('/api/auth/login', json={'email': 'owner@example.com', 'password': 'password123'})
+
+    assert response.status_code == 200
+    assert response.json['access_token']
+    assert db.session.get(User, user.id).password_hash == old_hash
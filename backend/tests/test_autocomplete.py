@@ -0,0 +1,86 @@
+# tests/test_autocomplete.py
+import random
+import time
+from collections import namedtuple
+import pytest
+from app.services.autocomplete import TrigramIndex, normalize
+
+Row = namedtuple('Row', 'id deceased_name title')
+
+ROWS = [
+    Row(1, 'John Smith', 'Celebrating John'),
+    Row(2, 'Johanna Smithers', 'In Loving Memory'),
+    Row(3, 'Mary-Anne O\'Neil', 'Forever in our hearts'),
+    Row(4, 'Peter Jonsson', None),
+    Row(5, 'Ana Smit', 'A life well lived'),
+]
+
+
+@pytest.fixture
+def index():
+    return TrigramIndex(ROWS, signature=(len(ROWS), None))
+
+
+@pytest.mark.parametrize('query', [
+    'john', 'ohn sm', 'smith', 'mit', 'jo', 'a', 'anne o', 'in our', 'ng memo', 'well lived', 'xyz'
+])
+def test_substring_candidates_match_a_full_scan(index, query):
+    needle = normalize(query)
+    expected = {
+        row.id for row in ROWS
+        if needle in normalize(row.deceased_name) or needle in normalize(row.title)
+    }
+
+    found = {memorial_id for memorial_id in index._candidates(needle)
+             if any(needle in text for text in index.entries[memorial_id][1].values())}
+
+    assert found == expected
+    assert set(index._candidates(needle)) >= expected
+
+
+def test_candidates_skip_rows_missing_a_trigram(index):
+    assert set(index._candidates('smith')) == {1, 2}
+
+
+def test_word_prefixes_rank_first_then_similar_spellings(index):
+    results = index.search('jon', limit=10)
+
+    assert results[0]['id'] == 4  # 'Jonsson' starts with the query
+    assert results[0]['matched_field'] == 'deceased_name'
+
+
+def test_misspelling_falls_back_to_trigram_similarity(index):
+    results = index.search('jhon smith', limit=10)
+
+    assert results and results[0]['id'] == 1
+
+
+def test_endpoint_adds_to_vary_instead_of_replacing_it(client):
+    response = client.get('/api/search/autocomplete?q=jo', headers={
+        'X-Guest-Session': 'guest-1', 'Accept-Encoding': 'gzip'
+    })
+
+    assert response.status_code == 200
+    assert {'Authorization', 'X-Guest-Session'} <= set(response.vary)
+
+
+def test_keystroke_latency_stays_within_budget():
+    # p95 per keystroke over 5000 memorials, generous so slow CI runners pass;
+    # benchmarks/autocomplete_latency.py measures the same through the API
+    rng = random.Random(42)
+    first = ['Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William']
+    last = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis']
+    rows = [Row(number, f'{rng.choice(first)} {rng.choice(last)}', f'Celebration of Life #{number}')
+            for number in range(5000)]
+    index = TrigramIndex(rows, signature=(len(rows), None))
+
+    timings = []
+    for name in ['mary smith', 'robert garcia', 'jhon wiliams', 'celebration of life #4', 'zzz']:
+        for end in range(1, len(name) + 1):
+            started = time.perf_counter()
+            index.search(name[:end], limit=10)
+            timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95)]
+    assert p95 < 0.1, f'p95 keystroke latency {p95 * 1000:.1f} ms over the 100 ms budget'
@@ -0,0 +1,120 @@
+# tests/test_compression.py
+import gzip
+import pytest
+from flask import Flask, Response, jsonify
+from app.services.compression import Compression
+
+BODY = {'memorials': [{'id': number, 'deceased_name': f'Person {number}'} for number in range(100)]}
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config.update(COMPRESS_MIN_SIZE=500)
+
+    @app.route('/big')
+    def big():
+        return jsonify(BODY)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/stream')
+    def stream():
+        return Response((f'line {number}\n' for number in range(2000)), mimetype='text/plain')
+
+    @app.route('/uploads/notes.txt')
+    def upload():
+        return Response('x' * 5000, mimetype='text/plain')
+
+    @app.route('/photo.png')
+    def photo():
+        return Response(b'\x89PNG' + b'\0' * 5000, mimetype='image/png')
+
+    @app.route('/program.pdf')
+    def program():
+        return Response(b'%PDF-1.4' + b'\0' * 5000, mimetype='application/pdf')
+
+    @app.route('/tagged')
+    def tagged():
+        response = jsonify(BODY)
+        response.set_etag('v1')
+        return response
+
+    Compression(app)
+    return app
+
+
+@pytest.fixture
+def client():
+    return make_app().test_client()
+
+
+def decode(response):
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'br':
+        import brotli
+        return brotli.decompress(response.data)
+    if encoding == 'gzip':
+        return gzip.decompress(response.data)
+    return response.data
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+])
+def test_gzip_negotiation(client, accept, expected):
+    response = client.get('/big', headers={'Accept-Encoding': accept})
+
+    assert response.headers.get('Content-Encoding') == expected
+    assert 'Accept-Encoding' in response.vary
+    assert response.json == BODY if expected is None else decode(response)
+
+
+def test_brotli_is_preferred_when_installed(client):
+    pytest.importorskip('brotli')
+
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip, br'})
+    refused = client.get('/big', headers={'Accept-Encoding': 'gzip;q=0, br;q=0'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert decode(response) == client.get('/big').data
+    assert 'Content-Encoding' not in refused.headers
+
+
+def test_small_bodies_are_left_alone(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.json == {'ok': True}
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br'])
+def test_streamed_response_decompresses_whole(client, encoding):
+    if encoding == 'br':
+        pytest.importorskip('brotli')
+
+    response = client.get('/stream', headers={'Accept-Encoding': encoding})
+
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Content-Length' not in response.headers
+    assert decode(response) == ''.join(f'line {number}\n' for number in range(2000)).encode()
+
+
+@pytest.mark.parametrize('path', ['/uploads/notes.txt', '/photo.png', '/program.pdf'])
+def test_uploads_and_binary_types_are_skipped(client, path):
+    response = client.get(path, headers={'Accept-Encoding': 'gzip, br'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.data) >= 5000
+
+
+def test_strong_etag_is_weakened_after_compression(client):
+    plain = client.get('/tagged')
+    compressed = client.get('/tagged', headers={'Accept-Encoding': 'gzip'})
+
+    assert plain.headers['ETag'] == '"v1"'
+    assert compressed.headers['ETag'] == 'W/"v1"'
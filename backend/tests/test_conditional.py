@@ -0,0 +1,85 @@
+# tests/test_conditional.py
+import pytest
+from app.models import Memorial
+from app.models.program import Obituary, Speech, upsert_section
+
+GUEST = {'X-Guest-Session': 'guest-1'}
+
+
+@pytest.fixture
+def memorial_id(db):
+    memorial = Memorial(guest_session='guest-1', deceased_name='Grace Hopper')
+    db.session.add(memorial)
+    db.session.flush()
+    db.session.add(Obituary(memorial_id=memorial.id, full_name='Grace Hopper'))
+    Speech.sync_for_memorial(memorial.id, [{'speaker_name': 'Ann', 'speech_type': 'eulogy'}])
+    db.session.commit()
+    return memorial.id
+
+
+def get(client, memorial_id, etag=None, headers=GUEST):
+    if etag:
+        headers = dict(headers, **{'If-None-Match': etag})
+    return client.get(f'/api/memorials/{memorial_id}', headers=headers)
+
+
+def test_first_get_has_a_weak_etag_and_must_revalidate(client, memorial_id):
+    response = get(client, memorial_id)
+
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('W/"')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+
+def test_matching_if_none_match_gets_304(client, memorial_id):
+    etag = get(client, memorial_id).headers['ETag']
+
+    response = get(client, memorial_id, etag)
+
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.data == b''
+
+
+def obituary_via_orm(db, memorial_id):
+    obituary = db.session.scalars(db.select(Obituary).filter_by(memorial_id=memorial_id)).one()
+    obituary.life_story = 'Built the first compiler'
+
+
+def obituary_via_upsert(db, memorial_id):
+    upsert_section(Obituary, memorial_id, {'full_name': 'Grace Brewster Hopper'})
+
+
+def speeches_via_sync(db, memorial_id):
+    Speech.sync_for_memorial(memorial_id, [{'speaker_name': 'Ben', 'speech_type': 'tribute'}])
+
+
+@pytest.mark.parametrize('write', [obituary_via_orm, obituary_via_upsert, speeches_via_sync])
+def test_section_writes_change_the_etag(client, db, memorial_id, write):
+    etag = get(client, memorial_id).headers['ETag']
+
+    write(db, memorial_id)
+    db.session.commit()
+
+    response = get(client, memorial_id, etag)
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_bulk_speech_delete_changes_the_etag(client, memorial_id):
+    etag = get(client, memorial_id).headers['ETag']
+
+    assert client.delete(f'/api/speeches/{memorial_id}/speeches', headers=GUEST).status_code == 200
+
+    response = get(client, memorial_id, etag)
+    assert response.status_code == 200
+    assert response.json['memorial']['speeches'] == []
+
+
+def test_no_304_for_a_caller_without_access(client, memorial_id):
+    etag = get(client, memorial_id).headers['ETag']
+
+    response = get(client, memorial_id, etag, headers={'X-Guest-Session': 'someone-else'})
+
+    assert response.status_code != 304
+    assert 'ETag' not in response.headers
@@ -0,0 +1,97 @@
+# tests/test_db_routing.py
+import pytest
+from flask import Flask, g
+from app import create_app, db as _db
+from app.models import Memorial
+from app.services.db_routing import ReplicaRouter
+from config import TestingConfig
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_BINDS={'replica': 'sqlite://'}, **config)
+    return app
+
+
+def test_replica_routing_needs_shared_store_with_several_workers(caplog):
+    router = ReplicaRouter(make_app(RATELIMIT_STORAGE_URL='memory://', WEB_CONCURRENCY=4))
+
+    assert not router.enabled
+    assert 'Replica routing disabled' in caplog.text
+
+
+def test_replica_routing_with_memory_store_in_one_worker():
+    router = ReplicaRouter(make_app(RATELIMIT_STORAGE_URL='memory://', WEB_CONCURRENCY=1))
+
+    assert router.enabled
+
+
+@pytest.fixture
+def routed_app(tmp_path, monkeypatch):
+    """Testing app on a primary SQLite file with a second file as the replica bind.
+
+    The two files are never synced, so each read shows which one served it.
+    """
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {'replica': f"sqlite:///{tmp_path / 'replica.db'}"})
+    app = create_app('testing')
+
+    with app.app_context():
+        _db.create_all()
+        _db.metadata.create_all(_db.engines['replica'])
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+        _db.metadata.drop_all(_db.engines['replica'])
+    # init_app registered a metadata for the bind on the shared extension
+    _db.metadatas.pop('replica', None)
+
+
+@pytest.fixture
+def memorial_id(routed_app):
+    """A memorial that exists on both databases under different names"""
+    memorial = Memorial(guest_session='guest-1', deceased_name='On the primary')
+    _db.session.add(memorial)
+    _db.session.commit()
+    replica = _db.engines['replica']
+    with replica.begin() as conn:
+        conn.execute(Memorial.__table__.insert().values(
+            id=memorial.id, guest_session='guest-1', deceased_name='On the replica',
+            steps_mask=0, created_at=memorial.created_at, updated_at=memorial.updated_at
+        ))
+    return memorial.id
+
+
+def read_name(client, memorial_id, guest_session='guest-1'):
+    response = client.get(f'/api/memorials/{memorial_id}', headers={'X-Guest-Session': guest_session})
+    return response.json['memorial']['deceased_name']
+
+
+def test_get_reads_from_the_replica(routed_app, memorial_id):
+    assert read_name(routed_app.test_client(), memorial_id) == 'On the replica'
+
+
+def test_get_after_a_write_reads_the_primary(routed_app, memorial_id):
+    client = routed_app.test_client()
+
+    response = client.put(f'/api/memorials/{memorial_id}', json={'title': 'Celebrating a life'},
+                          headers={'X-Guest-Session': 'guest-1'})
+
+    assert response.status_code == 200
+    assert read_name(client, memorial_id) == 'On the primary'
+    # Other callers still read the replica
+    assert read_name(client, memorial_id, guest_session='guest-2') == 'On the replica'
+
+
+def test_dml_during_a_get_goes_to_the_primary(routed_app, memorial_id):
+    table = Memorial.__table__
+
+    with routed_app.test_request_context('/', method='GET'):
+        g.db_route = 'replica'
+        _db.session.execute(_db.update(table).where(table.c.id == memorial_id).values(title='Written'))
+        replica_title = _db.session.scalar(_db.select(table.c.title).where(table.c.id == memorial_id))
+        _db.session.commit()
+
+    with _db.engine.connect() as conn:
+        assert conn.scalar(_db.select(table.c.title).where(table.c.id == memorial_id)) == 'Written'
+    assert replica_title is None
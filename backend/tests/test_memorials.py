@@ -0,0 +1,150 @@
+# tests/test_memorials.py
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app.models import Memorial, User
+from app.models.program import Obituary
+
+
+@pytest.fixture
+def auth_headers(db):
+    user = User(email='owner@example.com', password='password123')
+    db.session.add(user)
+    db.session.flush()
+    for number in range(60):
+        db.session.add(Memorial(user_id=user.id, deceased_name=f'Person {number}'))
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+
+def test_list_returns_every_memorial_without_paging_params(client, auth_headers):
+    response = client.get('/api/memorials/', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json['memorials']) == 60
+    assert response.json['next_cursor'] is None
+
+
+def test_list_pages_when_asked(client, auth_headers):
+    first = client.get('/api/memorials/?limit=25', headers=auth_headers).json
+    second = client.get(f"/api/memorials/?cursor={first['next_cursor']}", headers=auth_headers).json
+
+    assert len(first['memorials']) == 25
+    assert len(second['memorials']) == 35  # cursor alone pages with the default size (50)
+    assert second['next_cursor'] is None
+    ids = [memorial['id'] for memorial in first['memorials'] + second['memorials']]
+    assert len(set(ids)) == 60
+
+
+def test_marking_a_step_does_not_read_the_mask_back(client, db):
+    memorial = Memorial(guest_session='guest-1')
+    db.session.add(memorial)
+    db.session.commit()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.post(f'/api/memorials/{memorial.id}/steps/obituary',
+                               headers={'X-Guest-Session': 'guest-1'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert response.json['memorial']['completed_steps'] == ['obituary']
+    assert response.json['memorial']['current_step'] == 'body_viewing'
+    assert not [sql for sql in statements if sql.startswith('SELECT memorials.steps_mask')]
+
+
+def test_step_updates_apply_on_top_of_concurrent_ones(app, db):
+    memorial = Memorial(guest_session='guest-1')
+    db.session.add(memorial)
+    db.session.commit()
+    # Another request completed 'speeches' after this one loaded the memorial
+    table = Memorial.__table__
+    db.session.execute(db.update(table).where(table.c.id == memorial.id).values(steps_mask=4))
+
+    memorial.add_completed_step('obituary')
+
+    assert memorial.completed_steps == ['obituary', 'speeches']
+
+
+GUEST = {'X-Guest-Session': 'guest-1'}
+
+
+def add_with_obituary(db, life_story, **kwargs):
+    memorial = Memorial(**kwargs)
+    db.session.add(memorial)
+    db.session.flush()
+    db.session.add(Obituary(memorial_id=memorial.id, full_name=memorial.deceased_name,
+                            life_story=life_story))
+    db.session.commit()
+    return memorial.id
+
+
+@pytest.fixture
+def guest_memorials(client, db):
+    """(live, soft-deleted) memorials of the same guest session"""
+    live = add_with_obituary(db, 'Wrote the first compiler', guest_session='guest-1',
+                             deceased_name='Grace Baker')
+    deleted = add_with_obituary(db, 'Built a compiler too', guest_session='guest-1',
+                                deceased_name='Grace Hopper')
+    assert client.delete(f'/api/memorials/{deleted}', headers=GUEST).status_code == 200
+    return live, deleted
+
+
+@pytest.mark.parametrize('path', [
+    '/api/memorials/{id}',
+    '/api/obituaries/{id}/obituary',
+    '/api/photos/{id}/photos',
+    '/api/speeches/{id}/speeches',
+])
+def test_soft_deleted_memorial_is_not_found(client, guest_memorials, path):
+    live, deleted = guest_memorials
+
+    assert client.get(path.format(id=live), headers=GUEST).status_code == 200
+    assert client.get(path.format(id=deleted), headers=GUEST).status_code == 404
+
+
+def test_soft_deleted_memorial_is_left_out_of_the_owner_list(client, db):
+    user = User(email='owner@example.com', password='password123')
+    db.session.add(user)
+    db.session.flush()
+    live = Memorial(user_id=user.id, deceased_name='Kept')
+    deleted = Memorial(user_id=user.id, deceased_name='Removed')
+    db.session.add_all([live, deleted])
+    db.session.flush()
+    deleted.soft_delete()
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    memorials = client.get('/api/memorials/', headers=headers).json['memorials']
+
+    assert [memorial['id'] for memorial in memorials] == [live.id]
+
+
+def test_soft_deleted_memorial_is_not_searched_or_suggested(client, guest_memorials):
+    live, _ = guest_memorials
+
+    results = client.get('/api/search/memorials?q=compiler', headers=GUEST).json['results']
+    suggestions = client.get('/api/search/autocomplete?q=grace', headers=GUEST).json['suggestions']
+
+    assert [result['memorial_id'] for result in results] == [live]
+    assert [suggestion['id'] for suggestion in suggestions] == [live]
+
+
+def test_soft_deleted_memorial_is_not_adopted(client, db, guest_memorials):
+    live, deleted = guest_memorials
+    user = User(email='adopter@example.com', password='password123')
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    response = client.post('/api/auth/adopt-guest-memorials', json={'guest_session': 'guest-1'},
+                           headers=headers)
+
+    assert response.json['adopted_memorials'] == 1
+    assert db.session.get(Memorial, live).user_id == user.id
+    assert db.session.get(Memorial, deleted).user_id is None
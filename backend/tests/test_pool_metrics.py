@@ -0,0 +1,43 @@
+# tests/test_pool_metrics.py
+import pytest
+from sqlalchemy import create_engine, event, exc, text
+from app.services.pool_metrics import PoolStats, TimedQueuePool
+
+
+@pytest.fixture
+def engine_and_stats(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=TimedQueuePool, pool_pre_ping=True)
+    stats = PoolStats('primary')
+    engine.pool.stats = stats
+    event.listen(engine, 'connect', stats.on_connect)
+    event.listen(engine, 'checkout', stats.on_checkout)
+    event.listen(engine, 'invalidate', stats.on_invalidate)
+    yield engine, stats
+    engine.dispose()
+
+
+def test_failed_pre_ping_is_counted_apart_from_in_use_invalidations(engine_and_stats, monkeypatch):
+    engine, stats = engine_and_stats
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    # The idle connection went stale (server restart, idle timeout)
+    pings = iter([False])
+    monkeypatch.setattr(engine.dialect, 'do_ping', lambda dbapi_connection: next(pings, True))
+
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+
+    assert stats.ping_invalidations == 1
+    assert stats.invalidations == 0
+
+
+def test_disconnect_while_in_use_counts_as_invalidation(engine_and_stats):
+    engine, stats = engine_and_stats
+
+    with engine.connect() as connection:
+        connection.connection.dbapi_connection.close()
+        with pytest.raises(exc.DBAPIError):
+            connection.execute(text('SELECT 1'))
+
+    assert stats.invalidations == 1
+    assert stats.ping_invalidations == 0
@@ -0,0 +1,92 @@
+# tests/test_public_snapshots.py
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from app.models import Memorial, MemorialStatus, PublishedSnapshot
+from app.services.public_snapshots import public_snapshots
+from app.services.purger import memorial_purger
+
+
+@pytest.fixture
+def purged(monkeypatch):
+    calls = []
+    monkeypatch.setattr(public_snapshots, 'purge', lambda memorial_ids: calls.append(set(memorial_ids)))
+    return calls
+
+
+@pytest.fixture
+def statements(db):
+    seen = []
+    engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield seen
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def add_memorial(db, **kwargs):
+    memorial = Memorial(guest_session='guest-1', deceased_name='Ada Lovelace', **kwargs)
+    db.session.add(memorial)
+    db.session.commit()
+    return memorial
+
+
+def snapshot_ids(db):
+    return set(db.session.scalars(db.select(PublishedSnapshot.memorial_id)))
+
+
+def test_editing_an_unpublished_memorial_skips_snapshot_statements(db, statements, purged):
+    memorial = add_memorial(db)
+    statements.clear()
+
+    memorial.title = 'In loving memory'
+    db.session.commit()
+
+    assert not [sql for sql in statements if 'published_snapshots' in sql]
+    assert purged == []
+
+
+def test_publish_and_unpublish_keep_the_snapshot_in_step(db, purged):
+    memorial = add_memorial(db)
+
+    memorial.status = MemorialStatus.PUBLISHED
+    db.session.commit()
+    assert snapshot_ids(db) == {memorial.id}
+
+    memorial.status = MemorialStatus.COMPLETED
+    db.session.commit()
+    assert snapshot_ids(db) == set()
+    assert purged == [{memorial.id}, {memorial.id}]
+
+
+def test_purger_hard_delete_purges_the_cdn(db, purged):
+    memorial = add_memorial(db, status=MemorialStatus.PUBLISHED)
+    memorial_id = memorial.id
+    purged.clear()
+
+    memorial.deleted_at = datetime.utcnow()
+    db.session.commit()
+    purged.clear()
+
+    assert memorial_purger.purge_deleted() == 1
+    assert purged == [{memorial_id}]
+
+
+def test_missing_snapshot_is_stored_on_first_read(client, db, statements, purged):
+    memorial = add_memorial(db, status=MemorialStatus.PUBLISHED)
+    memorial_id = memorial.id
+    # As if published before snapshots existed
+    db.session.execute(db.delete(PublishedSnapshot.__table__))
+    db.session.commit()
+
+    first = client.get(f'/api/public/memorials/{memorial_id}')
+    assert snapshot_ids(db) == {memorial_id}
+    statements.clear()
+    second = client.get(f'/api/public/memorials/{memorial_id}')
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data and first.headers['ETag'] == second.headers['ETag']
+    assert not [sql for sql in statements if sql.startswith('INSERT')]
@@ -0,0 +1,78 @@
+# tests/test_purger.py
+import io
+import os
+from datetime import datetime, timedelta
+from app.models import Memorial, MemorialStatus
+from app.models.program import Obituary, Photo
+from app.services.purger import memorial_purger
+
+
+def add_memorial(db, days_old, **kwargs):
+    memorial = Memorial(**kwargs)
+    db.session.add(memorial)
+    db.session.flush()
+    # Set after the insert so onupdate does not stamp it again
+    db.session.execute(
+        db.update(Memorial.__table__)
+        .where(Memorial.__table__.c.id == memorial.id)
+        .values(updated_at=datetime.utcnow() - timedelta(days=days_old))
+    )
+    db.session.commit()
+    return memorial.id
+
+
+def remaining_ids(db):
+    return set(db.session.scalars(db.select(Memorial.id)))
+
+
+def test_guest_draft_retention_only_purges_abandoned_drafts(app, db):
+    draft = add_memorial(db, 45, guest_session='g1')
+    in_progress = add_memorial(db, 45, guest_session='g2', status=MemorialStatus.IN_PROGRESS)
+    published = add_memorial(db, 45, guest_session='g3', status=MemorialStatus.PUBLISHED)
+    completed = add_memorial(db, 45, guest_session='g4', status=MemorialStatus.COMPLETED)
+    recent = add_memorial(db, 5, guest_session='g5')
+
+    purged = memorial_purger.purge_guest_drafts(retention_days=30)
+
+    assert purged == 2
+    assert remaining_ids(db) == {published, completed, recent}
+    assert not {draft, in_progress} & remaining_ids(db)
+
+
+def test_guest_draft_retention_keeps_owned_memorials(app, db):
+    from app.models import User
+
+    user = User(email='owner@example.com', password='password123')
+    db.session.add(user)
+    db.session.flush()
+    owned = add_memorial(db, 90, user_id=user.id)
+
+    assert memorial_purger.purge_guest_drafts(retention_days=30) == 0
+    assert remaining_ids(db) == {owned}
+
+
+def test_purge_deleted_removes_rows_sections_and_uploads(app, db, client):
+    memorial = Memorial(guest_session='g1', deceased_name='Grace Hopper')
+    db.session.add(memorial)
+    db.session.flush()
+    db.session.add(Obituary(memorial_id=memorial.id, full_name='Grace Hopper'))
+    db.session.commit()
+    memorial_id = memorial.id
+    # A non-canonical spelling of the id still files the upload under the canonical one
+    response = client.post(f'/api/photos/{memorial_id.upper()}/photos',
+                           data={'photos': (io.BytesIO(b'\xff\xd8'), 'grace.jpg')},
+                           headers={'X-Guest-Session': 'g1'})
+    assert response.status_code == 201
+    upload_dir = memorial_purger.upload_dir(memorial_id)
+    assert os.listdir(upload_dir)
+    memorial.soft_delete()
+    db.session.commit()
+
+    assert memorial_purger.purge_deleted() == 1
+
+    db.session.expire_all()
+    assert remaining_ids(db) == set()
+    assert db.session.scalars(db.select(Obituary)).all() == []
+    assert db.session.scalars(db.select(Photo)).all() == []
+    assert not os.path.exists(upload_dir)
+    assert os.listdir(app.config['UPLOAD_FOLDER']) == []
@@ -0,0 +1,73 @@
+# tests/test_query_budget.py
+import logging
+import pytest
+from flask_jwt_extended import create_access_token
+from app.models import Memorial, User
+from app.models.program import Obituary, Photo, Speech
+
+
+@pytest.fixture
+def owner(db):
+    """(memorial id, auth headers) for a user with a fully filled-in memorial and 20 more"""
+    user = User(email='owner@example.com', password='password123')
+    db.session.add(user)
+    db.session.flush()
+    memorials = [Memorial(user_id=user.id, deceased_name=f'Person {number}') for number in range(21)]
+    db.session.add_all(memorials)
+    db.session.flush()
+    memorial = memorials[0]
+    db.session.add(Obituary(memorial_id=memorial.id, full_name='Person 0', life_story='A long life'))
+    for position in range(5):
+        db.session.add(Speech(memorial_id=memorial.id, speaker_name=f'Speaker {position}',
+                              speech_type='eulogy', position=position))
+        db.session.add(Photo(memorial_id=memorial.id, filename=f'{position}.jpg',
+                             original_filename=f'{position}.jpg', file_url=f'/uploads/{position}.jpg'))
+    db.session.commit()
+    return memorial.id, {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+
+def test_list_memorials_query_budget(client, owner, query_budget):
+    _, headers = owner
+
+    # Token revocations, then one query for every memorial and its obituary flag
+    with query_budget(2, max_repeats=1):
+        response = client.get('/api/memorials/', headers=headers)
+
+    assert response.status_code == 200
+
+
+def test_get_memorial_with_relations_query_budget(client, owner, query_budget):
+    memorial_id, headers = owner
+
+    # Freshness check, revocations, the memorial, then one query per relation
+    with query_budget(10, max_repeats=1):
+        response = client.get(f'/api/memorials/{memorial_id}', headers=headers)
+
+    assert response.status_code == 200
+
+
+def test_pdf_data_query_budget(client, owner, query_budget):
+    memorial_id, headers = owner
+
+    with query_budget(10, max_repeats=1):
+        response = client.get(f'/api/pdf/{memorial_id}/data', headers=headers)
+
+    assert response.status_code == 200
+
+
+def test_repeated_statements_are_logged_with_server_timing(app, client, db, caplog):
+    repeats = app.config['QUERY_REPEAT_THRESHOLD']
+
+    @app.route('/n-plus-one')
+    def n_plus_one():
+        for number in range(repeats):
+            db.session.execute(db.select(Memorial.id).where(Memorial.deceased_name == f'Person {number}'))
+        return 'ok'
+
+    with caplog.at_level(logging.WARNING, logger='app.services.query_profiler'):
+        response = client.get('/n-plus-one')
+
+    assert 'Possible N+1 in n_plus_one' in caplog.text
+    timings = response.headers.getlist('Server-Timing')
+    assert any(timing.startswith('db;dur=') and f'{repeats} queries' in timing for timing in timings)
+    assert any(timing.startswith('app;dur=') for timing in timings)
@@ -0,0 +1,132 @@
+# tests/test_rate_limiter.py
+import pytest
+from flask import Flask, jsonify
+from app.services.rate_limiter import MemoryStorage, RateLimiter, create_storage, rate_limit
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def storage(request):
+    if request.param == 'memory':
+        return MemoryStorage()
+    return create_storage(request.getfixturevalue('redis_server').url)
+
+
+def test_burst_up_to_capacity_then_deny(storage):
+    results = [storage.consume('burst', 5, 1.0, 1000.0) for _ in range(6)]
+
+    assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+    assert [remaining for _, remaining, _ in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[5][2] == pytest.approx(1.0)
+
+
+def test_tokens_refill_at_rate_and_cap_at_capacity(storage):
+    for _ in range(4):
+        storage.consume('refill', 4, 2.0, 1000.0)
+
+    allowed, _, retry_after = storage.consume('refill', 4, 2.0, 1000.0)
+    assert not allowed and retry_after == pytest.approx(0.5)
+
+    allowed, remaining, _ = storage.consume('refill', 4, 2.0, 1000.75)
+    assert allowed and remaining == pytest.approx(0.5)
+
+    # A long idle period refills to capacity, never beyond
+    allowed, remaining, _ = storage.consume('refill', 4, 2.0, 2000.0)
+    assert allowed and remaining == pytest.approx(3)
+
+
+def test_retry_after_covers_the_cost_shortfall(storage):
+    storage.consume('cost', 10, 0.5, 1000.0, cost=9)
+
+    allowed, remaining, retry_after = storage.consume('cost', 10, 0.5, 1000.0, cost=3)
+
+    assert not allowed and remaining == pytest.approx(1)
+    assert retry_after == pytest.approx(4.0)
+
+
+def test_flags_expire(storage, request):
+    # Redis expires keys on its own clock, so the fake server follows `now`
+    server = None
+    if request.node.callspec.params['storage'] == 'redis':
+        server = request.getfixturevalue('redis_server')
+    if server:
+        server.clock = 1000.0
+    storage.set_flag('writer', 10, 1000.0)
+
+    assert storage.has_flag('writer', 1000.0)
+    assert not storage.has_flag('someone-else', 1000.0)
+    if server:
+        server.clock = 1011.0
+    assert not storage.has_flag('writer', 1011.0)
+
+
+def test_redis_bucket_expires_once_it_would_be_full(redis_server):
+    storage = create_storage(redis_server.url)
+    storage.consume('ttl', 60, 1.0, 1000.0)
+
+    assert 59000 < redis_server.pttl('memora:ratelimit:ttl') <= 60000
+
+
+def test_redis_script_is_reloaded_after_a_flush(redis_server):
+    storage = create_storage(redis_server.url)
+    storage.consume('reload', 2, 1.0, 1000.0)
+    redis_server.scripts.clear()  # SCRIPT FLUSH / server restart
+
+    allowed, remaining, _ = storage.consume('reload', 2, 1.0, 1000.0)
+
+    assert allowed and remaining == pytest.approx(0)
+
+
+def make_app(storage_url, budget=(2, 60)):
+    app = Flask(__name__)
+    app.config.update(RATELIMIT_STORAGE_URL=storage_url, RATELIMIT_BUDGETS={'auth': budget})
+
+    @app.route('/login', methods=['POST'])
+    @rate_limit('auth')
+    def login():
+        return jsonify({'ok': True})
+
+    RateLimiter(app)
+    return app
+
+
+def test_limited_request_gets_429_with_retry_after(redis_server):
+    client = make_app(redis_server.url).test_client()
+
+    first, second, third = (client.post('/login') for _ in range(3))
+
+    assert first.status_code == second.status_code == 200
+    assert second.headers['X-RateLimit-Remaining'] == '0'
+    assert third.status_code == 429
+    assert third.headers['Retry-After'] == '30'
+
+
+def test_storage_outage_fails_open():
+    client = make_app('redis://127.0.0.1:1/0').test_client()
+
+    assert client.post('/login').status_code == 200
+
+
+def test_memory_storage_warns_with_several_workers(caplog):
+    app = Flask(__name__)
+    app.config.update(RATELIMIT_STORAGE_URL='memory://', WEB_CONCURRENCY=3)
+
+    RateLimiter(app)
+
+    assert 'Rate limits are per worker' in caplog.text
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_budget():
+    from werkzeug.middleware.proxy_fix import ProxyFix
+
+    app = make_app('memory://')
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+    client = app.test_client()
+
+    # The proxy appends the real client address after whatever the client sent
+    statuses = [
+        client.post('/login', headers={'X-Forwarded-For': f'198.51.100.{n}, 203.0.113.7'},
+                    environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code
+        for n in range(3)
+    ]
+
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,33 @@
+# tests/test_revocation.py
+from datetime import datetime, timedelta
+from app.models.revoked_token import RevokedToken
+from app.services.purger import memorial_purger
+from app.services.revocation import revocation_list
+
+
+def add_revocation(db, jti, revoked_at, expires_at=None):
+    db.session.add(RevokedToken(jti=jti, revoked_at=revoked_at, expires_at=expires_at))
+    db.session.commit()
+
+
+def test_refresh_picks_up_revocations_committed_late(app, db):
+    now = datetime.utcnow()
+    add_revocation(db, 'newer', now)
+    revocation_list.refresh(force=True)
+
+    # Stamped before 'newer' but only committed after the last pull
+    add_revocation(db, 'late', now - timedelta(seconds=5))
+    revocation_list.refresh(force=True)
+
+    assert revocation_list.is_revoked('late')
+    assert revocation_list.is_revoked('newer')
+    assert not revocation_list.is_revoked('never-revoked')
+
+
+def test_purger_drops_expired_revocations(app, db):
+    now = datetime.utcnow()
+    add_revocation(db, 'expired', now - timedelta(days=8), expires_at=now - timedelta(days=1))
+    add_revocation(db, 'live', now, expires_at=now + timedelta(days=7))
+
+    assert memorial_purger.purge_expired_revocations() == 1
+    assert [row.jti for row in RevokedToken.query.all()] == ['live']
@@ -0,0 +1,47 @@
+# tests/test_search.py
+from app.models import Memorial
+from app.models.program import Obituary
+from app.services.search import obituary_search
+
+
+def add_obituary(db, full_name, life_story):
+    memorial = Memorial(guest_session='g1', deceased_name=full_name)
+    db.session.add(memorial)
+    db.session.flush()
+    db.session.add(Obituary(memorial_id=memorial.id, full_name=full_name, life_story=life_story))
+    db.session.commit()
+    return memorial.id
+
+
+def found(query):
+    results, _ = obituary_search.search(query, guest_session='g1')
+    return {result['memorial_id'] for result in results}
+
+
+def test_matches_survive_vacuum(app, db):
+    gone = add_obituary(db, 'Ada Lovelace', 'Wrote the first program')
+    baker = add_obituary(db, 'Grace Baker', 'Loved her garden')
+    hopper = add_obituary(db, 'Grace Hopper', 'Built the first compiler')
+    db.session.delete(db.session.get(Memorial, gone))
+    db.session.commit()
+
+    # VACUUM may renumber the implicit rowids of the obituaries table
+    db.session.connection().exec_driver_sql('VACUUM')
+
+    assert found('garden') == {baker}
+    assert found('compiler') == {hopper}
+    assert found('program') == set()
+
+
+def test_rebuild_restores_triggers_dropped_by_a_table_rebuild(app, db):
+    memorial_id = add_obituary(db, 'Grace Hopper', 'Built the first compiler')
+    for trigger in ('insert', 'update', 'delete'):
+        db.session.execute(db.text(f'DROP TRIGGER obituaries_fts_{trigger}'))
+
+    obituary_search.rebuild()
+    obituary = db.session.scalars(db.select(Obituary)).one()
+    obituary.life_story = 'Popularised the word debugging'
+    db.session.commit()
+
+    assert found('debugging') == {memorial_id}
+    assert found('compiler') == set()
@@ -0,0 +1,48 @@
+# tests/test_speeches.py
+from app.models import Memorial
+from app.models.program import Speech
+
+
+def speech(name, **kwargs):
+    return dict({'speaker_name': name, 'speech_type': 'eulogy'}, **kwargs)
+
+
+def test_sync_updates_reorders_inserts_and_deletes_in_one_pass(app, db):
+    memorial = Memorial(guest_session='guest-1')
+    db.session.add(memorial)
+    db.session.flush()
+    assert Speech.sync_for_memorial(memorial.id, [speech('Ann'), speech('Ben'), speech('Cal')]) == (0, 3, 0)
+    db.session.commit()
+    ann, ben, cal = Speech.find_by_memorial(memorial.id)
+
+    counts = Speech.sync_for_memorial(memorial.id, [
+        speech('Cal', id=cal.id),
+        speech('Ann', id=ann.id, notes='Opening words'),
+        speech('Dee'),
+    ])
+    db.session.commit()
+
+    assert counts == (2, 1, 1)
+    result = [(s.speaker_name, s.position, s.notes) for s in Speech.find_by_memorial(memorial.id)]
+    assert result == [('Cal', 0, None), ('Ann', 1, 'Opening words'), ('Dee', 2, None)]
+
+
+def test_sync_matches_any_spelling_of_an_id_and_inserts_malformed_ones(app, db):
+    memorial = Memorial(guest_session='guest-1')
+    db.session.add(memorial)
+    db.session.flush()
+    Speech.sync_for_memorial(memorial.id, [speech('Ann'), speech('Ben')])
+    db.session.commit()
+    ann, ben = Speech.find_by_memorial(memorial.id)
+
+    counts = Speech.sync_for_memorial(memorial.id, [
+        speech('Ann', id=ann.id.upper(), notes='Opening words'),
+        speech('Ben', id='{%s}' % ben.id.replace('-', '')),
+        speech('Cal', id='not-a-uuid'),
+    ])
+    db.session.commit()
+
+    assert counts == (1, 1, 0)
+    result = [(s.id, s.speaker_name, s.notes) for s in Speech.find_by_memorial(memorial.id)]
+    assert result[:2] == [(ann.id, 'Ann', 'Opening words'), (ben.id, 'Ben', None)]
+    assert result[2][1] == 'Cal' and result[2][0] not in (ann.id, ben.id)